@@ -0,0 +1,105 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Benchmark of the float mode
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Compare the run time of the model with quantities and in float mode.
+
+Times the construction of a  System  and the one-at-a-time sensitivity analysis,
+checks that both modes give the same results, and prints the speedup.
+
+Usage, from the project root directory:
+    python -m benchmark.float_mode
+"""
+
+from timeit import repeat
+
+from model.utils import float_mode, in_float_mode, isclose, value
+from model.system import System
+
+from manuscript1.parameters import (
+    plant_parameter_MD1,
+    cofire_MD1,
+    supply_chain_MD1,
+    price_MD1,
+    farm_parameter,
+    transport_parameter,
+    mining_parameter,
+    emission_factor,
+)
+from sensitivity.uncertainty import uncertainty_MD1
+from sensitivity.one_at_a_time import one_at_a_time
+from sensitivity.blackbox import f_MD1
+
+#%%
+
+
+def build_system():
+    """Return the Mong Duong 1 system."""
+    return System(
+        plant_parameter_MD1,
+        cofire_MD1,
+        supply_chain_MD1,
+        price_MD1,
+        farm_parameter,
+        transport_parameter,
+        mining_parameter,
+        emission_factor,
+    )
+
+
+def run_one_at_a_time(model):
+    """Run the one-at-a-time sensitivity analysis of the Mong Duong 1 case."""
+    return one_at_a_time(uncertainty_MD1, model)
+
+
+def best_time(function, number, repetitions=3):
+    """Return the best time in seconds of one call of function."""
+    return min(repeat(function, number=number, repeat=repetitions)) / number
+
+
+def check_same_results():
+    """Assert that the sensitivity analysis gives the same results in both modes."""
+    with_quantities = run_one_at_a_time(f_MD1)
+    with_floats = run_one_at_a_time(in_float_mode(f_MD1))
+    for result in with_quantities:
+        for bound in with_quantities[result]:
+            for parameter, expected in with_quantities[result][bound].items():
+                obtained = with_floats[result][bound][parameter]
+                assert isclose(value(expected), obtained), (result, bound, parameter)
+
+
+def time_both_modes(function, number):
+    """Return the time of one call of function with quantities and in float mode."""
+    time_quantities = best_time(function, number)
+    with float_mode():
+        time_floats = best_time(function, number)
+    return time_quantities, time_floats
+
+
+def main():
+    """Check the results, then print the timings."""
+    check_same_results()
+    rows = [
+        ("System construction", time_both_modes(build_system, 20)),
+        ("One at a time, MD1", time_both_modes(lambda: run_one_at_a_time(f_MD1), 1)),
+    ]
+    print(
+        "{:24}{:>14}{:>14}{:>10}".format("Benchmark", "Quantities", "Floats", "Speedup")
+    )
+    for name, (time_quantities, time_floats) in rows:
+        print(
+            "{:24}{:>12.2f}ms{:>12.2f}ms{:>9.1f}x".format(
+                name,
+                time_quantities * 1000,
+                time_floats * 1000,
+                time_quantities / time_floats,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
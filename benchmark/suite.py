@@ -0,0 +1,310 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Benchmark suite of the model core
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Time the model core with quantities and in float mode, and compare with a baseline.
+
+The benchmarks cover the construction of the systems, clearing the market,
+npv, the business value table, the emissions table, fitting the supply chain,
+the one-at-a-time sensitivity analysis and the LCOE plants factory.
+Each runs in both modes, the best of  repeat  timings is kept.
+The import times of the main modules are measured in fresh interpreters.
+
+Results are saved as JSON: the time in seconds of one call, by benchmark and mode.
+Compared with a baseline saved before, on the same machine, a time longer than
+the baseline by more than the threshold is flagged as a regression,
+and the exit status is 1. Import times are noisier, they have their own threshold.
+
+Usage, from the project root directory:
+    python -m benchmark.suite --output .cache/benchmark-baseline.json
+    python -m benchmark.suite --baseline .cache/benchmark-baseline.json
+    python -m benchmark.suite --only System npv --modes floats --repeat 1
+"""
+
+import json
+import platform
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from collections import namedtuple
+from timeit import Timer
+
+from benchmark.float_mode import build_system
+from model.system import System
+from model.utils import float_mode, npv, strip
+
+from manuscript1.parameters import (
+    cofire_NB,
+    discount_rate,
+    economic_horizon,
+    emission_factor,
+    farm_parameter,
+    mining_parameter,
+    plant_parameter_NB,
+    price_MD1,
+    price_NB,
+    supply_chain_MD1,
+    supply_chain_NB,
+    transport_parameter,
+)
+from sensitivity.blackbox import f_MD1
+from sensitivity.one_at_a_time import one_at_a_time
+from sensitivity.uncertainty import uncertainty_MD1
+
+MODES = ["quantities", "floats"]
+
+IMPORTS = [
+    "model.utils",
+    "model.system",
+    "manuscript1.parameters",
+    "sensitivity.blackbox",
+    "lcoe.param_tech_catalogue",
+]
+
+THRESHOLD = 0.25
+
+IMPORT_THRESHOLD = 1.0
+
+Benchmark = namedtuple("Benchmark", "name setup modes", defaults=(MODES,))
+Benchmark.__doc__ = """A named timing. setup() runs untimed in the mode measured,
+and returns the function to time. modes: the modes the code supports."""
+
+
+def system_NB():
+    """Return the Ninh Binh system."""
+    return System(
+        plant_parameter_NB,
+        cofire_NB,
+        supply_chain_NB,
+        price_NB,
+        farm_parameter,
+        transport_parameter,
+        mining_parameter,
+        emission_factor,
+    )
+
+
+def setup_clear_market():
+    """Time clearing the market of the Mong Duong 1 system."""
+    system = build_system()
+    return lambda: system.clear_market(price_MD1)
+
+
+def setup_npv():
+    """Time the npv of a time series, the coal saved."""
+    flow = build_system().coal_saved
+    return lambda: npv(flow, discount_rate, economic_horizon)
+
+
+def setup_business_value():
+    """Time the table from a cleared market, so that nothing is memoized."""
+    system = build_system()
+
+    def table():
+        system.clear_market(price_MD1)
+        return system.table_business_value(discount_rate, economic_horizon)
+
+    return table
+
+
+def setup_emissions():
+    """Time the emissions table of the plant, forgetting the cached tensor."""
+    plant = build_system().plant
+
+    def emissions():
+        plant.activities = plant.activities
+        return plant.emissions(total=True)
+
+    return emissions
+
+
+def setup_fit():
+    """Time fitting the Mong Duong 1 supply chain to the straw needed."""
+    target = build_system().quantity_plantgate[1]
+    potential = strip(supply_chain_MD1)
+    return lambda: potential.fit(target)
+
+
+def setup_plants_factory():
+    """Time the coal subcritical plants, the catalogue is read once when imported."""
+    # pylint: disable=import-outside-toplevel
+    from lcoe.param_tech_catalogue import (
+        CoalSub_data,
+        coal_list,
+        emission_factor as lcoe_emission_factor,
+        fuel_price,
+    )
+    from lcoe.plants_factory import plants_factory
+
+    return lambda: plants_factory(
+        "coal subcritical", CoalSub_data, lcoe_emission_factor, fuel_price, coal_list
+    )
+
+
+BENCHMARKS = [
+    Benchmark("System MD1", lambda: build_system),
+    Benchmark("System NB", lambda: system_NB),
+    Benchmark("clear_market", setup_clear_market),
+    Benchmark("npv", setup_npv),
+    Benchmark("table_business_value", setup_business_value),
+    Benchmark("Emitter.emissions", setup_emissions),
+    Benchmark("SupplyChain.fit", setup_fit),
+    Benchmark(
+        "one_at_a_time MD1", lambda: lambda: one_at_a_time(uncertainty_MD1, f_MD1)
+    ),
+    # The LCOE module multiplies stripped arrays by quantities, it has no float mode
+    Benchmark("plants_factory", setup_plants_factory, ["quantities"]),
+]
+
+
+def best_time(function, repeat=3):
+    """Return the best time in seconds of one call, calling in loops of at least 0.2 s."""
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def import_time(module, repeat=3):
+    """Return the best time in seconds to import a module in a fresh interpreter."""
+
+    def run(code):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        return time.perf_counter() - start
+
+    startup = min(run("pass") for _ in range(repeat))
+    return min(run(f"import {module}") for _ in range(repeat)) - startup
+
+
+def run_suite(only=None, modes=None, repeat=3, imports=True):
+    """Return the times of the benchmarks, a dict {name: {mode: seconds}}.
+
+    only: the benchmarks whose name contains one of these strings, default all.
+    Import times are under the mode "import".
+    """
+
+    def selected(name):
+        return not only or any(pattern in name for pattern in only)
+
+    results = {}
+    for benchmark in BENCHMARKS:
+        if selected(benchmark.name):
+            results[benchmark.name] = {}
+            for mode in benchmark.modes:
+                if modes and mode not in modes:
+                    continue
+                with float_mode(mode == "floats"):
+                    function = benchmark.setup()
+                    results[benchmark.name][mode] = best_time(function, repeat)
+    if imports:
+        for module in IMPORTS:
+            name = "import " + module
+            if selected(name):
+                results[name] = {"import": import_time(module, repeat)}
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD, import_threshold=IMPORT_THRESHOLD):
+    """Return the regressions, a list of (name, mode, baseline time, time).
+
+    A regression is a time longer than the baseline by more than the threshold,
+    0.25 for 25%, or by more than the import_threshold for import times.
+    Benchmarks missing from the baseline are not compared.
+
+    >>> compare({"npv": {"floats": 1.3}}, {"npv": {"floats": 1.0}})
+    [('npv', 'floats', 1.0, 1.3)]
+    >>> compare({"npv": {"floats": 1.2}}, {"npv": {"floats": 1.0}})
+    []
+    >>> compare({"import model": {"import": 1.9}}, {"import model": {"import": 1.0}})
+    []
+    """
+    regressions = []
+    for name, times in results.items():
+        for mode, seconds in times.items():
+            before = baseline.get(name, {}).get(mode)
+            limit = import_threshold if mode == "import" else threshold
+            if before is not None and seconds > before * (1 + limit):
+                regressions.append((name, mode, before, seconds))
+    return regressions
+
+
+def report(
+    results, baseline=None, threshold=THRESHOLD, import_threshold=IMPORT_THRESHOLD
+):
+    """Return the table of the timings, with the speedup and the change from baseline."""
+    baseline = baseline or {}
+    regressions = {
+        (name, mode)
+        for name, mode, _, _ in compare(results, baseline, threshold, import_threshold)
+    }
+    header = "{:32}{:>10}{:>14}{:>10}{:>10}"
+    lines = [header.format("Benchmark", "Mode", "Time", "Speedup", "Change")]
+    for name, times in results.items():
+        for mode, seconds in times.items():
+            speedup = ""
+            if mode == "floats" and "quantities" in times:
+                speedup = "{:.1f}x".format(times["quantities"] / seconds)
+            change = ""
+            if mode in baseline.get(name, {}):
+                change = "{:+.0%}".format(seconds / baseline[name][mode] - 1)
+            flag = "  REGRESSION" if (name, mode) in regressions else ""
+            lines.append(
+                "{:32}{:>10}{:>12.3f}ms{:>10}{:>10}{}".format(
+                    name, mode, seconds * 1000, speedup, change, flag
+                )
+            )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command line interface, see module docstring."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", help="benchmarks whose name contains")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-imports", action="store_true", help="skip import times")
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--baseline", help="compare with results saved before")
+    parser.add_argument(
+        "--threshold", type=float, default=THRESHOLD, help="relative slowdown flagged"
+    )
+    parser.add_argument(
+        "--import-threshold",
+        type=float,
+        default=IMPORT_THRESHOLD,
+        help="relative slowdown of import times flagged",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+    results = run_suite(args.only, args.modes, args.repeat, not args.no_imports)
+    print(report(results, baseline, args.threshold, args.import_threshold))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(
+                {
+                    "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "python": platform.python_version(),
+                    "machine": platform.platform(),
+                    "results": results,
+                },
+                file,
+                indent=1,
+            )
+    if baseline is not None and compare(
+        results, baseline, args.threshold, args.import_threshold
+    ):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -258,6 +258,8 @@ for key in fuel_price["gas_IEA"]:
 # %%
 
 # Expand table imported manuscript1.parameter.py
+# into a dict, since natural gas has no PM2.5 factor
+emission_factor = dict(emission_factor)
 
 emission_factor["natural_gas"] = {
     "CO2": 0.0561 * kg / MJ * natural_gas.heat_value,  # IPCC 2006
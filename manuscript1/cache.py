@@ -0,0 +1,234 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Output cache for the table and figure generators
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Replay the output of a table or figure generator when nothing relevant changed.
+
+Each generator module in  manuscript1.table  and  manuscript1.figure  declares at
+module level the names it reads from  manuscript1.parameters  in a tuple  PARAMETERS.
+Figure generators also declare the file they write in  FIGURE_FILE. The declarations are
+read from the source code, the generator is not imported to find them.
+
+The cache key hashes the source of the generator and of every module of the project
+it imports, directly or not, the data files they name, the source of the  model
+package and the values of the declared parameters, see  model.hashing.
+On a hit the previous output bytes are replayed, on a miss the generator runs
+and its output is stored.
+Entries live in a local directory, the least recently used are evicted
+when the directory grows larger than  max_size  bytes.
+
+Usage, from the project root directory:
+    python -m manuscript1.cache manuscript1.table.jobs > table_jobs.txt
+    python -m manuscript1.cache --stats
+    python -m manuscript1.cache --clear [manuscript1.table.jobs ...]
+"""
+
+import ast
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from hashlib import sha256
+from importlib import import_module
+from importlib.util import find_spec
+from pathlib import Path
+from runpy import run_module
+
+from model.hashing import fingerprint, model_digest, source_digest
+
+CACHE_DIR = os.environ.get("COFIRING_CACHE_DIR", ".cache/outputs")
+MAX_SIZE = 64 * 1024 * 1024  # bytes
+
+
+#%% Cache keys
+
+
+def declarations(module_name):
+    """Return the PARAMETERS and FIGURE_FILE declared in a generator, without running it."""
+    source = Path(find_spec(module_name).origin).read_text()
+    declared = {"PARAMETERS": (), "FIGURE_FILE": None}
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id in declared:
+                    declared[target.id] = ast.literal_eval(node.value)
+    return declared["PARAMETERS"], declared["FIGURE_FILE"]
+
+
+def cache_key(module_name):
+    """Return the cache key of a generator: the sources and data it depends on, its parameters."""
+    parameters, figure = declarations(module_name)
+    values = import_module("manuscript1.parameters")
+    digest = sha256()
+    digest.update(module_name.encode())
+    digest.update(source_digest([module_name]).encode())
+    digest.update(model_digest().encode())
+    digest.update(str(figure).encode())
+    for name in parameters:
+        assert hasattr(values, name), f"{module_name} declares unknown parameter {name}"
+        digest.update(name.encode())
+        digest.update(fingerprint(getattr(values, name)).encode())
+    return digest.hexdigest()
+
+
+#%% Storage
+
+
+class OutputCache:
+    """A directory of generator outputs, with LRU eviction and hit statistics.
+
+    Each entry is a subdirectory named  module-key  holding the bytes written
+    to standard output, and the figure file if any.
+    The modification time of an entry is its last use.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_size=MAX_SIZE):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _entry(self, module_name, key):
+        return self.directory / f"{module_name}-{key}"
+
+    def entries(self):
+        """Return the entry directories, least recently used first."""
+        entries = [path for path in self.directory.iterdir() if path.is_dir()]
+        return sorted(entries, key=lambda path: path.stat().st_mtime)
+
+    @staticmethod
+    def entry_size(entry):
+        return sum(path.stat().st_size for path in entry.iterdir())
+
+    def get(self, module_name, key):
+        """Return the entry directory if present, else None. Count the hit or miss."""
+        entry = self._entry(module_name, key)
+        if entry.is_dir():
+            os.utime(entry)
+            self._count("hits")
+            return entry
+        self._count("misses")
+        return None
+
+    def put(self, module_name, key, output, figure=None):
+        """Store the output bytes, and a copy of the figure file if any, then evict."""
+        temporary = Path(tempfile.mkdtemp(dir=self.directory, prefix=".tmp-"))
+        (temporary / "stdout").write_bytes(output)
+        if figure is not None:
+            shutil.copyfile(figure, temporary / Path(figure).name)
+        entry = self._entry(module_name, key)
+        if entry.is_dir():
+            shutil.rmtree(entry)
+        os.replace(temporary, entry)
+        self.evict(keep=entry)
+        return entry
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits in max_size."""
+        entries = self.entries()
+        total = sum(self.entry_size(entry) for entry in entries)
+        for entry in entries:
+            if total <= self.max_size:
+                break
+            if entry == keep:
+                continue
+            total -= self.entry_size(entry)
+            shutil.rmtree(entry)
+            self._count("evictions")
+
+    def invalidate(self, module_name=None):
+        """Remove the entries of one generator, or all entries. Return how many."""
+        removed = 0
+        for entry in self.entries():
+            if module_name is None or entry.name.startswith(module_name + "-"):
+                shutil.rmtree(entry)
+                removed += 1
+        return removed
+
+    def _stats_file(self):
+        return self.directory / "stats.json"
+
+    def _count(self, counter):
+        counters = self.counters()
+        counters[counter] = counters.get(counter, 0) + 1
+        temporary = self._stats_file().with_suffix(".tmp")
+        temporary.write_text(json.dumps(counters))
+        os.replace(temporary, self._stats_file())
+
+    def counters(self):
+        try:
+            return json.loads(self._stats_file().read_text())
+        except FileNotFoundError:
+            return {}
+
+    def stats(self):
+        """Return a dict with hits, misses, evictions, number of entries and size in bytes."""
+        result = {"hits": 0, "misses": 0, "evictions": 0}
+        result.update(self.counters())
+        entries = self.entries()
+        result["entries"] = len(entries)
+        result["size"] = sum(self.entry_size(entry) for entry in entries)
+        result["max_size"] = self.max_size
+        return result
+
+
+#%% Running generators
+
+
+def run(module_name, cache):
+    """Return the standard output bytes of a generator, replayed from cache if possible.
+
+    On a hit, the figure file declared by the generator is restored too.
+    """
+    _, figure = declarations(module_name)
+    key = cache_key(module_name)
+    entry = cache.get(module_name, key)
+    if entry is not None:
+        if figure is not None:
+            shutil.copyfile(entry / Path(figure).name, figure)
+        return (entry / "stdout").read_bytes()
+
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        run_module(module_name, run_name="__main__", alter_sys=True)
+    output = buffer.getvalue().encode()
+    cache.put(module_name, key, output, figure)
+    return output
+
+
+def main(argv=None):
+    """Command line interface, see module docstring."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", help="generator modules to run")
+    parser.add_argument("--directory", default=CACHE_DIR, help="cache directory")
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE, help="in bytes")
+    parser.add_argument("--stats", action="store_true", help="print cache statistics")
+    parser.add_argument("--clear", action="store_true", help="invalidate entries")
+    args = parser.parse_args(argv)
+
+    cache = OutputCache(args.directory, args.max_size)
+    if args.clear:
+        if args.modules:
+            removed = sum(cache.invalidate(module) for module in args.modules)
+        else:
+            removed = cache.invalidate()
+        print(f"Removed {removed} cache entries.", file=sys.stderr)
+    elif args.stats:
+        for name, value in cache.stats().items():
+            print(f"{name:12}{value:>14}")
+    else:
+        for module_name in args.modules:
+            sys.stdout.buffer.write(run(module_name, cache))
+            sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
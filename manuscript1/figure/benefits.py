@@ -21,6 +21,18 @@ from manuscript1.parameters import (
 )
 from manuscript1.parameters import NinhBinhSystem, price_NB
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = (
+    "discount_rate",
+    "tax_rate",
+    "depreciation_period",
+    "economic_horizon",
+    "external_cost",
+    "NinhBinhSystem",
+    "price_NB",
+)
+FIGURE_FILE = "figure_benefits.pdf"
+
 HORIZON = TIME_HORIZON
 
 
@@ -108,4 +120,4 @@ plt.yticks(
 plt.legend(bbox_to_anchor=(0.98, 0.4), prop={"size": 12}, frameon=False)
 plt.tight_layout()
 
-plt.savefig("figure_benefits.pdf")
+plt.savefig(FIGURE_FILE)
@@ -21,6 +21,15 @@ from manuscript1.parameters import (
 
 from model.utils import kUSD, array, cumsum, roll
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = (
+    "MongDuong1System",
+    "NinhBinhSystem",
+    "depreciation_period",
+    "external_cost",
+)
+FIGURE_FILE = "figure_cba.pdf"
+
 #%%
 
 
@@ -179,4 +188,4 @@ plot_cba(MongDuong1System, AXESS[0])
 plot_cba(NinhBinhSystem, AXESS[1])
 FIGURE.tight_layout()
 
-plt.savefig("figure_cba.pdf")
+plt.savefig(FIGURE_FILE)
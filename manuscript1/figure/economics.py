@@ -19,6 +19,10 @@ from model.wtawtp import farmer_gain, farmer_wta, plant_gain, plant_wtp
 from manuscript1.parameters import MongDuong1System, NinhBinhSystem
 from manuscript1.parameters import discount_rate, economic_horizon
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = ("MongDuong1System", "NinhBinhSystem", "discount_rate", "economic_horizon")
+FIGURE_FILE = "figure_economics.pdf"
+
 
 #%%
 
@@ -81,4 +85,4 @@ plot_feasibility(MongDuong1System, axes[0])
 plot_feasibility(NinhBinhSystem, axes[1])
 figure.tight_layout()
 
-plt.savefig("figure_economics.pdf")
+plt.savefig(FIGURE_FILE)
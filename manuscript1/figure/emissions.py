@@ -16,6 +16,10 @@ import matplotlib.patches as mpatches
 from manuscript1.parameters import MongDuong1System, NinhBinhSystem
 from model.utils import kt, Mt, y, array, concatenate
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = ("MongDuong1System", "NinhBinhSystem")
+FIGURE_FILE = "figure_emissions.pdf"
+
 #%%
 
 
@@ -113,4 +117,4 @@ plot_emissions(MongDuong1System, AXESS[0])
 plot_emissions(NinhBinhSystem, AXESS[1])
 FIGURE.tight_layout()
 
-plt.savefig("figure_emissions.pdf")
+plt.savefig(FIGURE_FILE)
@@ -22,9 +22,11 @@ from model.utils import MJ, kg, t, d, hr, km, MW, ha, kW, y, kWh, MWh, g
 from model.system import System, Price
 from model.powerplant import Fuel, PlantParameter
 from model.cofiringplant import CofiringParameter
+from model.curves import Polynomial
 from model.farmer import FarmerParameter
 from model.reseller import ResellerParameter
 from model.system import MiningParameter
+from model.emitter import EmissionFactorTable
 
 from manuscript1.parameters_supplychain import supply_chain_MD1, supply_chain_NB
 
@@ -248,6 +250,9 @@ emission_factor["straw_boiler"] = {
     "PM2.5": 6.28 * kg / t,
 }  # idem
 
+# Compiled once into a matrix, activities refer to its rows
+emission_factor = EmissionFactorTable(emission_factor)
+
 # hourly wage calculated from base salary defined in governmental regulations
 farm_parameter = FarmerParameter(
     winder_rental_cost=40 * USD / ha,  # per period
@@ -303,7 +308,7 @@ cofire_MD1 = CofiringParameter(
     cofire_rate=0.05,
     cofuel=straw,
     # Tillman (2000) r mass ratio
-    boiler_efficiency_loss=lambda r: 0.0044 * r ** 2 + 0.0055 * r,
+    boiler_efficiency_loss=Polynomial([0, 0.0055, 0.0044]),
 )
 
 price_MD1 = Price(
@@ -25,6 +25,16 @@ from manuscript1.parameters import (
     farm_parameter,
 )
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = (
+    "MongDuong1System",
+    "NinhBinhSystem",
+    "discount_rate",
+    "economic_horizon",
+    "depreciation_period",
+    "farm_parameter",
+)
+
 print("Submitted manuscript discounts at rate 0.1 per year over 21 years.")
 print("In revision use the tables with discount (0%) over 10 years.")
 print("Also suggest to drop ros Business value per year since already in Figure 5")
@@ -23,6 +23,14 @@ from manuscript1.parameters import (
 from model.tables import coal_saved_benefit
 from model.utils import display_as
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = (
+    "MongDuong1System",
+    "NinhBinhSystem",
+    "discount_rate",
+    "coal_import_price",
+)
+
 
 #%%
 
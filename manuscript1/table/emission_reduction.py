@@ -15,6 +15,9 @@ An Ha Truong, Minh Ha-Duong
 from manuscript1.parameters import MongDuong1System, NinhBinhSystem, external_cost
 from model.tables import emissions_reduction_ICERE
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = ("MongDuong1System", "NinhBinhSystem", "external_cost")
+
 
 print(
     """Emission reductions from the two projects
@@ -17,6 +17,9 @@ from pandas import set_option
 from manuscript1.parameters import MongDuong1System, NinhBinhSystem
 from model.tables import balance_jobs
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = ("MongDuong1System", "NinhBinhSystem")
+
 
 set_option("display.float_format", "{:,.1f}".format)
 
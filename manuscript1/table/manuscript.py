@@ -33,6 +33,19 @@ from model.tables import (
 )
 from model.utils import display_as
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = (
+    "MongDuong1System",
+    "NinhBinhSystem",
+    "discount_rate",
+    "economic_horizon",
+    "tax_rate",
+    "depreciation_period",
+    "external_cost_SKC",
+    "external_cost_ZWY",
+    "external_cost_HAS",
+)
+
 
 table_separator = "\n=================\n"
 
@@ -25,6 +25,18 @@ from manuscript1.parameters import (
 
 from model.utils import display_as
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = (
+    "MongDuong1System",
+    "NinhBinhSystem",
+    "discount_rate",
+    "economic_horizon",
+    "tax_rate",
+    "depreciation_period",
+    "price_MD1",
+    "price_NB",
+)
+
 
 print("Business value of cofiring for the three segments")
 print("Change in cash flow NPV,  ex post - ex ante")
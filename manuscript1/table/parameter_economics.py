@@ -21,6 +21,15 @@ from manuscript1.parameters import (
 )
 from model.utils import display_as
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = (
+    "discount_rate",
+    "economic_horizon",
+    "tax_rate",
+    "depreciation_period",
+    "coal_import_price",
+)
+
 
 print("Discount rate         ", discount_rate)
 print("Economic horizon      ", economic_horizon)
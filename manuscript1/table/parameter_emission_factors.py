@@ -12,16 +12,19 @@ An Ha Truong, Minh Ha-Duong
 2017-2019
 """
 
-from pandas import DataFrame, set_option
+from pandas import set_option
 from model.utils import kg, t, g, km
 
 from manuscript1.parameters import emission_factor
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = ("emission_factor",)
+
 set_option("display.max_colwidth", 40)
 set_option("display.max_columns", 10)
 set_option("display.width", 80)
 
-data = DataFrame.from_dict(emission_factor).transpose()
+data = emission_factor.to_frame()
 
 set_option("display.float_format", "{:9,.1f} kg/t".format)
 print(data.loc[["6b_coal", "4b_coal", "straw_boiler", "straw_open"]] / (kg / t))
@@ -17,6 +17,9 @@ from pandas import DataFrame, concat
 from manuscript1.parameters import MongDuong1System, NinhBinhSystem
 from model.powerplant import Fuel
 
+# Read from manuscript1.parameters, declared for the output cache.
+PARAMETERS = ("MongDuong1System", "NinhBinhSystem")
+
 
 def dict_to_df(stem, dictionary):
     """Cast a dictionary into DataFrame, stemming the keys."""
@@ -32,8 +35,6 @@ def fuel_to_df(stem, fuel):
 
 def scalar_to_df(index, value):
     """Cast a scalar into a DataFrame."""
-    if index == "boiler_efficiency_loss":
-        value = "0.0044 r^2 + 0.0055 r"
     return DataFrame([value], index=[index])
 
 
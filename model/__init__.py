@@ -1 +1,11 @@
-"""Empty __init__.py required by pylint, hopefully not for long."""
+"""Empty __init__.py required by pylint, hopefully not for long.
+
+Setting the environment variable  COFIRING_PROFILE  profiles the model, see  model.profiling.
+"""
+
+import os
+
+if os.environ.get("COFIRING_PROFILE"):
+    from model.profiling import enable_from_environment
+
+    enable_from_environment()
@@ -14,6 +14,7 @@ from abc import abstractmethod
 
 from pandas import Series, DataFrame
 from model.utils import USD, TIME_HORIZON, after_invest, display_as, isclose, zeros, npv
+from model.utils import unit_value
 
 
 class Accountholder:
@@ -55,12 +56,16 @@ class Accountholder:
     -1 kUSD
     """
 
-    def __init__(self, name, time_horizon=TIME_HORIZON, amount_invested=0 * USD):
+    def __init__(self, name, time_horizon=TIME_HORIZON, amount_invested=None):
+        if amount_invested is None:
+            amount_invested = 0 * unit_value(USD)
         self.amount_invested = display_as(amount_invested, "kUSD")
         self.name = name
         self.time_horizon = time_horizon
         self._revenue = None
-        self.merchandise = display_as(zeros(self.time_horizon + 1) * USD, "kUSD")
+        self.merchandise = display_as(
+            zeros(self.time_horizon + 1) * unit_value(USD), "kUSD"
+        )
         self.expenses = []
         self.expenses_index = []
 
@@ -86,12 +91,12 @@ class Accountholder:
         return display_as(v_invest * self.amount_invested / sum(v_invest), "kUSD")
 
     def operating_expenses(self):
-        return display_as(zeros(self.time_horizon + 1) * USD, "kUSD")
+        return display_as(zeros(self.time_horizon + 1) * unit_value(USD), "kUSD")
 
     def amortization(self, depreciation_period):
         """Return vector of linear amortization amounts."""
         if not self.amount_invested:
-            return display_as(zeros(self.time_horizon + 1) * USD, "kUSD")
+            return display_as(zeros(self.time_horizon + 1) * unit_value(USD), "kUSD")
         assert isinstance(
             depreciation_period, int
         ), "Depreciation period not an integer"
@@ -99,7 +104,7 @@ class Accountholder:
         assert (
             depreciation_period < self.time_horizon - 1
         ), "Depreciation >= timehorizon - 2 year"
-        v_cost = zeros(self.time_horizon + 1).copy() * USD
+        v_cost = zeros(self.time_horizon + 1).copy() * unit_value(USD)
         for year in range(1, depreciation_period + 1):
             v_cost[year] = self.amount_invested / float(depreciation_period)
         return display_as(v_cost, "kUSD")
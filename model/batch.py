@@ -0,0 +1,168 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Batch runner for scenario files
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Evaluate scenario files from the command line, and print a table of results.
+
+Each scenario of the files, see  model.scenario, runs in float mode at the discount
+rate and horizon of its economics section. The result is a  model.result.SystemResult,
+shown in the units of  model.result.FIELDS. Infeasible scenarios, for example
+when the supply chain has not enough straw, get NaN results.
+
+The scenarios are cut in chunks, evaluated by a pool of worker processes.
+Workers read the scenario files themselves, only the results are sent back.
+The csv and jsonl formats stream the rows, in order, as the chunks complete.
+The table format prints when all are done.
+
+Usage, from the project root directory:
+    python -m model.batch Data/scenarios/MD1.json Data/scenarios/NB.json
+    python -m model.batch Data/scenarios --jobs 4 --format csv --progress > out.csv
+"""
+
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from csv import DictWriter
+from pathlib import Path
+
+from pandas import DataFrame
+
+from model.result import FIELD_NAMES, FIELDS, SystemResult
+from model.scenario import load_scenarios
+from model.utils import float_mode, in_unit
+
+CHUNK_SIZE = 10
+
+FORMATS = ["table", "csv", "jsonl"]
+
+
+def scenario_files(paths):
+    """Return the scenario files, the .json files of directories in name order."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.json")) if path.is_dir() else [path])
+    return [file.resolve() for file in files]
+
+
+def chunks(files, chunk_size=CHUNK_SIZE):
+    """Return the tasks (file, start, stop) cutting the scenarios of the files in chunks."""
+    tasks = []
+    for file in files:
+        count = len(load_scenarios(file))
+        for start in range(0, count, chunk_size):
+            tasks.append((str(file), start, min(start + chunk_size, count)))
+    return tasks
+
+
+def evaluate(scenario):
+    """Return the SystemResult of a scenario, NaN if the model asserts it is infeasible."""
+    economics = scenario.economics
+    try:
+        with float_mode():
+            result = SystemResult.from_system(
+                scenario.system(),
+                economics.discount_rate,
+                economics.horizon,
+                scenario.external_cost,
+            )
+    except AssertionError:
+        return SystemResult(scenario.name)
+    result.name = scenario.name
+    return result
+
+
+def evaluate_chunk(task):
+    """Return the results of the scenarios of a task, as dicts in display units."""
+    file, start, stop = task
+    return [as_row(evaluate(s)) for s in load_scenarios(file)[start:stop]]
+
+
+def as_row(result):
+    """Return a SystemResult as a dict, in the display units of FIELDS."""
+    row = {"name": result.name}
+    for field, unit in FIELDS:
+        row[field] = float(in_unit(getattr(result, field), unit))
+    return row
+
+
+def run(tasks, jobs=1):
+    """Yield the results of the tasks in order, a list of rows per task.
+
+    With more than one job, the tasks run in a pool of worker processes.
+    """
+    if jobs == 1:
+        yield from map(evaluate_chunk, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            yield from pool.map(evaluate_chunk, tasks)
+
+
+def write(results, output_format, file=None, progress=None):
+    """Write the rows of the results, streaming as they come except for a table.
+
+    file defaults to the standard output, progress is called with the number of
+    chunks done.
+    """
+    file = file or sys.stdout
+    table = []
+    if output_format == "csv":
+        writer = DictWriter(file, ["name"] + list(FIELD_NAMES))
+        writer.writeheader()
+    for done, rows in enumerate(results, 1):
+        if output_format == "table":
+            table.extend(rows)
+        elif output_format == "csv":
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                row = {k: None if v != v else v for k, v in row.items()}  # NaN
+                file.write(json.dumps(row) + "\n")
+        file.flush()
+        if progress is not None:
+            progress(done)
+    if output_format == "table":
+        file.write(DataFrame(table).set_index("name").T.to_string() + "\n")
+
+
+def main(argv=None):
+    """Command line interface, see module docstring."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="scenario files or directories")
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="worker processes, 0 for one per CPU"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=CHUNK_SIZE, help="scenarios per task"
+    )
+    parser.add_argument("--format", choices=FORMATS, default="table")
+    parser.add_argument(
+        "--progress", action="store_true", help="report progress on stderr"
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 0 or args.chunk_size < 1:
+        parser.error("--jobs must be positive or 0, --chunk-size at least 1")
+
+    try:
+        tasks = chunks(scenario_files(args.files), args.chunk_size)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    progress = None
+    if args.progress:
+
+        def progress(done):
+            print(f"{done}/{len(tasks)} chunks", file=sys.stderr)
+
+    jobs = args.jobs or os.cpu_count()
+    write(run(tasks, jobs), args.format, progress=progress)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,10 +21,12 @@ from model.utils import (
     TIME_HORIZON,
     npv,
     after_invest,
+    unit_value,
 )
 
 from model.powerplant import PowerPlant
 from model.emitter import Activity
+from model.dispatch import annual_factors
 
 
 CofiringParameter = namedtuple(
@@ -49,19 +51,28 @@ class CofiringPlant(PowerPlant):
     For example the fuel is coal, the cofuel is biomass.
     """
 
-    def __init__(self, plant_parameter, cofire_parameter, emission_factor):
+    def __init__(
+        self, plant_parameter, cofire_parameter, emission_factor, dispatch=None
+    ):
         """Initialize the cofiring plant.
 
         1/ Instanciate as a PowerPlant with a lower efficiency and higher capital cost
         2/ Compute the co-fuel used and main fuel saved
         3/ Overwrite the list of activities from grandparent class Emitter.
 
+        In hourly mode, the cofuel is fired only during the hours of the
+        dispatch cofiring schedule.
+
         The financials (revenue, mainfuel_cost, cofuel_cost) are not initialized at this time,
         they must be defined later.
         """
         self.cofire_parameter = cofire_parameter
 
         self.cofuel_ratio_energy = after_invest(cofire_parameter.cofire_rate)
+        if dispatch is not None:
+            self.cofuel_ratio_energy = (
+                self.cofuel_ratio_energy * annual_factors(dispatch).cofire_share
+            )
 
         cofuel_ratio_mass = (
             self.cofuel_ratio_energy
@@ -86,6 +97,7 @@ class CofiringPlant(PowerPlant):
                 * plant_parameter.capacity
                 * cofire_parameter.cofire_rate
             ),
+            dispatch=dispatch,
         )
 
         self.name = plant_parameter.name + " Cofire"
@@ -148,7 +160,7 @@ class CofiringPlant(PowerPlant):
             (1 - self.cofuel_ratio_energy)
             * self.parameter.fix_om_main
             * self.parameter.capacity
-            * y
+            * unit_value(y)
         )
         # Variable costs proportional to generation after capacity factor
         variable_om_main = (
@@ -183,7 +195,7 @@ class CofiringPlant(PowerPlant):
             self.cofuel_ratio_energy
             * self.cofire_parameter.fix_om_cost
             * self.parameter.capacity
-            * y
+            * unit_value(y)
         )
         var_om_bm = (
             self.cofuel_ratio_energy
@@ -218,12 +230,12 @@ class CofiringPlant(PowerPlant):
         statement = PowerPlant.lcoe_statement(
             self, discount_rate, horizon, tax_rate, depreciation_period
         )
-        statement["  Cofuel      (MUSD)"] = (
-            npv(self.cofuel_cost, discount_rate, horizon) / MUSD
-        )
-        statement["  O&M Cofuel  (MUSD)"] = (
-            npv(self.cofuel_om_cost(), discount_rate, horizon) / MUSD
-        )
+        statement["  Cofuel      (MUSD)"] = npv(
+            self.cofuel_cost, discount_rate, horizon
+        ) / unit_value(MUSD)
+        statement["  O&M Cofuel  (MUSD)"] = npv(
+            self.cofuel_om_cost(), discount_rate, horizon
+        ) / unit_value(MUSD)
         return statement
 
     def parameters_table(self):
@@ -235,4 +247,5 @@ class CofiringPlant(PowerPlant):
         display_as(b.loc["fix_om_cost"], "USD / kW / y")
         display_as(b.loc["variable_om_cost"], "USD / kWh")
         display_as(b.loc["wage_operation_maintenance"], "USD / hr")
+        b["boiler_efficiency_loss"] = str(self.cofire_parameter.boiler_efficiency_loss)
         return concat([a, b])
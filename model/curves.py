@@ -0,0 +1,97 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Curves
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Define curves by their data, usable in parameters where a function is expected.
+
+A curve is a named tuple, so unlike a lambda it can be pickled to worker processes,
+hashed for memoization, fingerprinted for the cache and written to JSON.
+It evaluates elementwise over an array, like the boiler efficiency loss
+as a function of the cofiring mass ratio.
+
+>>> tillman = Polynomial([0, 0.0055, 0.0044])
+>>> print(tillman)
+0.0044 r^2 + 0.0055 r
+>>> tillman(0.1) == 0.0044 * 0.1 ** 2 + 0.0055 * 0.1
+True
+>>> curve_from_dict(tillman.as_dict()) == tillman
+True
+>>> PiecewiseLinear([0, 0.1, 0.2], [0, 0.001, 0.004])([0.05, 0.15, 0.3])
+array([0.0005, 0.0025, 0.004 ])
+"""
+
+from collections import namedtuple
+
+from numpy import asarray, interp
+
+
+class Polynomial(namedtuple("Polynomial", "coefficients")):
+    """A polynomial, with the coefficients by increasing degree."""
+
+    __slots__ = ()
+
+    def __new__(cls, coefficients):
+        """Store the coefficients as a tuple of floats, to be hashable."""
+        return super().__new__(cls, tuple(float(c) for c in coefficients))
+
+    def __call__(self, r):
+        """Return the value at r, summing the terms in the order of a hand written formula."""
+        result = 0
+        for power, coefficient in reversed(list(enumerate(self.coefficients))):
+            if coefficient:
+                term = coefficient if power == 0 else coefficient * r ** power
+                result = result + term
+        return result
+
+    def __str__(self):
+        terms = []
+        for power, coefficient in reversed(list(enumerate(self.coefficients))):
+            if coefficient:
+                variable = {0: "", 1: " r"}.get(power, f" r^{power}")
+                terms.append(f"{coefficient:g}{variable}")
+        return " + ".join(terms) or "0"
+
+    def as_dict(self):
+        """Return a dict of builtin types, for JSON."""
+        return {"kind": "Polynomial", "coefficients": list(self.coefficients)}
+
+
+class PiecewiseLinear(namedtuple("PiecewiseLinear", "x y")):
+    """A tabulated curve, interpolated linearly and constant beyond the ends.
+
+    The x must be increasing. Evaluates on floats.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, x, y):
+        """Store the table as tuples of floats, to be hashable."""
+        assert len(x) == len(y), "Expecting as many x as y values"
+        return super().__new__(cls, tuple(map(float, x)), tuple(map(float, y)))
+
+    def __call__(self, r):
+        """Return the interpolated values at r."""
+        return interp(asarray(r, dtype=float), self.x, self.y)
+
+    def __str__(self):
+        points = ", ".join(f"({x:g}, {y:g})" for x, y in zip(self.x, self.y))
+        return f"piecewise linear {points}"
+
+    def as_dict(self):
+        """Return a dict of builtin types, for JSON."""
+        return {"kind": "PiecewiseLinear", "x": list(self.x), "y": list(self.y)}
+
+
+CURVES = {"Polynomial": Polynomial, "PiecewiseLinear": PiecewiseLinear}
+
+
+def curve_from_dict(data):
+    """Return the curve described by a dict from  as_dict."""
+    fields = dict(data)
+    kind = fields.pop("kind")
+    assert kind in CURVES, f"Unknown curve kind {kind}"
+    return CURVES[kind](**fields)
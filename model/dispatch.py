@@ -0,0 +1,99 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Hourly dispatch
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Simulate the plant hour by hour over the year, and aggregate it to annual factors.
+
+By default  PowerPlant  runs at a flat capacity factor. The hourly mode takes
+a load profile instead: the output of the plant as a fraction of its capacity
+during each period of the year, 8760 hours or any other number of equal steps.
+The efficiency falls at part load, following a curve of relative efficiency
+against load. The cofuel is fired only during the hours of a cofiring schedule,
+for example above a minimum load, or when straw is available.
+
+The profile reduces to three annual factors, used by the plant classes in place
+of the capacity factor, and as multipliers of the efficiency and of the cofire rate:
+    load_factor         the mean load,
+    part_load_derating  the full-load heat input over the actual heat input, at same output,
+    cofire_share        the share of the heat input which falls in the cofiring hours.
+
+The fuel, straw and emissions per year follow from the annual heat input.
+The boiler efficiency loss due to cofiring remains computed on the annual cofuel ratio.
+
+Profiles are arrays with the hours along the last axis. Leading axes, like years
+or scenarios, are kept in the factors. There are no loops over hours.
+The capacity, efficiency and cofire rate factor out of the hourly sums,
+so scenarios which differ only by these share the same profile reduction.
+
+>>> from numpy import linspace
+>>> load = linspace(0.4, 1, 8760)
+>>> factors = annual_factors(Dispatch(load, SUBCRITICAL_COAL, load > 0.5))
+>>> print(factors.load_factor.round(3), factors.part_load_derating.round(3))
+0.7 0.965
+>>> print(factors.cofire_share.round(3))
+0.886
+"""
+
+from collections import namedtuple
+
+from numpy import asarray, interp, ones_like, where
+
+PartLoadCurve = namedtuple("PartLoadCurve", "load relative_efficiency")
+PartLoadCurve.__doc__ = """The efficiency at part load relative to full load,
+at increasing loads. Interpolated linearly, constant beyond the ends."""
+
+FLAT = PartLoadCurve([0.0, 1.0], [1.0, 1.0])
+
+# Indicative curve for a subcritical coal unit, the heat rate rises about 8% at half load
+SUBCRITICAL_COAL = PartLoadCurve([0.3, 0.5, 0.75, 1.0], [0.85, 0.925, 0.975, 1.0])
+
+Dispatch = namedtuple(
+    "Dispatch", "load part_load_curve cofire_schedule", defaults=(FLAT, None)
+)
+Dispatch.__doc__ = """The hourly operation of a plant.
+
+load: the output as a fraction of the capacity, hours along the last axis
+part_load_curve: a PartLoadCurve
+cofire_schedule: the fraction of the cofire rate fired each hour, from 0 to 1,
+    broadcastable to the load. None to cofire at every hour."""
+
+AnnualFactors = namedtuple(
+    "AnnualFactors", "load_factor part_load_derating cofire_share"
+)
+
+
+def cofiring_schedule(load, minimum_load=0.0, available=True):
+    """Return the hours when cofiring is possible, as 0 or 1.
+
+    The plant cofires when the load is at least  minimum_load, and the straw is
+    available, a boolean array broadcastable to the load, for example by season.
+
+    >>> cofiring_schedule([0.3, 0.6, 0.9], 0.5, [True, True, False])
+    array([0., 1., 0.])
+    """
+    load = asarray(load, dtype=float)
+    return ((load >= minimum_load) & asarray(available)).astype(float)
+
+
+def annual_factors(dispatch):
+    """Reduce the hourly operation to AnnualFactors, summing along the last axis."""
+    load = asarray(dispatch.load, dtype=float)
+    assert (load >= 0).all() and (load <= 1).all(), "Load out of [0, 1] capacity"
+    curve = dispatch.part_load_curve
+    relative_efficiency = interp(load, curve.load, curve.relative_efficiency)
+    heat = load / relative_efficiency
+    if dispatch.cofire_schedule is None:
+        schedule = ones_like(load)
+    else:
+        schedule = asarray(dispatch.cofire_schedule, dtype=float)
+    total_heat = heat.sum(axis=-1)
+    load_factor = load.mean(axis=-1)
+    idle = total_heat == 0
+    safe_heat = where(idle, 1, total_heat)
+    part_load_derating = where(idle, 1, load.sum(axis=-1) / safe_heat)
+    cofire_share = where(idle, 0, (heat * schedule).sum(axis=-1) / safe_heat)
+    return AnnualFactors(load_factor, part_load_derating, cofire_share)
@@ -0,0 +1,194 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Dual numbers
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Dual numbers, for forward mode derivatives of the model in float mode.
+
+A dual number carries a value and its gradient with respect to k inputs.
+Arithmetic on dual numbers follows the chain rule, so running the model on
+dual inputs returns the results and their gradients in one evaluation.
+Dual numbers thread into NumPy object arrays and pandas objects like floats,
+except that comparisons, as in  max  or  where, only look at the value.
+
+>>> x, y = seed([3.0, 2.0])
+>>> z = x * y + x ** 2
+>>> z
+Dual(15.0, [8. 3.])
+>>> (1 / x).value, (1 / x).grad[0]
+(0.3333333333333333, -0.1111111111111111)
+"""
+
+import math
+
+from numpy import asarray, eye, zeros
+
+
+class Dual:
+    """A float with its gradient, an array of derivatives."""
+
+    __slots__ = ("value", "grad")
+
+    def __init__(self, value, grad):
+        """Initialize with the value and the gradient vector."""
+        self.value = float(value)
+        self.grad = grad
+
+    def __repr__(self):
+        return f"Dual({self.value}, {self.grad})"
+
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value + other.value, self.grad + other.grad)
+        if _is_array(other):
+            return NotImplemented
+        return Dual(self.value + other, self.grad)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value - other.value, self.grad - other.grad)
+        if _is_array(other):
+            return NotImplemented
+        return Dual(self.value - other, self.grad)
+
+    def __rsub__(self, other):
+        return Dual(other - self.value, -self.grad)
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            return Dual(
+                self.value * other.value,
+                self.grad * other.value + other.grad * self.value,
+            )
+        if _is_array(other):
+            return NotImplemented
+        return Dual(self.value * other, self.grad * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            quotient = self.value / other.value
+            return Dual(quotient, (self.grad - other.grad * quotient) / other.value)
+        if _is_array(other):
+            return NotImplemented
+        return Dual(self.value / other, self.grad / other)
+
+    def __rtruediv__(self, other):
+        quotient = other / self.value
+        return Dual(quotient, -self.grad * quotient / self.value)
+
+    def __pow__(self, exponent):
+        if isinstance(exponent, Dual):
+            power = self.value ** exponent.value
+            return Dual(
+                power,
+                power
+                * (
+                    exponent.grad * math.log(self.value)
+                    + exponent.value * self.grad / self.value
+                ),
+            )
+        if _is_array(exponent):
+            return NotImplemented
+        return Dual(
+            self.value ** exponent,
+            exponent * self.value ** (exponent - 1) * self.grad,
+        )
+
+    def __rpow__(self, base):
+        power = base ** self.value
+        return Dual(power, power * math.log(base) * self.grad)
+
+    def __neg__(self):
+        return Dual(-self.value, -self.grad)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self if self.value >= 0 else -self
+
+    def __eq__(self, other):
+        return self.value == _value_of(other)
+
+    def __ne__(self, other):
+        return self.value != _value_of(other)
+
+    def __lt__(self, other):
+        return self.value < _value_of(other)
+
+    def __le__(self, other):
+        return self.value <= _value_of(other)
+
+    def __gt__(self, other):
+        return self.value > _value_of(other)
+
+    def __ge__(self, other):
+        return self.value >= _value_of(other)
+
+    def __hash__(self):
+        # Equal values with different gradients hash apart, for memoization
+        return hash((self.value, asarray(self.grad).tobytes()))
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __float__(self):
+        """Return the value, dropping the gradient, as in  magnitudes  or in tests."""
+        return self.value
+
+    def sqrt(self):
+        """Return the square root, called by numpy.sqrt on object arrays."""
+        root = math.sqrt(self.value)
+        return Dual(root, self.grad / (2 * root))
+
+    def exp(self):
+        """Return the exponential, called by numpy.exp on object arrays."""
+        power = math.exp(self.value)
+        return Dual(power, power * self.grad)
+
+    def log(self):
+        """Return the natural logarithm, called by numpy.log on object arrays."""
+        return Dual(math.log(self.value), self.grad / self.value)
+
+
+def _is_array(obj):
+    """Return True if obj is an array, which handles the operation elementwise."""
+    return hasattr(obj, "__array__") and not isinstance(obj, (float, int))
+
+
+def _value_of(obj):
+    """Return the value of a dual number, or obj unchanged."""
+    return obj.value if isinstance(obj, Dual) else obj
+
+
+def seed(values):
+    """Return dual numbers for independent inputs, the gradient of each is a unit vector."""
+    values = asarray(values, dtype=float)
+    basis = eye(len(values))
+    return [Dual(v, basis[i]) for i, v in enumerate(values)]
+
+
+def value_of(obj):
+    """Return the value of a dual number, or of the elements of an array of them.
+
+    Plain numbers are returned unchanged.
+    """
+    if isinstance(obj, Dual):
+        return obj.value
+    if hasattr(obj, "__iter__"):
+        return asarray([value_of(x) for x in obj])
+    return obj
+
+
+def gradient_of(obj, k):
+    """Return the gradient of a dual number, zeros of size k for a constant."""
+    if isinstance(obj, Dual):
+        return obj.grad
+    return zeros(k)
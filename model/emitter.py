@@ -7,12 +7,150 @@
 #
 """Emitter: this class represents a system which emits pollutants."""
 from collections import namedtuple
+from collections.abc import Mapping
 
+from numpy import asarray
 from pandas import DataFrame
 
+from model.utils import using_floats, array_type, magnitudes, merge
+
 Activity = namedtuple("Activity", "name, level, emission_factor")
 
 
+class EmissionFactorTable(Mapping):
+    """Emission factors compiled into a matrix, sources in rows and pollutants in columns.
+
+    Built from a dict of dicts  {source: {pollutant: factor}},  where the source is a
+    fuel or a transport mode. The factors are normalized once to floats in base units,
+    the table remembers their units to give quantities back outside float mode.
+    Every source must have the same pollutants, in any order.
+
+    >>> table = EmissionFactorTable({'coal': {'CO2': 2, 'SO2': 0.1},
+    ...                              'diesel': {'CO2': 3, 'SO2': 0.01}})
+    >>> table.pollutants
+    ['CO2', 'SO2']
+    >>> table.matrix
+    array([[2.  , 0.1 ],
+           [3.  , 0.01]])
+
+    Indexing by source gives a row, usable as the emission factor of an Activity.
+
+    >>> dict(table['diesel'])
+    {'CO2': 3.0, 'SO2': 0.01}
+
+    The pollutants may come in another order for each source.
+
+    >>> EmissionFactorTable({'coal': {'CO2': 2, 'SO2': 0.1},
+    ...                      'diesel': {'SO2': 0.01, 'CO2': 3}}).matrix[1]
+    array([3.  , 0.01])
+
+    Many activity levels can be multiplied at once, giving (activities, pollutants, years).
+
+    >>> table.emissions(['coal', 'diesel'], [[10, 20], [1, 1]])[:, 0]
+    array([[20.0, 40.0],
+           [3.0, 3.0]], dtype=object)
+    """
+
+    def __init__(self, factors):
+        self.sources = list(factors)
+        self.index = {source: row for row, source in enumerate(self.sources)}
+        self.pollutants = list(next(iter(factors.values())))
+        for source, row in factors.items():
+            assert set(row) == set(self.pollutants), (
+                f"Emission factors of {source} are for {list(row)}, "
+                f"expecting {self.pollutants}"
+            )
+        cells = asarray(
+            [
+                [row[pollutant] for pollutant in self.pollutants]
+                for row in factors.values()
+            ],
+            dtype=object,
+        )
+        self.matrix = magnitudes(cells)
+        units = [merge(1.0, cell) for cell in cells.flat]
+        self.units = asarray(units, dtype=object).reshape(cells.shape)
+
+    def __getitem__(self, source):
+        return EmissionFactorRow(self, self.index[source])
+
+    def __iter__(self):
+        return iter(self.sources)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def factors(self, rows):
+        """Return the factors in the given row numbers, as floats in float mode."""
+        matrix = self.matrix[rows]
+        if using_floats():
+            return matrix
+        # Plain floats, so that dimensionless factors are not numpy scalars
+        factors = [
+            merge(x, unit)
+            for x, unit in zip(matrix.ravel().tolist(), self.units[rows].flat)
+        ]
+        return asarray(factors, dtype=object).reshape(matrix.shape)
+
+    def emissions(self, sources, levels):
+        """Return the emissions of activities on these sources, (activities, pollutants, years).
+
+        Levels has one row per source, scalars or time series.
+        """
+        data_type = array_type()
+        levels = asarray(levels, dtype=data_type)
+        factors = self.factors([self.index[source] for source in sources])
+        years = (1,) * (levels.ndim - 1)
+        return levels[:, None] * factors.reshape(factors.shape + years)
+
+    def to_frame(self):
+        """Return the table as a dataframe, sources in rows and pollutants in columns."""
+        factors = self.factors(list(range(len(self.sources))))
+        return DataFrame(factors, index=self.sources, columns=self.pollutants)
+
+
+class EmissionFactorRow(Mapping):
+    """The emission factors of one source, a read-only view on a row of the table."""
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, pollutant):
+        column = self.table.pollutants.index(pollutant)
+        return self.table.factors([self.row])[0, column]
+
+    def __iter__(self):
+        return iter(self.table.pollutants)
+
+    def __len__(self):
+        return len(self.table.pollutants)
+
+    def vector(self):
+        """Return the factors of all pollutants, in the order of the table."""
+        return self.table.factors([self.row])[0]
+
+
+def factors_vector(emission_factor, pollutants):
+    """Return the emission factors of pollutants, from a table row or from a dict."""
+    if isinstance(emission_factor, EmissionFactorRow):
+        if emission_factor.table.pollutants == pollutants:
+            return emission_factor.vector()
+    return [emission_factor[pollutant] for pollutant in pollutants]
+
+
+def tensor_frame(tensor, index, columns):
+    """Return a dataframe view of a (rows, columns, years) tensor, cells are time series.
+
+    >>> print(tensor_frame(asarray([[[1, 2], [3, 4]]]), ['Plant'], ['CO2', 'SO2']))
+              CO2     SO2
+    Plant  [1, 2]  [3, 4]
+    """
+    return DataFrame(
+        {column: list(tensor[:, j]) for j, column in enumerate(columns)}, index=index
+    )
+
+
 # pylint: disable=too-few-public-methods
 class Emitter:
     """A system which emits pollutants.
@@ -69,9 +207,28 @@ class Emitter:
         emission_control: a dictionary of str: float, where str is the pollutant name
             and the float between 0 and 1 is the filter efficiency
         """
+        self._tensor = None
         self.activities = activities
         self.emission_control = emission_control
 
+    @property
+    def activities(self):
+        return self._activities
+
+    @activities.setter
+    def activities(self, activities):
+        self._activities = activities
+        self._tensor = None
+
+    @property
+    def emission_control(self):
+        return self._emission_control
+
+    @emission_control.setter
+    def emission_control(self, emission_control):
+        self._emission_control = emission_control
+        self._tensor = None
+
     def __str__(self):
         """Return the table of emissions.
 
@@ -79,26 +236,55 @@ class Emitter:
         """
         return self.emissions(total=True).transpose().to_string()
 
+    @property
+    def pollutants(self):
+        return list(self.activities[0].emission_factor.keys())
+
+    @property
+    def tensor(self):
+        """Return the emissions as an array of shape (activities, pollutants, years).
+
+        Computed on first use, with one broadcast multiply of the activity levels
+        by the emission factors matrix and by the emission control vector.
+        Holds floats in float mode, quantities otherwise.
+        Without a time dimension if the activity levels are scalars.
+        """
+        if self._tensor is None:
+            data_type = array_type()
+            pollutants = self.pollutants
+            levels = asarray(
+                [activity.level for activity in self.activities], data_type
+            )
+            factors = asarray(
+                [
+                    factors_vector(activity.emission_factor, pollutants)
+                    for activity in self.activities
+                ],
+                data_type,
+            )
+            control = {pollutant: 1 for pollutant in pollutants}
+            if self.emission_control:
+                for pollutant, fraction in self.emission_control.items():
+                    control[pollutant] = 1 - fraction
+            control = asarray(
+                [control[pollutant] for pollutant in pollutants], data_type
+            )
+            years = (1,) * (levels.ndim - 1)
+            self._tensor = (
+                levels[:, None]
+                * factors.reshape(factors.shape + years)
+                * control.reshape(control.shape + years)
+            )
+        return self._tensor
+
+    def total(self):
+        """Return the emissions summed across all activities, shape (pollutants, years)."""
+        return self.tensor.sum(axis=0)
+
     def emissions(self, total=False):
         """Return a dataframe of emissions, including a total across all activities."""
-        pollutants = self.activities[0].emission_factor.keys()
-
-        control = {pollutant: 1 for pollutant in pollutants}
-
-        if self.emission_control:
-            for pollutant, fraction in self.emission_control.items():
-                control[pollutant] = 1 - fraction
-        result = DataFrame(
-            {
-                activity.name: {
-                    pollutant: activity.level
-                    * activity.emission_factor[pollutant]
-                    * control[pollutant]
-                    for pollutant in pollutants
-                }
-                for activity in self.activities
-            }
-        )
+        names = [activity.name for activity in self.activities]
+        result = tensor_frame(self.tensor, names, self.pollutants).T
         if total:
-            result["Total"] = result.sum(axis=1)  # Should return this directly
+            result["Total"] = list(self.total())
         return result
@@ -11,7 +11,7 @@ from collections import namedtuple
 
 from pandas import Series, DataFrame, set_option
 
-from model.utils import t, after_invest, display_as, ONES
+from model.utils import t, after_invest, display_as, ONES, unit_value
 
 from model.emitter import Emitter, Activity
 from model.accountholder import Accountholder
@@ -48,16 +48,19 @@ class Farmer(Accountholder, Emitter):
 
         # ex-ante baseline emissions are one crop, in the supply zone
         straw_burned = (
-            supply_chain.straw_available() * farmer_parameter.open_burn_rate / t
+            supply_chain.straw_available()
+            * farmer_parameter.open_burn_rate
+            / unit_value(t)
         )
 
         field_burning_before = Activity(
             name="Straw",
-            level=ONES * straw_burned * t,
+            level=ONES * straw_burned * unit_value(t),
             emission_factor=self.emission_factor["straw_open"],
         )
 
-        self.emissions_exante = Emitter(field_burning_before).emissions(total=False)
+        self.emitter_exante = Emitter(field_burning_before)
+        self.emissions_exante = self.emitter_exante.emissions(total=False)
 
         # We assume that all biomass collected would have been burned in open field.
         assert all(
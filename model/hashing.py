@@ -0,0 +1,183 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Hashing of values and of the model source
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Hash parameter values and the model source code, to key caches and checkpoints.
+
+The digests are stable across runs and processes, unlike  hash.
+They are shared by the output cache of  manuscript1.cache  and the
+studies and job queues of  sensitivity.
+
+The files a module depends on are found statically: its import statements are
+followed through the modules of the project, and the string constants naming
+files of the project, like "Data/Rice_production_2017_GSO.xlsx", are collected.
+
+>>> [str(path.relative_to(PROJECT_DIR)) for path in dependencies("model.roots")]
+['model/__init__.py', 'model/profiling.py', 'model/roots.py']
+"""
+
+import ast
+import sys
+from hashlib import sha256
+from importlib.util import find_spec, resolve_name
+from pathlib import Path
+from types import CodeType, FunctionType, ModuleType
+
+from numpy import ndarray
+from pandas import DataFrame, Index, Series
+
+MODEL_DIR = Path(__file__).resolve().parent
+
+PROJECT_DIR = MODEL_DIR.parent
+
+
+def _feed(digest, obj, path):
+    """Write a canonical byte representation of obj into the digest, recursively."""
+    if obj is None or isinstance(obj, (bool, int, str, bytes)):
+        digest.update(repr(obj).encode())
+        return
+    if isinstance(obj, float):
+        digest.update(obj.hex().encode())
+        return
+    if id(obj) in path:
+        digest.update(b"<cycle>")
+        return
+    path.add(id(obj))
+    digest.update(type(obj).__qualname__.encode())
+    if isinstance(obj, (Series, DataFrame)):
+        _feed(digest, list(obj.axes), path)
+        _feed(digest, obj.to_numpy(), path)
+    elif isinstance(obj, Index):
+        _feed(digest, obj.tolist(), path)
+    elif isinstance(obj, ndarray):
+        if obj.dtype == object:
+            _feed(digest, obj.tolist(), path)
+        else:
+            digest.update(str((obj.dtype, obj.shape)).encode())
+            digest.update(obj.tobytes())
+    elif isinstance(obj, (tuple, list)):
+        for item in obj:
+            _feed(digest, item, path)
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=repr):
+            _feed(digest, key, path)
+            _feed(digest, obj[key], path)
+    elif isinstance(obj, FunctionType):
+        _feed(digest, obj.__code__, path)
+        _feed(digest, obj.__defaults__, path)
+        cells = obj.__closure__ or ()
+        _feed(digest, [cell.cell_contents for cell in cells], path)
+    elif isinstance(obj, CodeType):
+        digest.update(obj.co_code)
+        _feed(digest, obj.co_consts, path)
+        _feed(digest, obj.co_names, path)
+    elif isinstance(obj, (type, ModuleType)):
+        digest.update(obj.__name__.encode())
+    elif hasattr(obj, "__dict__"):
+        _feed(digest, vars(obj), path)
+    else:
+        digest.update(repr(obj).encode())
+    path.discard(id(obj))
+
+
+def fingerprint(obj):
+    """Return a hex digest of the value of obj, stable across runs.
+
+    Works on numbers, strings, containers, namedtuples, arrays, pandas objects,
+    functions (hashed by their code) and plain objects (hashed by their attributes).
+
+    >>> fingerprint([1.0, 'a']) == fingerprint([1.0, 'a'])
+    True
+    >>> fingerprint({'CO2': 1.0}) == fingerprint({'CO2': 1.1})
+    False
+    >>> fingerprint(lambda r: 0.0044 * r ** 2) == fingerprint(lambda r: 0.0044 * r ** 2)
+    True
+    """
+    digest = sha256()
+    _feed(digest, obj, set())
+    return digest.hexdigest()
+
+
+def model_digest():
+    """Return a hex digest of the source code of the model package."""
+    digest = sha256()
+    for path in sorted(MODEL_DIR.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _project_file(module_name):
+    """Return the source file of a module of the project, or None for other modules."""
+    module = sys.modules.get(module_name)
+    origin = getattr(module, "__file__", None)
+    if origin is None:
+        try:
+            spec = find_spec(module_name)
+        except (ImportError, ValueError):
+            return None
+        origin = spec.origin if spec is not None and spec.has_location else None
+    if origin is None or not origin.endswith(".py"):
+        return None
+    path = Path(origin).resolve()
+    if PROJECT_DIR not in path.parents or "site-packages" in path.parts:
+        return None
+    return path
+
+
+def _references(path, module_name):
+    """Yield the modules imported in a source file, and the strings it holds."""
+    package = (
+        module_name if path.name == "__init__.py" else module_name.rpartition(".")[0]
+    )
+    for node in ast.walk(ast.parse(path.read_text())):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield "module", alias.name
+        elif isinstance(node, ast.ImportFrom):
+            base = resolve_name("." * node.level + (node.module or ""), package)
+            yield "module", base
+            for alias in node.names:
+                yield "module", f"{base}.{alias.name}"
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            yield "string", node.value
+
+
+def dependencies(module_name):
+    """Return the source and data files of the project a module depends on, sorted."""
+    files, seen, pending = set(), set(), [module_name]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        if "." in name:
+            pending.append(name.rpartition(".")[0])  # The parent package runs first
+        path = _project_file(name)
+        if path is None:
+            continue
+        files.add(path)
+        for kind, reference in _references(path, name):
+            if kind == "module":
+                pending.append(reference)
+            elif "\n" not in reference and len(reference) < 256:
+                candidate = PROJECT_DIR / reference
+                if candidate.is_file():
+                    files.add(candidate.resolve())
+    return sorted(files)
+
+
+def source_digest(module_names):
+    """Return a hex digest of the files of the project the modules depend on."""
+    digest = sha256()
+    files = set()
+    for name in module_names:
+        files.update(dependencies(name))
+    for path in sorted(files):
+        digest.update(str(path.relative_to(PROJECT_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
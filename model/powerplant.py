@@ -25,11 +25,14 @@ from model.utils import (
     ones,
     TIME_HORIZON,
     npv,
+    unit_value,
+    memo_key,
 )
 
 # from model.utils import TIME_HORIZON
 from model.accountholder import Accountholder
 from model.emitter import Emitter, Activity
+from model.dispatch import annual_factors
 
 
 Fuel = namedtuple("Fuel", "name, heat_value, transport_distance, transport_mean")
@@ -62,7 +65,8 @@ class PowerPlant(Accountholder, Emitter):
         emission_factor,
         time_horizon=TIME_HORIZON,
         derating=None,
-        amount_invested=0 * USD,
+        amount_invested=None,
+        dispatch=None,
     ):
         """Initialize the power plant, compute the amount of fuel used.
 
@@ -74,6 +78,9 @@ class PowerPlant(Accountholder, Emitter):
         d/ Now you can      print(plant.net_present_value(discount_rate=0.08, horizon=11))
 
         If parameter.fuel is None, step c is not needed, mainfuel_cost is 0.
+
+        With a  model.dispatch.Dispatch, the plant runs in hourly mode: the load profile
+        replaces the capacity factor, and the efficiency falls at part load.
         """
         self.time_horizon = time_horizon
         self.ones = ones(self.time_horizon + 1)
@@ -81,9 +88,15 @@ class PowerPlant(Accountholder, Emitter):
         Accountholder.__init__(self, parameter.name, self.time_horizon, amount_invested)
         self.parameter = parameter
         self.emission_factor = emission_factor
+        self.dispatch = dispatch
 
+        if dispatch is None:
+            capacity_factor = parameter.capacity_factor
+        else:
+            factors = annual_factors(dispatch)
+            capacity_factor = factors.load_factor
         self.power_generation = (
-            self.ones * parameter.capacity * parameter.capacity_factor * y
+            self.ones * parameter.capacity * capacity_factor * unit_value(y)
         )
         display_as(self.power_generation, "GWh")
 
@@ -92,12 +105,14 @@ class PowerPlant(Accountholder, Emitter):
         else:
             self.derating = self.ones
         self.plant_efficiency = parameter.plant_efficiency * self.derating
+        if dispatch is not None:
+            self.plant_efficiency = self.plant_efficiency * factors.part_load_derating
 
         if parameter.fuel is None:
             self.fuelname = None
-            self.gross_heat_input = self.ones * 0.0 * TJ
-            self.mainfuel_used = self.ones * 0.0 * t
-            self._mainfuel_cost = self.ones * 0.0 * USD
+            self.gross_heat_input = self.ones * 0.0 * unit_value(TJ)
+            self.mainfuel_used = self.ones * 0.0 * unit_value(t)
+            self._mainfuel_cost = self.ones * 0.0 * unit_value(USD)
         else:
             self.fuelname = parameter.fuel.name
             self.gross_heat_input = self.power_generation / self.plant_efficiency
@@ -119,7 +134,9 @@ class PowerPlant(Accountholder, Emitter):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.parameter == other.parameter
+            return self.parameter == other.parameter and memo_key(
+                self.dispatch
+            ) == memo_key(other.dispatch)
         return False
 
     @property
@@ -159,7 +176,10 @@ class PowerPlant(Accountholder, Emitter):
     def mainfuel_om_cost(self):
         """Return the vector of operation and maintenance cost."""
         fixed_om_main = (
-            self.ones * self.parameter.fix_om_main * self.parameter.capacity * y
+            self.ones
+            * self.parameter.fix_om_main
+            * self.parameter.capacity
+            * unit_value(y)
         )
         variable_om_main = self.power_generation * self.parameter.variable_om_main
         cost = fixed_om_main + variable_om_main
@@ -223,29 +243,27 @@ class PowerPlant(Accountholder, Emitter):
     def lcoe_statement(self, discount_rate, horizon, tax_rate, depreciation_period):
         """Assess the levelized cost of electricity."""
         statement = Series(name=self.name, dtype=float)
-        statement["Investment    (MUSD)"] = self.amount_invested / MUSD
-        statement["Fuel cost     (MUSD)"] = (
-            npv(self.fuel_cost(), discount_rate, horizon) / MUSD
-        )
-        statement["  Main fuel   (MUSD)"] = (
-            npv(self.mainfuel_cost, discount_rate, horizon) / MUSD
-        )
+        statement["Investment    (MUSD)"] = self.amount_invested / unit_value(MUSD)
+        statement["Fuel cost     (MUSD)"] = npv(
+            self.fuel_cost(), discount_rate, horizon
+        ) / unit_value(MUSD)
+        statement["  Main fuel   (MUSD)"] = npv(
+            self.mainfuel_cost, discount_rate, horizon
+        ) / unit_value(MUSD)
         statement["  Cofuel      (MUSD)"] = 0
-        statement["O&M cost      (MUSD)"] = (
-            npv(self.operation_maintenance_cost(), discount_rate, horizon) / MUSD
-        )
-        statement["  O&M Mainfuel(MUSD)"] = (
-            npv(self.mainfuel_om_cost(), discount_rate, horizon) / MUSD
-        )
+        statement["O&M cost      (MUSD)"] = npv(
+            self.operation_maintenance_cost(), discount_rate, horizon
+        ) / unit_value(MUSD)
+        statement["  O&M Mainfuel(MUSD)"] = npv(
+            self.mainfuel_om_cost(), discount_rate, horizon
+        ) / unit_value(MUSD)
         statement["  O&M Cofuel  (MUSD)"] = 0
-        statement["Tax           (MUSD)"] = (
-            npv(self.income_tax(tax_rate, depreciation_period), discount_rate, horizon)
-            / MUSD
-        )
-        statement["Cash_out      (MUSD)"] = (
-            npv(self.cash_out(tax_rate, depreciation_period), discount_rate, horizon)
-            / MUSD
-        )
+        statement["Tax           (MUSD)"] = npv(
+            self.income_tax(tax_rate, depreciation_period), discount_rate, horizon
+        ) / unit_value(MUSD)
+        statement["Cash_out      (MUSD)"] = npv(
+            self.cash_out(tax_rate, depreciation_period), discount_rate, horizon
+        ) / unit_value(MUSD)
         statement["Electricity produced"] = npv(
             self.power_generation, discount_rate, horizon
         )
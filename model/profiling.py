@@ -0,0 +1,307 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Profiling hooks
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Count the calls and the time spent in the hot paths of the model, on demand.
+
+The functions and methods listed in  TARGETS  are wrapped only while profiling,
+and restored afterwards, so the instrumentation costs nothing when it is off.
+Module functions are replaced in every module which imported them, methods are
+replaced in their class and in the subclasses which override them.
+
+For each target, the profile records the number of calls, the cumulative time
+including the targets it calls, the self time excluding them, and optionally
+the net memory allocated, traced by  tracemalloc. It also records the self time
+by stack of targets, in the collapsed format read by flame graph tools,
+like  flamegraph.pl  or  speedscope.
+
+Usage:
+    with profiling() as profile:
+        system = System(...)
+    print(profile.report())
+    profile.write_folded("profile.folded")
+
+or for a whole run, set the environment variable  COFIRING_PROFILE  to the output
+file, "-" for the standard error. A name ending in .folded gets the collapsed stacks,
+otherwise the report. COFIRING_PROFILE_MEMORY=1 traces the allocations.
+From the project root directory:
+    COFIRING_PROFILE=- python -m manuscript1.table.manuscript
+    python -m model.profiling --folded profile.folded manuscript1.table.manuscript
+
+>>> import model.utils
+>>> with profiling(["model.utils:npv"]) as profile:
+...     _ = model.utils.npv([1.0] * 11, 0.1, 10)
+>>> profile.stats["npv"].calls
+1
+>>> hasattr(model.utils.npv, "__wrapped__")
+False
+"""
+
+import atexit
+import os
+import runpy
+import sys
+import threading
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from functools import wraps
+from importlib import import_module
+from time import perf_counter
+
+TARGETS = [
+    "model.utils:npv",
+    "model.utils:display_as",
+    "model.utils:strip",
+    "model.accountholder:Accountholder.operating_expenses",
+    "model.accountholder:Accountholder.net_present_value",
+    "model.emitter:Emitter.emissions",
+    "model.supplychain:SupplyChain.fit",
+    "model.powerplant:PowerPlant.__init__",
+    "model.cofiringplant:CofiringPlant.__init__",
+    "model.farmer:Farmer.__init__",
+    "model.reseller:Reseller.__init__",
+    "model.system:System.__init__",
+    "model.system:System.clear_market",
+    "model.system:System.table_business_value",
+    "model.system:System.emissions_reduction",
+    "model.system:System.emissions_reduction_benefit",
+    "model.wtawtp:farmer_wta",
+    "model.wtawtp:plant_wtp",
+    "model.tables:energy_costs",
+    "model.tables:straw_supply",
+    "model.tables:balance_jobs",
+    "model.tables:emission_reductions_by_activity",
+]
+
+
+class Stats:
+    """The calls of one target: count, cumulative and self time in seconds, net bytes."""
+
+    __slots__ = ("calls", "cumulative", "self_time", "allocated")
+
+    def __init__(self):
+        self.calls = 0
+        self.cumulative = 0.0
+        self.self_time = 0.0
+        self.allocated = 0
+
+
+class Profile:
+    """The statistics collected while profiling, by target name."""
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.stats = {}
+        self.folded = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def wrap(self, name, function):
+        """Return function wrapped to record its calls under name."""
+
+        @wraps(function)
+        def recorded(*args, **kwargs):
+            stack = self._stack()
+            frame = [name, 0.0]  # Name, time in the targets called
+            stack.append(frame)
+            allocated = tracemalloc.get_traced_memory()[0] if self.memory else 0
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                if self.memory:
+                    allocated = tracemalloc.get_traced_memory()[0] - allocated
+                stack.pop()
+                self._record(stack, frame, elapsed, allocated)
+
+        return recorded
+
+    def _record(self, stack, frame, elapsed, allocated):
+        name, children = frame
+        path = ";".join([f[0] for f in stack] + [name])
+        recursive = any(f[0] == name for f in stack)
+        with self._lock:
+            stats = self.stats.setdefault(name, Stats())
+            stats.calls += 1
+            if not recursive:
+                stats.cumulative += elapsed
+                stats.allocated += allocated
+            stats.self_time += elapsed - children
+            self.folded[path] = self.folded.get(path, 0.0) + elapsed - children
+        if stack:
+            stack[-1][1] += elapsed
+
+    def report(self):
+        """Return the table of the targets called, by decreasing cumulative time."""
+        header = "{:45}{:>10}{:>14}{:>14}{:>14}"
+        row = "{:45}{:>10}{:>12.1f}ms{:>12.1f}ms{:>12.3f}ms"
+        titles = ["Target", "Calls", "Cumulative", "Self", "Per call"]
+        if self.memory:
+            header += "{:>14}"
+            row += "{:>11.1f}KiB"
+            titles.append("Allocated")
+        lines = [header.format(*titles)]
+        ordered = sorted(self.stats.items(), key=lambda item: -item[1].cumulative)
+        for name, stats in ordered:
+            values = [
+                name,
+                stats.calls,
+                stats.cumulative * 1e3,
+                stats.self_time * 1e3,
+                stats.cumulative / stats.calls * 1e3,
+            ]
+            if self.memory:
+                values.append(stats.allocated / 1024)
+            lines.append(row.format(*values))
+        return "\n".join(lines)
+
+    def write_folded(self, file):
+        """Write the self time by stack in microseconds, one "a;b;c count" per line."""
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, "w") as opened:
+                self.write_folded(opened)
+            return
+        for path, seconds in sorted(self.folded.items()):
+            file.write(f"{path} {round(seconds * 1e6)}\n")
+
+
+def resolve(target):
+    """Return the owner, the attribute name and the label of a "module:qualname" target."""
+    module_name, _, qualname = target.partition(":")
+    owner = import_module(module_name)
+    *classes, attribute = qualname.split(".")
+    for name in classes:
+        owner = getattr(owner, name)
+    return owner, attribute, qualname
+
+
+def _overriding(cls, attribute):
+    """Yield the class and its subclasses which define attribute themselves."""
+    if attribute in vars(cls):
+        yield cls
+    for subclass in cls.__subclasses__():
+        yield from _overriding(subclass, attribute)
+
+
+def install(profile, targets):
+    """Wrap the targets to record into profile, return the list of changes to undo."""
+    changes = []
+    done = set()
+    for target in targets:
+        owner, attribute, label = resolve(target)
+        if isinstance(owner, type):
+            for cls in _overriding(owner, attribute):
+                if (cls, attribute) in done:
+                    continue
+                done.add((cls, attribute))
+                original = vars(cls)[attribute]
+                wrapped = profile.wrap(f"{cls.__name__}.{attribute}", original)
+                setattr(cls, attribute, wrapped)
+                changes.append((cls, attribute, original, wrapped))
+        else:
+            original = getattr(owner, attribute)
+            wrapped = profile.wrap(label, original)
+            for module in list(sys.modules.values()):
+                if vars(module).get(attribute) is original:
+                    setattr(module, attribute, wrapped)
+            changes.append((None, attribute, original, wrapped))
+    return changes
+
+
+def uninstall(changes):
+    """Restore the targets wrapped by install.
+
+    Module functions are restored in all the modules, including those imported
+    while profiling, which imported the wrapper.
+    """
+    for owner, attribute, original, wrapped in reversed(changes):
+        if owner is not None:
+            setattr(owner, attribute, original)
+            continue
+        for module in list(sys.modules.values()):
+            if vars(module).get(attribute) is wrapped:
+                setattr(module, attribute, original)
+
+
+@contextmanager
+def profiling(targets=None, memory=False):
+    """Record the calls of the targets in the enclosed code, yield the Profile.
+
+    targets: "module:qualname" strings, by default  TARGETS.
+    memory: trace the allocations, which slows the run much more.
+    """
+    profile = Profile(memory)
+    changes = install(profile, targets or TARGETS)
+    tracing = memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    try:
+        yield profile
+    finally:
+        if tracing:
+            tracemalloc.stop()
+        uninstall(changes)
+
+
+def write_output(profile, output):
+    """Write the report, or the collapsed stacks if output ends with .folded."""
+    if str(output).endswith(".folded"):
+        profile.write_folded(output)
+    elif output == "-":
+        print(profile.report(), file=sys.stderr)
+    else:
+        with open(output, "w") as file:
+            file.write(profile.report() + "\n")
+
+
+def enable_from_environment():
+    """Profile the whole run if COFIRING_PROFILE is set, writing the output at exit."""
+    output = os.environ.get("COFIRING_PROFILE")
+    if not output:
+        return
+    memory = os.environ.get("COFIRING_PROFILE_MEMORY") == "1"
+    context = profiling(memory=memory)
+    profile = context.__enter__()  # pylint: disable=unnecessary-dunder-call
+
+    def finish():
+        context.__exit__(None, None, None)
+        write_output(profile, output)
+
+    atexit.register(finish)
+
+
+def main(argv=None):
+    """Run a module like  python -m, then print the report on stderr."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", help="the module to run, like manuscript1.table.jobs")
+    parser.add_argument("arguments", nargs="*", help="arguments of the module")
+    parser.add_argument("--folded", help="also write the collapsed stacks to this file")
+    parser.add_argument("--memory", action="store_true", help="trace allocations")
+    args = parser.parse_args(argv)
+
+    sys.argv = [args.module] + args.arguments
+    with profiling(memory=args.memory) as profile:
+        try:
+            runpy.run_module(args.module, run_name="__main__", alter_sys=True)
+        except SystemExit as exit_status:
+            if exit_status.code:
+                raise
+    print(profile.report(), file=sys.stderr)
+    if args.folded:
+        profile.write_folded(args.folded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Define  SystemResult, a compact record of the headline numbers of one System run.
+
+The numbers are plain floats in base units (USD, kg, s), whatever the mode of the run.
+FIELDS  gives the unit used to display each one.
+Many results stack into a NumPy structured array, one column per field,
+which is cheap to store and to compare between runs.
+
+>>> a = SystemResult('Plant', business_value=1e6, wta=0.01)
+>>> b = SystemResult('Plant', business_value=1e6, wta=0.02)
+>>> runs = stack([a, b])
+>>> runs['wta']
+array([0.01, 0.02])
+>>> compare(runs[:1], runs[1:])
+['wta']
+>>> SystemResult.from_record(runs[1]) == b
+True
+"""
+
+from numpy import array, dtype, isclose as np_isclose
+
+from model.utils import npv, value, with_unit
+from model.wtawtp import farmer_wta, plant_wtp
+
+# Name, display unit. Time series are taken in year 1, unless an NPV.
+FIELDS = [
+    ("business_value", "kUSD"),  # NPV
+    ("external_value", "kUSD"),  # NPV
+    ("health_value", "kUSD"),  # NPV
+    ("mitigation_value", "kUSD"),  # NPV
+    ("wages_value", "kUSD"),  # NPV
+    ("farmer_value", "kUSD"),  # NPV
+    ("reseller_value", "kUSD"),  # NPV
+    ("coal_saved", "kt"),
+    ("work_collection", "FTE"),
+    ("work_transportation", "FTE"),
+    ("work_loading", "FTE"),
+    ("work_om", "FTE"),
+    ("work_mining", "FTE"),
+    ("work_total", "FTE"),
+    ("wages_collection", "kUSD"),
+    ("wages_transportation", "kUSD"),
+    ("wages_loading", "kUSD"),
+    ("wages_om", "kUSD"),
+    ("wages_mining", "kUSD"),
+    ("wages_total", "kUSD"),
+    ("reduction_CO2", "t"),
+    ("reduction_SO2", "t"),
+    ("reduction_NOx", "t"),
+    ("reduction_PM10", "t"),
+    ("reduction_PM2_5", "t"),
+    ("wta", "USD/t"),
+    ("wtp", "USD/t"),
+    ("transport_cost", "USD/t"),
+]
+
+FIELD_NAMES = tuple(name for name, _ in FIELDS)
+
+RESULT_DTYPE = dtype([("name", "U40")] + [(name, "f8") for name in FIELD_NAMES])
+
+SEGMENT_LABELS = {
+    "collection": "Biomass collection",
+    "transportation": "Biomass transportation",
+    "loading": "Biomass loading",
+    "om": "O&M",
+    "mining": "Mining",
+    "total": "Total",
+}
+
+
+def _float(qty):
+    """Return a number or a quantity as a float in base units."""
+    return float(value(qty))
+
+
+def _shown(number, unit):
+    """Return the number for display: as is in float mode, otherwise as a quantity in unit."""
+    return with_unit(number, unit)
+
+
+def jobs_by_segment(system):
+    """Return the work time and wages of year 1 by segment, a dict of floats in base units."""
+    work = [
+        system.farmer.labor()[1],
+        system.reseller.driving_work()[1],
+        system.reseller.loading_work()[1],
+        system.cofiring_plant.cofuel_om_work()[1],
+        -system.coal_work_lost[1],
+        system.labor[1],
+    ]
+    wages = [
+        system.farmer.labor_cost()[1],
+        system.reseller.driving_wages()[1],
+        system.reseller.loading_wages()[1],
+        system.cofiring_plant.cofuel_om_wages()[1],
+        -system.coal_wages_lost[1],
+        system.wages[1],
+    ]
+    jobs = {}
+    for segment, time, amount in zip(SEGMENT_LABELS, work, wages):
+        jobs["work_" + segment] = _float(time)
+        jobs["wages_" + segment] = _float(amount)
+    return jobs
+
+
+def jobs_lines(name, jobs):
+    """Render the jobs created and destroyed by segment, as a list of lines."""
+    cols2 = "{:25}{:12.1f}{:12.1f}"
+    lines = ["Benefit from job creation: " + name + "\n"]
+    for segment in ["collection", "transportation", "loading", "om", "mining", "total"]:
+        lines.append(
+            cols2.format(
+                SEGMENT_LABELS[segment],
+                _shown(jobs["work_" + segment], "FTE"),
+                _shown(jobs["wages_" + segment], "kUSD"),
+            )
+        )
+    return lines
+
+
+class SystemResult:
+    """The headline numbers of one run of a System, floats in base units.
+
+    Fields not given are NaN.
+    """
+
+    __slots__ = ("name",) + FIELD_NAMES
+
+    def __init__(self, name, **values):
+        self.name = name
+        for field in FIELD_NAMES:
+            setattr(self, field, float(values.pop(field, "nan")))
+        assert not values, f"Unknown result fields {list(values)}"
+
+    @classmethod
+    def from_system(cls, system, discount_rate, horizon, external_cost, wtawtp=True):
+        """Run the system and collect its results.
+
+        Solving for the WTA and WTP clears the market several times, so that comes last.
+        With  wtawtp=False  they are not solved for, and left NaN.
+        """
+        values = jobs_by_segment(system)
+        business = system.table_business_value(discount_rate, horizon)
+        values["business_value"] = business.loc["Business value of cofiring"]
+        benefit = system.emissions_reduction_benefit(external_cost)
+        values["external_value"] = npv(
+            benefit.loc["Value"].sum(), discount_rate, horizon
+        )
+        values["health_value"] = system.health_npv(
+            external_cost, discount_rate, horizon
+        )
+        values["mitigation_value"] = system.mitigation_npv(
+            external_cost, discount_rate, horizon
+        )
+        values["wages_value"] = system.wages_npv(discount_rate, horizon)
+        values["farmer_value"] = system.farmer.net_present_value(discount_rate, horizon)
+        values["reseller_value"] = system.reseller.net_present_value(
+            discount_rate, horizon
+        )
+        values["coal_saved"] = system.coal_saved[1]
+        for pollutant, reduction in benefit.loc["Reduction"].items():
+            values["reduction_" + pollutant.replace(".", "_")] = reduction[1]
+        values["transport_cost"] = system.transport_cost_per_t[1]
+        if wtawtp:
+            values["wta"] = farmer_wta(system)
+            values["wtp"] = plant_wtp(system, discount_rate, horizon)
+        return cls(
+            system.plant.name,
+            **{field: _float(number) for field, number in values.items()},
+        )
+
+    @classmethod
+    def from_record(cls, record):
+        """Return the result held in a row of a stacked array."""
+        return cls(
+            str(record["name"]), **{field: record[field] for field in FIELD_NAMES}
+        )
+
+    def as_tuple(self):
+        """Return the fields as a tuple, in the order of RESULT_DTYPE."""
+        return (self.name,) + tuple(getattr(self, field) for field in FIELD_NAMES)
+
+    def __eq__(self, other):
+        """Return True if the name and all the fields are equal, NaN equals NaN."""
+        if isinstance(other, self.__class__):
+            return self.name == other.name and not compare(
+                stack([self]), stack([other]), rel_tol=0
+            )
+        return False
+
+    def __repr__(self):
+        return f"SystemResult({self.name!r}, business_value={self.business_value})"
+
+    def benefits_table(self):
+        """Render the present value of various benefits from co-firing."""
+        row2 = "{:30}" + "{:20.0f}"
+        table = ["", self.name + " Cofire", "-------------------"]
+        table.append(row2.format("Health", _shown(self.health_value, "kUSD")))
+        table.append(
+            row2.format("Emission reduction", _shown(self.mitigation_value, "kUSD"))
+        )
+        table.append(row2.format("Wages", _shown(self.wages_value, "kUSD")))
+        table.append(
+            row2.format("Farmer earnings before tax", _shown(self.farmer_value, "kUSD"))
+        )
+        table.append(
+            row2.format(
+                "Trader earnings before tax", _shown(self.reseller_value, "kUSD")
+            )
+        )
+        return "\n".join(table)
+
+    def jobs_table(self):
+        """Render the jobs created and destroyed by cofiring."""
+        jobs = {field: getattr(self, field) for field in FIELD_NAMES}
+        return "\n".join(jobs_lines(self.name, jobs))
+
+
+def stack(results):
+    """Return a sequence of SystemResult as a structured array, one column per field."""
+    return array([result.as_tuple() for result in results], dtype=RESULT_DTYPE)
+
+
+def compare(runs_a, runs_b, rel_tol=1e-09, abs_tol=0.0):
+    """Return the names of the fields which differ between two stacked arrays of results.
+
+    NaN equals NaN, as in fields that were not computed.
+    """
+    return [
+        field
+        for field in FIELD_NAMES
+        if not np_isclose(
+            runs_a[field], runs_b[field], rtol=rel_tol, atol=abs_tol, equal_nan=True
+        ).all()
+    ]
@@ -0,0 +1,104 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Root finding
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Solve f(x) == 0 for many scenarios at once, elementwise on float arrays.
+
+Like  model.utils.solve_linear, the function is a black box, called with
+an array of x values, one per scenario, and returning an array of f(x) values.
+Each element starts with the secant through two probes. As soon as an element
+is bracketed by a sign change, it continues by regula falsi with the Illinois
+modification, which cannot leave the bracket and converges superlinearly.
+A linear function is solved in one step, as with solve_linear.
+
+Elements which do not converge are reported, not raised: the function is flat,
+the secant diverges, or the iterations run out.
+
+When each element costs a model run, pass  indexed=True: the function is then
+called as  f(x, rows)  with the x values of the elements at the positions  rows
+only, those still searching, and returns their f values.
+
+>>> def f(x, rows):
+...     return x ** 2 - asarray([2, 9, -1])[rows]
+>>> roots = solve_secant(f, [0, 0, 0], [1, 1, 1], indexed=True)
+>>> roots.x[:2], roots.converged
+(array([1.41421356, 3.        ]), array([ True,  True, False]))
+
+>>> roots = solve_secant(lambda x: x ** 2 - [2, 9, -1], [0, 0, 0], [1, 1, 1])
+>>> roots.x[:2], roots.converged
+(array([1.41421356, 3.        ]), array([ True,  True, False]))
+"""
+
+from collections import namedtuple
+
+from numpy import abs as np_abs
+from numpy import arange, asarray, broadcast_arrays, flatnonzero, full, isfinite
+from numpy import nan, sign, where, zeros
+
+Roots = namedtuple("Roots", "x fx converged iterations")
+Roots.__doc__ = """The solutions, the residuals, whether each element converged
+and the number of iterations it took."""
+
+
+# pylint: disable=too-many-arguments, too-many-locals
+def solve_secant(f, x0, x1, xtol=1e-12, ftol=0.0, max_iterations=100, indexed=False):
+    """Return the roots of f for each element, starting from x0 and x1, as Roots.
+
+    An element converges when  |f(x)| <= ftol, or when its bracket or its secant step
+    is narrower than  xtol  relative to x. Non converged elements keep their
+    last iterate, NaN if the secant diverged.
+    With  indexed=True, f is evaluated on the active elements only, see the module
+    docstring, and x0, x1 are one dimensional arrays of the elements.
+    """
+    a, b = broadcast_arrays(asarray(x0, dtype=float), asarray(x1, dtype=float))
+    if indexed:
+        assert a.ndim == 1, "Expecting one dimensional starting points"
+        fa = asarray(f(a, arange(a.size)), dtype=float)
+        fb = asarray(f(b, arange(b.size)), dtype=float)
+    else:
+        fa, fb = asarray(f(a), dtype=float), asarray(f(b), dtype=float)
+    # The function may broadcast scalar starting points over the scenarios
+    a, b, fa, fb = (array.copy() for array in broadcast_arrays(a, b, fa, fb))
+    active = full(b.shape, True)
+    converged = np_abs(fb) <= ftol
+    active &= ~converged
+    iterations = zeros(b.shape, int)
+    for _ in range(max_iterations):
+        if not active.any():
+            break
+        bracketed = sign(fa) * sign(fb) < 0
+        slope = fb - fa
+        flat = (slope == 0) & ~bracketed
+        active &= ~flat
+        step = fb * (b - a) / where(slope == 0, 1, slope)
+        c = where(active, b - step, b)
+        # Guard the bracket against rounding
+        outside = bracketed & ((c - a) * (c - b) > 0)
+        c = where(outside, (a + b) / 2, c)
+        if indexed:
+            rows = flatnonzero(active)
+            fc = fb.copy()
+            fc[rows] = f(c[rows], rows)
+        else:
+            fc = where(active, f(c), fb)
+        iterations += active
+
+        same_side = sign(fc) == sign(fb)
+        illinois = active & bracketed & same_side
+        fa = where(illinois, fa / 2, fa)
+        shift = active & ~illinois
+        a, fa = where(shift, b, a), where(shift, fb, fa)
+        b, fb = where(active, c, b), where(active, fc, fb)
+
+        small = np_abs(b - a) <= xtol * (1 + np_abs(b))
+        done = active & ((np_abs(fb) <= ftol) | small)
+        converged |= done
+        active &= ~done
+        diverged = active & ~(isfinite(b) & isfinite(fb))
+        b = where(diverged, nan, b)
+        active &= ~diverged
+    return Roots(b, fb, converged, iterations)
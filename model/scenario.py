@@ -0,0 +1,486 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Scenario files
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Read and write the parameters of a system as JSON scenario files, with units.
+
+A scenario file holds one scenario, or a list of them. A scenario is a JSON object
+with one section per parameter set of the model:
+    name, economics, external_cost, plant, cofire, supply_chain, price, farmer,
+    reseller, mining, emission_factor
+The sections have the fields of the model named tuples, see  SCHEMA.
+Quantities are written as strings "value unit", like "1080 MW" or "29.31 USD / kW / y".
+Any unit of the right dimension is accepted, pure numbers are plain JSON numbers.
+The boiler efficiency loss is a curve, written as by the  as_dict  method of  model.curves.
+Emission factors are per t of fuel, or per t km for transport modes.
+External costs are per t of pollutant. The section is optional, files written
+without it get the external costs of the manuscript,  DEFAULT_EXTERNAL_COST.
+The example files in  Data/scenarios  hold the two plants of the manuscript.
+
+The loader checks every field and unit, and raises ValueError naming the faulty
+field. Parsed scenarios are cached by the hash of the file content, and units
+are parsed once, so a batch of hundreds of scenario files loads quickly.
+
+Usage:
+    scenario = load_scenario("Data/scenarios/MD1.json")
+    system = scenario.system()
+    print(system.table_business_value(scenario.economics.discount_rate, 20))
+"""
+
+import json
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+
+from pandas import Series
+
+from model.cofiringplant import CofiringParameter
+from model.curves import curve_from_dict
+from model.emitter import EmissionFactorTable
+from model.farmer import FarmerParameter
+from model.powerplant import Fuel, PlantParameter
+from model.reseller import ResellerParameter
+from model.shape import Annulus, Disk, Semiannulus
+from model.supplychain import SupplyChain, SupplyZone
+from model.system import MiningParameter, Price, System
+from model.utils import dimension_of, in_unit, parse_unit, quantity
+
+Economics = namedtuple(
+    "Economics", "discount_rate tax_rate depreciation_period horizon"
+)
+
+ENDOGENOUS = "Endogenous"
+
+TEXT, INTEGER, NUMBER = "text", "integer", "number"
+
+SCHEMA = {
+    Economics: {
+        "discount_rate": NUMBER,
+        "tax_rate": NUMBER,
+        "depreciation_period": INTEGER,
+        "horizon": INTEGER,
+    },
+    Fuel: {
+        "name": TEXT,
+        "heat_value": "MJ / kg",
+        "transport_distance": "km",  # Or "Endogenous"
+        "transport_mean": TEXT,
+    },
+    PlantParameter: {
+        "name": TEXT,
+        "capacity": "MW",
+        "commissioning": INTEGER,
+        "boiler_technology": TEXT,
+        "capacity_factor": NUMBER,
+        "plant_efficiency": NUMBER,
+        "boiler_efficiency_new": NUMBER,
+        "fix_om_main": "USD / kW / y",
+        "variable_om_main": "USD / kWh",
+        "emission_control": {NUMBER},
+        "fuel": Fuel,
+    },
+    CofiringParameter: {
+        "investment_cost": "USD / kW",
+        "fix_om_cost": "USD / kW / y",
+        "variable_om_cost": "USD / kWh",
+        "OM_hour_MWh": "hr / MWh",
+        "wage_operation_maintenance": "USD / hr",
+        "cofire_rate": NUMBER,
+        "cofuel": Fuel,
+        "boiler_efficiency_loss": "curve",
+    },
+    Price: {
+        "biomass_plantgate": "USD / t",
+        "biomass_fieldside": "USD / t",
+        "coal": "VND / t",
+        "electricity": "VND / kWh",
+    },
+    FarmerParameter: {
+        "winder_rental_cost": "USD / ha",
+        "winder_haul": "t / d",
+        "work_hour_day": "hr / d",
+        "wage_bm_collect": "USD / hr",
+        "fuel_cost_per_hour": "USD / hr",
+        "open_burn_rate": NUMBER,
+        "fuel_use": "kg / d",
+        "profit": "USD / ha",
+    },
+    ResellerParameter: {
+        "barge_fuel_consumption": "g / t / km",
+        "truck_loading_time": "hr / t",
+        "wage_bm_loading": "USD / hr",
+        "truck_load": "t",
+        "truck_velocity": "km / hr",
+        "fuel_cost_per_hour_driving": "USD / hr",
+        "fuel_cost_per_hour_loading": "USD / hr",
+        "rental_cost_per_hour": "USD / hr",
+        "wage_bm_transport": "USD / hr",
+    },
+    MiningParameter: {
+        "productivity_surface": "t / hr",
+        "productivity_underground": "t / hr",
+        "wage_mining": "USD / hr",
+    },
+    SupplyZone: {
+        "shape": "shape",
+        "rice_yield_per_crop": "t / ha",
+        "rice_land_fraction": NUMBER,
+        "straw_to_rice_ratio": NUMBER,
+        "tortuosity_factor": NUMBER,
+        "collected_sold_fraction": NUMBER,
+    },
+}
+
+SHAPES = {
+    "Disk": (Disk, ["radius"]),
+    "Annulus": (Annulus, ["inner_radius", "outer_radius"]),
+    "Semiannulus": (Semiannulus, ["inner_radius", "outer_radius"]),
+}
+
+EMISSION_FACTOR_UNITS = ["kg / t", "kg / t / km"]
+
+EXTERNAL_COST_UNIT = "USD / t"
+
+# As in  manuscript1.parameters.external_cost, from the PDP8 draft 3
+DEFAULT_EXTERNAL_COST = {
+    "CO2": "4 USD / t",
+    "SO2": "5700 USD / t",
+    "PM10": "0 USD / t",
+    "PM2.5": "7200 USD / t",
+    "NOx": "5700 USD / t",
+}
+
+OPTIONAL_SECTIONS = {"external_cost": DEFAULT_EXTERNAL_COST}
+
+SECTIONS = {
+    "economics": Economics,
+    "plant": PlantParameter,
+    "cofire": CofiringParameter,
+    "price": Price,
+    "farmer": FarmerParameter,
+    "reseller": ResellerParameter,
+    "mining": MiningParameter,
+}
+
+
+class Scenario(
+    namedtuple(
+        "Scenario",
+        "name economics external_cost plant cofire supply_chain price farmer reseller "
+        "mining emission_factor",
+    )
+):
+    """The parameters of a system, as read from a scenario file."""
+
+    __slots__ = ()
+
+    def system(self, dispatch=None):
+        """Return the System of the scenario."""
+        return System(
+            self.plant,
+            self.cofire,
+            self.supply_chain,
+            self.price,
+            self.farmer,
+            self.reseller,
+            self.mining,
+            self.emission_factor,
+            dispatch,
+        )
+
+
+#%% Reading
+
+
+@lru_cache(maxsize=None)
+def unit_dimension(unit):
+    """Return the dimension of a unit expression, as a string, "" if dimensionless."""
+    return str(dimension_of(parse_unit(unit)) or "")
+
+
+def parse_quantity(text, unit, path):
+    """Return the quantity written as "value unit", checking it has the dimension of unit."""
+    if not isinstance(text, str):
+        raise ValueError(f"{path}: expecting a string 'value {unit}', got {text!r}")
+    number, _, written_unit = text.strip().partition(" ")
+    written_unit = written_unit.strip() or "1"
+    try:
+        dimension = unit_dimension(written_unit)
+        number = float(number)
+    except (AssertionError, AttributeError, KeyError, ValueError) as error:
+        raise ValueError(f"{path}: cannot read {text!r} as a quantity") from error
+    if dimension != unit_dimension(unit):
+        raise ValueError(f"{path}: {text!r} is not in a unit like {unit}")
+    return quantity(number, written_unit)
+
+
+def parse_value(data, spec, path):
+    """Return the value of a field read from JSON, following its spec in SCHEMA."""
+    if spec == TEXT:
+        if not isinstance(data, str):
+            raise ValueError(f"{path}: expecting a string, got {data!r}")
+        return data
+    if spec in (INTEGER, NUMBER):
+        if isinstance(data, bool) or not isinstance(data, (int, float)):
+            raise ValueError(f"{path}: expecting a number, got {data!r}")
+        if spec == INTEGER and not isinstance(data, int):
+            raise ValueError(f"{path}: expecting an integer, got {data!r}")
+        return data
+    if isinstance(spec, set):
+        (item_spec,) = spec
+        _check_type(data, dict, path)
+        return {k: parse_value(v, item_spec, f"{path}.{k}") for k, v in data.items()}
+    if spec in SCHEMA:
+        return parse_record(data, spec, path)
+    if spec == "curve":
+        _check_type(data, dict, path)
+        try:
+            return curve_from_dict(data)
+        except (AssertionError, TypeError, KeyError, ValueError) as error:
+            raise ValueError(f"{path}: not a valid curve, {error}") from error
+    if spec == "shape":
+        return parse_shape(data, path)
+    if spec == "km" and data == ENDOGENOUS:
+        return data
+    return parse_quantity(data, spec, path)
+
+
+def _check_type(data, kind, path):
+    if not isinstance(data, kind):
+        raise ValueError(f"{path}: expecting a {kind.__name__}, got {data!r}")
+
+
+def parse_record(data, kind, path):
+    """Return the named tuple, or the object, of the given kind from a JSON object."""
+    _check_type(data, dict, path)
+    schema = SCHEMA[kind]
+    missing = [field for field in schema if field not in data]
+    unknown = [field for field in data if field not in schema]
+    if missing or unknown:
+        raise ValueError(f"{path}: missing fields {missing}, unknown fields {unknown}")
+    fields = {
+        f: parse_value(data[f], spec, f"{path}.{f}") for f, spec in schema.items()
+    }
+    return kind(**fields)
+
+
+def parse_shape(data, path):
+    """Return the Shape of a supply zone, from {"kind": "Disk", "radius": "50 km"}."""
+    _check_type(data, dict, path)
+    fields = dict(data)
+    kind = fields.pop("kind", None)
+    if kind not in SHAPES:
+        raise ValueError(f"{path}: expecting a shape kind among {list(SHAPES)}")
+    cls, names = SHAPES[kind]
+    if sorted(fields) != sorted(names):
+        raise ValueError(f"{path}: a {kind} has the fields {names}")
+    return cls(*(parse_quantity(fields[n], "km", f"{path}.{n}") for n in names))
+
+
+def parse_emission_factors(data, path):
+    """Return the EmissionFactorTable, adding the null source used by plants without fuel."""
+    _check_type(data, dict, path)
+    factors = {}
+    for source, row in data.items():
+        _check_type(row, dict, f"{path}.{source}")
+        factors[source] = {}
+        for pollutant, text in row.items():
+            where = f"{path}.{source}.{pollutant}"
+            for unit in EMISSION_FACTOR_UNITS:
+                try:
+                    factors[source][pollutant] = parse_quantity(text, unit, where)
+                    break
+                except ValueError:
+                    pass
+            else:
+                raise ValueError(f"{where}: {text!r} is not in kg / t nor kg / t / km")
+    pollutants = list(next(iter(factors.values()), {}))
+    for source, row in factors.items():
+        if list(row) != pollutants:
+            raise ValueError(f"{path}.{source}: expecting pollutants {pollutants}")
+    factors = {None: {pollutant: 0.0 for pollutant in pollutants}, **factors}
+    return EmissionFactorTable(factors)
+
+
+def parse_scenario(data, path="scenario"):
+    """Return the Scenario described by a JSON object, or raise ValueError."""
+    _check_type(data, dict, path)
+    expected = list(Scenario._fields)
+    required = set(expected) - set(OPTIONAL_SECTIONS)
+    if not required <= set(data) <= set(expected):
+        raise ValueError(f"{path}: expecting the sections {expected}")
+    data = {**OPTIONAL_SECTIONS, **data}
+    sections = {
+        name: _parse_section(data[name], kind, f"{path}.{name}")
+        for name, kind in SECTIONS.items()
+    }
+    return Scenario(
+        name=parse_value(data["name"], TEXT, f"{path}.name"),
+        supply_chain=_parse_section(
+            data["supply_chain"], SupplyChain, f"{path}.supply_chain"
+        ),
+        emission_factor=_parse_section(
+            data["emission_factor"], EmissionFactorTable, f"{path}.emission_factor"
+        ),
+        external_cost=_parse_section(
+            data["external_cost"], Series, f"{path}.external_cost"
+        ),
+        **sections,
+    )
+
+
+def parse_supply_chain(data, path):
+    """Return the SupplyChain from a list of zones."""
+    _check_type(data, list, path)
+    zones = [
+        parse_record(zone, SupplyZone, f"{path}[{i}]") for i, zone in enumerate(data)
+    ]
+    return SupplyChain(zones)
+
+
+# The caches are bounded, they live as long as a service or a worker process
+SECTIONS_CACHE_SIZE = 1024
+FILES_CACHE_SIZE = 256
+
+_sections = OrderedDict()
+_cache = OrderedDict()
+_lock = Lock()
+
+
+def _cached(cache, key, compute, size):
+    """Return the value of key in an LRU cache, computing it on a miss. Thread safe."""
+    with _lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    value = compute()
+    with _lock:
+        cache[key] = value
+        while len(cache) > size:
+            cache.popitem(last=False)
+    return value
+
+
+def _parse_section(data, kind, path):
+    """Parse a section of a scenario, or reuse it if the same was parsed before.
+
+    Scenarios in a batch usually share most of their sections, like the emission factors.
+    The parsed values are shared, they must not be modified.
+    """
+
+    def parse():
+        if kind is SupplyChain:
+            return parse_supply_chain(data, path)
+        if kind is EmissionFactorTable:
+            return parse_emission_factors(data, path)
+        if kind is Series:
+            return Series(parse_value(data, {EXTERNAL_COST_UNIT}, path))
+        return parse_value(data, kind, path)
+
+    key = (kind.__name__, json.dumps(data, sort_keys=True))
+    return _cached(_sections, key, parse, SECTIONS_CACHE_SIZE)
+
+
+def load_scenarios(path):
+    """Return the list of scenarios in a JSON file, cached by the content of the file."""
+    content = Path(path).read_bytes()
+
+    def parse():
+        data = json.loads(content)
+        if isinstance(data, list):
+            name = Path(path).name
+            return [parse_scenario(d, f"{name}[{i}]") for i, d in enumerate(data)]
+        return [parse_scenario(data, Path(path).name)]
+
+    key = sha256(content).hexdigest()
+    return list(_cached(_cache, key, parse, FILES_CACHE_SIZE))
+
+
+def load_scenario(path):
+    """Return the scenario in a JSON file holding one."""
+    scenarios = load_scenarios(path)
+    assert len(scenarios) == 1, f"{path} holds {len(scenarios)} scenarios"
+    return scenarios[0]
+
+
+def load_batch(paths):
+    """Return the scenarios of many files, or of all the .json files in a directory."""
+    paths = [Path(paths)] if isinstance(paths, (str, Path)) else map(Path, paths)
+    result = []
+    for path in paths:
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for file in files:
+            result.extend(load_scenarios(file))
+    return result
+
+
+#%% Writing
+
+
+def format_value(value, spec):
+    """Return the JSON value of a field, the inverse of  parse_value."""
+    if spec in (TEXT, INTEGER, NUMBER) or (spec == "km" and value == ENDOGENOUS):
+        return value
+    if isinstance(spec, set):
+        (item_spec,) = spec
+        return {k: format_value(v, item_spec) for k, v in value.items()}
+    if spec in SCHEMA:
+        return format_record(value, spec)
+    if spec == "curve":
+        return value.as_dict()
+    if spec == "shape":
+        kind = type(value).__name__
+        _, names = SHAPES[kind]
+        return {
+            "kind": kind,
+            **{n: format_value(getattr(value, n), "km") for n in names},
+        }
+    return f"{float(in_unit(value, spec)):.12g} {spec}"
+
+
+def format_record(record, kind):
+    """Return the dict of a named tuple, or of an object, for JSON."""
+    return {
+        field: format_value(getattr(record, field), spec)
+        for field, spec in SCHEMA[kind].items()
+    }
+
+
+def scenario_to_dict(scenario):
+    """Return the JSON object describing a Scenario."""
+    result = {"name": scenario.name}
+    result["external_cost"] = {
+        pollutant: format_value(cost, EXTERNAL_COST_UNIT)
+        for pollutant, cost in scenario.external_cost.items()
+    }
+    for name, kind in SECTIONS.items():
+        result[name] = format_record(getattr(scenario, name), kind)
+    result["supply_chain"] = [
+        format_record(zone, SupplyZone) for zone in scenario.supply_chain.zones
+    ]
+    table = scenario.emission_factor
+    result["emission_factor"] = {}
+    for source in table.sources:
+        if source is None:
+            continue
+        row = table[source]
+        # The units of the table, since the factors are bare floats in float mode
+        per_km = dimension_of(table.units[table.index[source], 0]) is not None
+        unit = "kg / t / km" if per_km else "kg / t"
+        result["emission_factor"][source] = {
+            pollutant: format_value(row[pollutant], unit) for pollutant in row
+        }
+    return {field: result[field] for field in Scenario._fields}
+
+
+def save_scenario(scenario, path):
+    """Write a scenario as a JSON file."""
+    with open(path, "w") as file:
+        json.dump(scenario_to_dict(scenario), file, indent=2)
+        file.write("\n")
@@ -0,0 +1,359 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# Local evaluation service
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Serve the model over HTTP on the local machine, for notebooks and dashboards.
+
+The server process imports the model once and keeps its caches warm: the units,
+the parsed scenario sections, see  model.scenario, and the results of the scenarios
+already evaluated. Requests are served concurrently, one thread each.
+Requests and responses are JSON. A scenario is given by the name of a preloaded
+scenario file, like "MD1", or as a scenario object written as in the files.
+
+    GET  /scenarios     the names of the preloaded scenarios
+    POST /evaluate      {"scenario": ...}
+                        the SystemResult, in the display units of  model.result.FIELDS
+    POST /sweep         {"scenario": ..., "parameter": "cofire.cofire_rate",
+                         "values": [0.02, 0.05, 0.1]}
+                        the results with one field of the scenario set to each value,
+                        written as in the files. List items are numbered: supply_chain.0
+    POST /wtawtp        {"scenario": ...}
+                        the farmer WTA, plant WTP and transport cost, in USD/t
+    GET  /stats         the number and time of the requests by endpoint, and the caches
+
+Infeasible scenarios give null results. Malformed requests raise RequestError and get
+a 400 response with an "error" message. Other errors, including a ValueError from
+the model, get a 500 response, logged on stderr.
+Each response tells its computing time in a Server-Timing header.
+
+Usage, from the project root directory:
+    python -m model.service --port 8000 Data/scenarios
+    curl -d '{"scenario": "MD1"}' http://localhost:8000/evaluate
+"""
+
+import copy
+import json
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from collections import OrderedDict
+from concurrent.futures import Future
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import model.scenario
+from model.batch import as_row, evaluate, scenario_files
+from model.scenario import parse_scenario
+from model.utils import float_mode, in_unit, parse_unit
+from model.wtawtp import farmer_wta, plant_wtp
+
+RESULT_CACHE_SIZE = 4096
+
+
+class RequestError(ValueError):
+    """A malformed request, answered with a 400 response."""
+
+
+class ResultCache:
+    """The results of the scenarios evaluated, keyed by a hash of the scenario JSON.
+
+    Concurrent requests for the same key wait for a single computation.
+    The least recently used are dropped beyond  size  entries. Thread safe.
+    """
+
+    def __init__(self, size=RESULT_CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Return the cached value for key, or compute and store it."""
+        with self._lock:
+            future = self._entries.get(key)
+            missed = future is None
+            if missed:
+                self.misses += 1
+                future = self._entries[key] = Future()
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+        if missed:
+            try:
+                future.set_result(compute())
+            except Exception as error:  # pylint: disable=broad-except
+                with self._lock:
+                    self._entries.pop(key, None)
+                future.set_exception(error)
+        return future.result()
+
+    def stats(self):
+        """Return the counts of hits, misses and entries."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class Timings:
+    """The number of requests and the time spent serving them, by endpoint. Thread safe."""
+
+    def __init__(self):
+        self._table = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, seconds):
+        """Record one request."""
+        with self._lock:
+            count, total, longest = self._table.get(endpoint, (0, 0.0, 0.0))
+            self._table[endpoint] = (count + 1, total + seconds, max(longest, seconds))
+
+    def stats(self):
+        """Return the count, total and longest time in seconds by endpoint."""
+        with self._lock:
+            return {
+                endpoint: {"count": count, "total": total, "max": longest}
+                for endpoint, (count, total, longest) in self._table.items()
+            }
+
+
+class Evaluator:
+    """Evaluate scenarios for the service, from preloaded scenario files."""
+
+    def __init__(self, paths=("Data/scenarios",), cache_size=RESULT_CACHE_SIZE):
+        self.scenarios = {}
+        for file in scenario_files(paths):
+            data = json.loads(file.read_text())
+            parse_scenario(data, file.name)  # Check it, and warm the section cache
+            self.scenarios[file.stem] = data
+        self.results = ResultCache(cache_size)
+        self.wtawtp_results = ResultCache(cache_size)
+
+    def scenario_data(self, reference):
+        """Return the JSON object of a scenario, given by name or as an object."""
+        if isinstance(reference, dict):
+            return reference
+        if not isinstance(reference, str):
+            raise RequestError("Expecting a scenario name or a scenario object")
+        if reference not in self.scenarios:
+            raise RequestError(
+                f"Unknown scenario {reference!r}, expecting {list(self.scenarios)}"
+            )
+        return self.scenarios[reference]
+
+    def evaluate(self, data):
+        """Return the results of a scenario object, as a dict in display units."""
+        return self.results.get(
+            _fingerprint(data), lambda: as_row(evaluate(_parsed(data)))
+        )
+
+    def sweep(self, data, parameter, values):
+        """Return the results with a field of the scenario set to each of the values."""
+        return [self.evaluate(with_field(data, parameter, v)) for v in values]
+
+    def wtawtp(self, data):
+        """Return the farmer WTA, plant WTP and transport cost of a scenario, in USD/t."""
+        return self.wtawtp_results.get(
+            _fingerprint(data), lambda: _wtawtp(_parsed(data))
+        )
+
+    def stats(self):
+        """Return the statistics of the caches."""
+        info = parse_unit.cache_info()
+        return {
+            "results": self.results.stats(),
+            "wtawtp": self.wtawtp_results.stats(),
+            "scenario_files": len(model.scenario._cache),
+            "scenario_sections": len(model.scenario._sections),
+            "units": {"hits": info.hits, "misses": info.misses, "size": info.currsize},
+        }
+
+
+def _fingerprint(data):
+    return sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def _parsed(data):
+    """Return the Scenario of a scenario object, raise RequestError if it is malformed."""
+    try:
+        return parse_scenario(data)
+    except ValueError as error:
+        raise RequestError(str(error)) from error
+
+
+def _wtawtp(scenario):
+    economics = scenario.economics
+    try:
+        with float_mode():
+            system = scenario.system()
+            values = {
+                "wta": farmer_wta(system),
+                "wtp": plant_wtp(system, economics.discount_rate, economics.horizon),
+                "transport_cost": system.transport_cost_per_t[1],
+            }
+    except AssertionError:
+        return {"name": scenario.name, "wta": None, "wtp": None, "transport_cost": None}
+    result = {k: float(in_unit(v, "USD/t")) for k, v in values.items()}
+    return {"name": scenario.name, **result}
+
+
+def with_field(data, path, value):
+    """Return a copy of the scenario object with the field at a dotted path set to value.
+
+    >>> with_field({"cofire": {"cofire_rate": 0.05}}, "cofire.cofire_rate", 0.1)
+    {'cofire': {'cofire_rate': 0.1}}
+    >>> with_field({"zones": [{"a": 1}, {"a": 2}]}, "zones.1.a", 3)
+    {'zones': [{'a': 1}, {'a': 3}]}
+    """
+    result = copy.deepcopy(data)
+    *parents, last = path.split(".")
+    node = result
+    try:
+        for key in parents:
+            node = node[int(key)] if isinstance(node, list) else node[key]
+        if isinstance(node, list):
+            node[int(last)] = value
+        elif last in node:
+            node[last] = value
+        else:
+            raise KeyError(last)
+    except (KeyError, IndexError, TypeError, ValueError) as error:
+        raise RequestError(f"No field {path} in the scenario") from error
+    return result
+
+
+def _json_safe(obj):
+    """Replace NaN by None, recursively, since JSON has no NaN."""
+    if isinstance(obj, float) and obj != obj:
+        return None
+    if isinstance(obj, dict):
+        return {k: _json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_json_safe(v) for v in obj]
+    return obj
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Route the requests to the evaluator of the server."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer GET requests."""
+        routes = {
+            "/scenarios": lambda: sorted(self.server.evaluator.scenarios),
+            "/stats": lambda: {
+                "requests": self.server.timings.stats(),
+                "caches": self.server.evaluator.stats(),
+            },
+        }
+        self._answer(routes)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Answer POST requests."""
+        evaluator = self.server.evaluator
+
+        def request():
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError as error:
+                raise RequestError(f"The request is not JSON: {error}") from error
+            if not isinstance(body, dict) or "scenario" not in body:
+                raise RequestError("Expecting a JSON object with a 'scenario'")
+            return body, evaluator.scenario_data(body["scenario"])
+
+        def sweep():
+            body, data = request()
+            if not isinstance(body.get("values"), list) or "parameter" not in body:
+                raise RequestError("Expecting a 'parameter' and a list of 'values'")
+            return {
+                "parameter": body["parameter"],
+                "values": body["values"],
+                "results": evaluator.sweep(data, body["parameter"], body["values"]),
+            }
+
+        routes = {
+            "/evaluate": lambda: evaluator.evaluate(request()[1]),
+            "/sweep": sweep,
+            "/wtawtp": lambda: evaluator.wtawtp(request()[1]),
+        }
+        self._answer(routes)
+
+    def _answer(self, routes):
+        start = time.perf_counter()
+        if self.path not in routes:
+            status, result = 404, {"error": f"No endpoint {self.path}"}
+        else:
+            try:
+                status, result = 200, routes[self.path]()
+            except RequestError as error:
+                status, result = 400, {"error": str(error)}
+            except Exception as error:  # pylint: disable=broad-except
+                self.log_error("%s: %r", self.path, error)
+                status, result = 500, {"error": f"{type(error).__name__}: {error}"}
+        elapsed = time.perf_counter() - start
+        self.server.timings.add(self.path if status != 404 else "unknown", elapsed)
+        content = json.dumps(_json_safe(result)).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Server-Timing", f"model;dur={elapsed * 1000:.1f}")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Log the requests only when the server is verbose."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def log_error(self, format, *args):  # pylint: disable=redefined-builtin
+        """Log the errors always."""
+        super().log_message(format, *args)
+
+
+class Server(ThreadingHTTPServer):
+    """The HTTP server, holding the evaluator and the request timings."""
+
+    daemon_threads = True
+
+    def __init__(self, address, evaluator, verbose=False):
+        super().__init__(address, Handler)
+        self.evaluator = evaluator
+        self.timings = Timings()
+        self.verbose = verbose
+
+
+def main(argv=None):
+    """Command line interface, see module docstring."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "paths", nargs="*", default=["Data/scenarios"], help="scenario files to preload"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--verbose", action="store_true", help="log the requests")
+    args = parser.parse_args(argv)
+
+    try:
+        evaluator = Evaluator(args.paths)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    server = Server((args.host, args.port), evaluator, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving {list(evaluator.scenarios)} on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,7 +9,7 @@
 #
 """Define geometric shapes: Disk, Annulus (ring), Semiannulus (half a ring)."""
 
-from model.utils import m, sqrt, pi
+from model.utils import m, sqrt, pi, unit_value
 
 
 class Shape:
@@ -32,7 +32,7 @@ class Disk(Shape):
     """A disk is the area inside a circle."""
 
     def __init__(self, radius):
-        assert radius >= 0 * m
+        assert radius >= 0 * unit_value(m)
         self.radius = radius
 
     def __str__(self):
@@ -58,7 +58,7 @@ class Annulus(Shape):
     """An annulus is the area between two concentric disks, a ring in common language."""
 
     def __init__(self, inner_radius, outer_radius):
-        assert outer_radius >= inner_radius >= 0 * m
+        assert outer_radius >= inner_radius >= 0 * unit_value(m)
         self.inner_radius = inner_radius
         self.outer_radius = outer_radius
 
@@ -10,7 +10,7 @@
 from copy import copy
 
 # pylint: disable=too-many-arguments
-from model.utils import isclose, display_as, t, km, ha
+from model.utils import isclose, display_as, t, km, ha, unit_value
 
 
 class SupplyZone:
@@ -121,7 +121,7 @@ class SupplyChain:
             collected.zones.append(copy(self.zones[i]))
 
         excess = collected.straw_sold() - target_quantity
-        assert excess >= 0 * t
+        assert excess >= 0 * unit_value(t)
         reduction_factor = 1 - excess / collected.zones[i].straw_sold()
         collected.zones[i] = collected.zones[i].shrink(reduction_factor)
 
@@ -152,37 +152,37 @@ class SupplyChain:
         return result
 
     def area(self):
-        surface = 0 * ha
+        surface = 0 * unit_value(ha)
         for zone in self.zones:
             surface += zone.area()
         return display_as(surface, "km2")
 
     def ricegrowing_area(self):
-        surface = 0 * ha
+        surface = 0 * unit_value(ha)
         for zone in self.zones:
             surface += zone.ricegrowing_area()
         return display_as(surface, "km2")
 
     def collected_area(self):
-        surface = 0 * ha
+        surface = 0 * unit_value(ha)
         for zone in self.zones:
             surface += zone.collected_area()
         return display_as(surface, "km2")
 
     def straw_available(self):
-        mass = 0 * t
+        mass = 0 * unit_value(t)
         for zone in self.zones:
             mass += zone.straw_available()
         return display_as(mass, "t")
 
     def straw_sold(self):
-        mass = 0 * t
+        mass = 0 * unit_value(t)
         for zone in self.zones:
             mass += zone.straw_sold()
         return display_as(mass, "t")
 
     def transport_tkm(self):
-        activity = 0 * t * km
+        activity = 0 * unit_value(t) * unit_value(km)
         for zone in self.zones:
             activity += zone.transport_tkm()
         return display_as(activity, "t * km")
@@ -10,12 +10,15 @@ from collections import namedtuple
 
 from pandas import Series, DataFrame, set_option, concat
 
-from model.utils import t, kt, npv, np_sum
+from model.utils import t, kt, npv, np_sum, unit_value, strip
 from model.utils import year_1, display_as, safe_divide, after_invest, isclose_all
+from model.utils import asarray, concatenate, magnitudes, memoized
+from model.emitter import tensor_frame
 from model.powerplant import PowerPlant
 from model.cofiringplant import CofiringPlant
 from model.farmer import Farmer
 from model.reseller import Reseller
+from model.result import SystemResult, jobs_by_segment, jobs_lines
 
 Price = namedtuple("Price", "biomass_plantgate, biomass_fieldside, coal, electricity")
 
@@ -23,6 +26,8 @@ MiningParameter = namedtuple(
     "MiningParameter", "productivity_surface, productivity_underground, wage_mining"
 )
 
+SEGMENTS = ["Plant", "Ship coal", "Transport", "Field"]
+
 
 # We should pass the parameters as an object
 # pylint: disable=too-many-instance-attributes
@@ -36,6 +41,11 @@ class System:
 
     Instance variables: plant, cofiring plant, supply_chain, reseller, farmer.
     The class is designed immutable, don't change the members after initialization.
+    In float mode, the parameters are stripped of their units on the way in.
+
+    Derived quantities are memoized per arguments, the cache is cleared by  clear_market.
+    For profiling, the calls served from the cache are counted in  memo_hits  and
+    the calls computed in  memo_misses, both dicts keyed by method name.
     """
 
     # pylint: disable=too-many-arguments
@@ -49,11 +59,35 @@ class System:
         transport_parameter,
         mining_parameter,
         emission_factor,
+        dispatch=None,
     ):
-        """Instantiate the system actors."""
-        self.plant = PowerPlant(plant_parameter, emission_factor)
+        """Instantiate the system actors.
+
+        With a  model.dispatch.Dispatch, both plants run in hourly mode.
+        The load profile must be the same every year, the supply chain is sized once.
+        """
+        (
+            plant_parameter,
+            cofire_parameter,
+            supply_chain_potential,
+            farm_parameter,
+            transport_parameter,
+            mining_parameter,
+            emission_factor,
+        ) = strip(
+            (
+                plant_parameter,
+                cofire_parameter,
+                supply_chain_potential,
+                farm_parameter,
+                transport_parameter,
+                mining_parameter,
+                emission_factor,
+            )
+        )
+        self.plant = PowerPlant(plant_parameter, emission_factor, dispatch=dispatch)
         self.cofiring_plant = CofiringPlant(
-            plant_parameter, cofire_parameter, emission_factor
+            plant_parameter, cofire_parameter, emission_factor, dispatch
         )
         self.quantity_plantgate = self.cofiring_plant.cofuel_used
         self.supply_chain = supply_chain_potential.fit(self.quantity_plantgate[1])
@@ -67,10 +101,14 @@ class System:
             self.supply_chain, transport_parameter, emission_factor
         )
         self.mining_parameter = mining_parameter
+        self.memo_hits = {}
+        self.memo_misses = {}
         self.clear_market(price)
 
     def clear_market(self, price):
-        """Realize the payments between actors."""
+        """Realize the payments between actors, and forget the memoized results."""
+        self._memo = {}
+        price = strip(price)
         self.price = price
 
         electricity_sales = self.plant.power_generation * price.electricity
@@ -100,6 +138,7 @@ class System:
         return safe_divide(self.reseller.operating_expenses(), self.quantity_fieldside)
 
     @property
+    @memoized
     def labor(self):
         """Return total work time created from co-firing."""
         time = (
@@ -111,6 +150,7 @@ class System:
         return display_as(time, "hr")
 
     @property
+    @memoized
     def wages(self):
         """Return total benefit from job creation from biomass co-firing."""
         amount = (
@@ -121,22 +161,26 @@ class System:
         )
         return display_as(amount, "kUSD")
 
+    @memoized
     def wages_npv(self, discount_rate, horizon):
         amount = npv(self.wages, discount_rate, horizon)
         return display_as(amount, "kUSD")
 
     @property
+    @memoized
     def coal_saved(self):
         mass = self.plant.mainfuel_used - self.cofiring_plant.mainfuel_used
         _ = kt  # Quiet pylint and the spyder codechecker
         return display_as(mass, "kt")
 
     @property
+    @memoized
     def coal_work_lost(self):
         time = self.coal_saved / self.mining_parameter.productivity_underground
         return display_as(time, "hr")
 
     @property
+    @memoized
     def coal_wages_lost(self):
         value = self.coal_work_lost * self.mining_parameter.wage_mining
         return display_as(value, "kUSD")
@@ -168,73 +212,75 @@ class System:
         cofiring.loc["Total_field"] = cofiring.iloc[3]
         return cofiring
 
-    def emissions_exante(self):
-        """Tabulate atmospheric emissions ex ante.
+    @memoized
+    def emissions_exante_tensor(self):
+        """Return atmospheric emissions ex ante, an array (segments, pollutants, years).
 
-        Return a dataframe of time series, indexed by segment and pollutant.
+        Segments are Plant, Ship coal, Transport, Field.
         """
-        plant_emissions = self.plant.emissions(total=True)["Total"]
-        ship_coal_emissions = self.plant.fuel_reseller().emissions(total=True)["Total"]
-        field_emissions = self.farmer.emissions_exante["Straw"]
-        transport_emissions = field_emissions * 0  # No logistics
-        total_emissions = plant_emissions + ship_coal_emissions + field_emissions
-        return DataFrame(
+        field_emissions = self.farmer.emitter_exante.total()
+        return asarray(
             [
-                plant_emissions,
-                ship_coal_emissions,
-                transport_emissions,
+                self.plant.total(),
+                self.plant.fuel_reseller().total(),
+                field_emissions * 0,  # No logistics
                 field_emissions,
-                total_emissions,
-            ],
-            index=["Plant", "Ship coal", "Transport", "Field", "Total"],
+            ]
+        )
+
+    @memoized
+    def emissions_expost_tensor(self):
+        """Return atmospheric emissions ex post, an array (segments, pollutants, years)."""
+        return asarray(
+            [
+                self.cofiring_plant.total(),
+                self.cofiring_plant.fuel_reseller().total(),
+                self.reseller.total(),
+                self.farmer.total(),
+            ]
         )
 
+    def emissions_exante(self):
+        """Tabulate atmospheric emissions ex ante.
+
+        Return a dataframe of time series, indexed by segment and pollutant.
+        """
+        return self._tensor_frame_with_total(self.emissions_exante_tensor())
+
     def emissions_expost(self):
         """Tabulate atmospheric emissions ex post.
 
         Return a dataframe of time series, indexed by segment and pollutant.
         """
-        plant_emissions = self.cofiring_plant.emissions(total=True)["Total"]
-        ship_coal_emissions = self.cofiring_plant.fuel_reseller().emissions(total=True)[
-            "Total"
-        ]
-        transport_emissions = self.reseller.emissions(total=True)["Total"]
-        field_emissions = self.farmer.emissions(total=True)["Total"]
-        total_emissions = (
-            plant_emissions
-            + ship_coal_emissions
-            + transport_emissions
-            + field_emissions
-        )
-        return DataFrame(
-            [
-                plant_emissions,
-                ship_coal_emissions,
-                transport_emissions,
-                field_emissions,
-                total_emissions,
-            ],
-            index=["Plant", "Ship coal", "Transport", "Field", "Total"],
-        )
+        return self._tensor_frame_with_total(self.emissions_expost_tensor())
 
     def emissions_reduction(self):
         """Tabulate atmospheric emissions reductions.
 
         Return a dataframe of time series, indexed by segment and pollutant.
         """
-        reduction = self.emissions_exante() - self.emissions_expost()
-        is_null_year0 = reduction.applymap(lambda sequence: sequence[0] == 0 * t)
-        assert is_null_year0.all(
-            axis=None
-        ), "Expecting zero emission reduction in year 0"
-        return reduction
+        exante = self.emissions_exante_tensor()
+        expost = self.emissions_expost_tensor()
+        reduction = concatenate(
+            [exante - expost, (exante.sum(axis=0) - expost.sum(axis=0))[None]]
+        )
+        assert (
+            magnitudes(reduction[..., 0]) == 0
+        ).all(), "Expecting zero emission reduction in year 0"
+        return tensor_frame(reduction, SEGMENTS + ["Total"], self.plant.pollutants)
 
+    def _tensor_frame_with_total(self, tensor):
+        tensor = concatenate([tensor, tensor.sum(axis=0)[None]])
+        return tensor_frame(tensor, SEGMENTS + ["Total"], self.plant.pollutants)
+
+    @memoized
     def emissions_reduction_benefit(self, external_cost):
         """Tabulate external benefits of reducing atmospheric emissions from cofiring.
 
         Return a dataframe of time series, indexed by segment and pollutant.
         We disregard PM10 externalities, impact of dust quantified using PM2.5 only
         """
+        external_cost = strip(external_cost)
         baseline = self.emissions_exante().loc["Total"]
         reduction = self.emissions_reduction().loc["Total"]
         # baseline = self.emissions_exante().loc["Total"].drop("PM10")
@@ -250,8 +296,10 @@ class System:
             index=["Baseline", "Reduction", "Relative reduction", "Value"],
         )
 
+    @memoized
     def coal_saved_benefits(self, coal_import_price):
         """Tabulate the quantity and value of coal saved by cofiring."""
+        coal_import_price = strip(coal_import_price)
         baseline = self.plant.mainfuel_used
         reduction = self.coal_saved
         relative = reduction / baseline
@@ -262,12 +310,14 @@ class System:
             index=["Baseline", "Reduction", "Relative reduction", "Value"],
         )
 
+    @memoized
     def mitigation_npv(self, external_cost, discount_rate, horizon):
         df = self.emissions_reduction_benefit(external_cost)
         annual_mitigation_value = df.loc["Value", "CO2"]
         value = npv(annual_mitigation_value, discount_rate, horizon)
         return display_as(value, "kUSD")
 
+    @memoized
     def health_npv(self, external_cost, discount_rate, horizon):
         df = self.emissions_reduction_benefit(external_cost)
         annual_health_benefit = df.loc["Value"].drop("CO2").sum()
@@ -296,35 +346,10 @@ class System:
 
     def benefits(self, discount_rate, horizon, external_cost):
         """Tabulate the present value of various benefits from co-firing."""
-        table = [""]
-        table.append(self.cofiring_plant.name)
-        table.append("-------------------")
-        row2 = "{:30}" + "{:20.0f}"
-        table.append(
-            row2.format(
-                "Health", self.health_npv(external_cost, discount_rate, horizon)
-            )
-        )
-        table.append(
-            row2.format(
-                "Emission reduction",
-                self.mitigation_npv(external_cost, discount_rate, horizon),
-            )
-        )
-        table.append(row2.format("Wages", self.wages_npv(discount_rate, horizon)))
-        table.append(
-            row2.format(
-                "Farmer earnings before tax",
-                self.farmer.net_present_value(discount_rate, horizon),
-            )
-        )
-        table.append(
-            row2.format(
-                "Trader earnings before tax",
-                self.reseller.net_present_value(discount_rate, horizon),
-            )
+        result = SystemResult.from_system(
+            self, discount_rate, horizon, external_cost, wtawtp=False
         )
-        return "\n".join(table)
+        return result.benefits_table()
 
     def plant_npv_cash_change(
         self, discount_rate, horizon, tax_rate, depreciation_period
@@ -407,41 +432,10 @@ class System:
         table.name = self.plant.name
         return table
 
-    # Code really smell, will change result to DataFrame now.
-    # pylint: disable=too-many-locals
     def job_changes(self):
         """Tabulate the number of full time equivalent (FTE) jobs created/destroyed by cofiring."""
         cols = "{:25}{:12.1f}"
-        cols2 = "{:25}{:12.1f}{:12.1f}"
-
-        lines = ["Benefit from job creation: " + self.plant.name + "\n"]
-
-        row7 = self.farmer.labor()[1]
-        row1 = self.farmer.labor_cost()[1]
-        row8 = self.reseller.driving_work()[1]
-        row2 = self.reseller.driving_wages()[1]
-        row11 = self.reseller.loading_work()[1]
-        row12 = self.reseller.loading_wages()[1]
-        row9 = self.cofiring_plant.cofuel_om_work()[1]
-        row3 = self.cofiring_plant.cofuel_om_wages()[1]
-        row6 = -self.coal_work_lost[1]
-        row5 = -self.coal_wages_lost[1]
-        row10 = self.labor[1]
-        row4 = self.wages[1]
-
-        display_as(row6, "FTE")
-        display_as(row7, "FTE")
-        display_as(row8, "FTE")
-        display_as(row9, "FTE")
-        display_as(row10, "FTE")
-        display_as(row11, "FTE")
-
-        lines.append(cols2.format("Biomass collection", row7, row1))
-        lines.append(cols2.format("Biomass transportation", row8, row2))
-        lines.append(cols2.format("Biomass loading", row11, row12))
-        lines.append(cols2.format("O&M", row9, row3))
-        lines.append(cols2.format("Mining", row6, row5))
-        lines.append(cols2.format("Total", row10, row4))
+        lines = jobs_lines(self.plant.name, jobs_by_segment(self))
         lines.append("")
         lines.append(cols.format("Area collected", self.supply_chain.area()))
         lines.append(
@@ -18,7 +18,8 @@ are better shown as   (a, b, npv(s))
 from pandas import DataFrame, Series, concat
 
 # pylint: disable=wrong-import-order
-from model.utils import display_as, isclose, y, t, hr, USD, FTE, year_1, summarize
+from model.utils import display_as, isclose, y, t, hr, USD, FTE, year_1, summarize_all
+from model.utils import unit_value, strip
 from model.wtawtp import feasibility_by_solving, feasibility_direct
 
 
@@ -30,12 +31,12 @@ def emission_reductions_by_activity(system_a, system_b):
     reductions_a = year_1(system_a.emissions_reduction())
     reductions_b = year_1(system_b.emissions_reduction())
     contents = [
-        reductions_a["Plant"] / (t / y),
-        reductions_a["Transport"] / (t / y),
-        reductions_a["Field"] / (t / y),
-        reductions_b["Plant"] / (t / y),
-        reductions_b["Transport"] / (t / y),
-        reductions_b["Field"] / (t / y),
+        reductions_a["Plant"] / unit_value(t / y),
+        reductions_a["Transport"] / unit_value(t / y),
+        reductions_a["Field"] / unit_value(t / y),
+        reductions_b["Plant"] / unit_value(t / y),
+        reductions_b["Transport"] / unit_value(t / y),
+        reductions_b["Field"] / unit_value(t / y),
     ]
     headers = [
         "Plant " + system_a.plant.parameter.name,
@@ -68,7 +69,7 @@ def emissions_reduction_benefit(system_a, system_b, external_cost, discount_rate
     ]
     headers = [" Quantity", "Value", " Quantity", "Value"]
     table = DataFrame(data=contents, index=headers)
-    table = table.applymap(lambda x: summarize(x, discount_rate))
+    table = summarize_all(table, discount_rate)
     return table[["CO2", "SO2", "PM2.5", "NOx"]].T
 
 
@@ -78,13 +79,13 @@ def coal_saved_benefit(system_a, system_b, coal_import_price, discount_rate):
     Summarize the time series as [x0, x1, npv(x0, x1, ...)].
     """
     cols = ["Reduction", "Value"]
-    data_a = system_a.coal_saved_benefits(coal_import_price).loc[cols]
-    data_a = data_a.apply(lambda x: summarize(x, discount_rate), axis=1)
-    data_b = system_b.coal_saved_benefits(coal_import_price).loc[cols]
-    data_b = data_b.apply(lambda x: summarize(x, discount_rate), axis=1)
-    index = [system_a.plant.name, system_b.plant.name]
-    df = DataFrame([data_a, data_b], index=index)
-    return df.T
+    series = {
+        system.plant.name: list(
+            system.coal_saved_benefits(coal_import_price).loc[cols].to_numpy()
+        )
+        for system in (system_a, system_b)
+    }
+    return summarize_all(DataFrame(series, index=cols), discount_rate)
 
 
 #%%
@@ -96,7 +97,7 @@ def emissions_reduction_ICERE(system_a, system_b, external_cost):
         system_a, system_b, external_cost, discount_rate=0
     )
     table = table.applymap(lambda sequence: sequence[1])
-    table.insert(loc=0, column="Specific cost", value=external_cost)
+    table.insert(loc=0, column="Specific cost", value=strip(external_cost))
     return table
 
 
@@ -248,11 +249,11 @@ def balance_jobs(system_a, system_b):
         )
 
     contents = [
-        rates / (USD / hr),
-        work(system_a) / FTE,
-        wages(system_a) / (1000 * USD),
-        work(system_b) / FTE,
-        wages(system_b) / (1000 * USD),
+        rates / unit_value(USD / hr),
+        work(system_a) / unit_value(FTE),
+        wages(system_a) / unit_value(1000 * USD),
+        work(system_b) / unit_value(FTE),
+        wages(system_b) / unit_value(1000 * USD),
     ]
     headers = ["Base salary", "Jobs", "Value", "Jobs", "Value"]
     table = DataFrame(data=contents, index=headers)
@@ -8,10 +8,19 @@
 # Creative Commons Attribution-ShareAlike 4.0 International
 """Common init file for all modules in the directory.
 
-For 10x acceleration, add these three lines BEFORE imporing this module:
-    # pylint: disable=wrong-import-position
-    from natu import config
-    config.use_quantities = False
+For a 9x to 190x acceleration of the model core, as measured by  benchmark.suite,
+run the model in float mode:
+    with float_mode():
+        system = System(...)
+        ...
+Parameters are defined with units, which checks their dimensions once.
+In float mode,  System  strips them to plain floats in base units (kg, s, m, USD...),
+and the model runs on float64 arrays. Use  with_unit  to reattach a unit to a result.
+Objects built in float mode must be used in float mode.
+Both modes coexist in a process, the mode is a context variable.
+
+The legacy way still works: set  natu.config.use_quantities = False  BEFORE importing
+this module, then float mode is the default everywhere.
 
 Besides that, no module should import objects from natu.
 
@@ -22,25 +31,36 @@ Units thread into arrays from the right but not from the left
  So when multiplying a vector by a quantity, put the vector left
 """
 
-from numpy import asarray, arange
+from contextlib import contextmanager
+from contextvars import ContextVar
+from copy import copy
+from functools import lru_cache, wraps
+
+from numpy import asarray, arange, ndarray, divide, empty, full, nan
+from pandas import DataFrame, Series
 
 from natu import config
 
-from natu.numpy import array, unique
+from natu.numpy import array
 from natu.numpy import ones, zeros, concatenate, cumsum, roll, sum as np_sum
-from natu.math import fsum, sqrt, pi
+from natu.math import fsum, sqrt as natu_sqrt, pi
 from natu.units import t, hr, d, y
 from natu.units import m, km, ha, g, kg, MJ, GJ, TJ, kWh, MWh, kW, MW
 from natu import units
-from natu.core import ScalarUnit
+from natu.core import ScalarUnit, Quantity, UnitExponents, unitspace, value, merge
 
 # Quiet pylint "unused-import" warning , they are for re-export.
 _ = m, km, ha, g, kg, d, MJ, GJ, TJ, kWh, MWh, kW, MW
 _ = arange, ones, zeros, concatenate, np_sum, cumsum, roll
-_ = fsum, sqrt, pi
+_ = fsum, pi
 
 use_floats = not config.use_quantities
 
+_float_mode = ContextVar("float_mode", default=use_floats)
+
+# The dtype of model arrays in float mode, object to compute with dual numbers
+_number_type = ContextVar("number_type", default=float)
+
 # Define kt and Mt units
 # The t unit is not prefixable in natu.py , and making it so may have side effects.
 if use_floats:
@@ -74,22 +94,322 @@ FTE = 1560 * hr
 units.FTE = FTE
 
 
+#%% Float mode
+
+
+@contextmanager
+def float_mode(enabled=True, number_type=float):
+    """Run the enclosed code in float mode, or in quantity mode if  enabled  is False.
+
+    With  number_type=object, model arrays are object arrays in float mode,
+    to hold numbers which are not floats, like the dual numbers of  model.dual.
+
+    >>> using_floats()
+    False
+    >>> with float_mode():
+    ...     using_floats()
+    True
+    """
+    token = _float_mode.set(enabled)
+    type_token = _number_type.set(number_type)
+    try:
+        yield
+    finally:
+        _number_type.reset(type_token)
+        _float_mode.reset(token)
+
+
+def in_float_mode(function):
+    """Decorate function to run in float mode, for example a model blackbox."""
+
+    @wraps(function)
+    def wrapped(*args, **kwargs):
+        with float_mode():
+            return function(*args, **kwargs)
+
+    return wrapped
+
+
+def using_floats():
+    """Return True if the model is running in float mode."""
+    return _float_mode.get()
+
+
+def array_type():
+    """Return the dtype of model arrays: float in float mode, object for quantities.
+
+    >>> array_type()
+    <class 'object'>
+    >>> with float_mode():
+    ...     array_type()
+    <class 'float'>
+    """
+    if _float_mode.get():
+        return _number_type.get()
+    return object
+
+
+def unit_value(unit):
+    """Return the unit, or its value in base units when running in float mode.
+
+    Use it where the model code computes with a unit, as in  zeros(n) * unit_value(USD).
+
+    >>> unit_value(hr) is hr
+    True
+    >>> with float_mode():
+    ...     unit_value(hr)
+    3600.0
+    """
+    if using_floats():
+        return float(value(unit))
+    return unit
+
+
+def strip(obj, _memo=None):
+    """Return obj with all quantities replaced by their value in base units, in float mode.
+
+    Works through numbers, arrays, pandas objects, named tuples, containers and
+    plain objects, which are shallow copied. Shared references stay shared.
+    Outside float mode, return obj unchanged.
+
+    >>> strip(2 * hr)
+    2 hr
+    >>> with float_mode():
+    ...     strip({'time': 2 * hr, 'rate': 0.5})
+    {'time': 7200.0, 'rate': 0.5}
+    """
+    if not using_floats():
+        return obj
+    if _memo is None:
+        _memo = {}
+    key = id(obj)
+    if key in _memo:
+        return _memo[key][0]
+    if isinstance(obj, Quantity):
+        result = obj._value
+    elif obj is None or isinstance(obj, (bool, int, float, complex, str, type)):
+        return obj
+    elif isinstance(obj, ndarray):
+        result = obj
+        if obj.dtype == object:
+            result = asarray([strip(x, _memo) for x in obj.flat]).reshape(obj.shape)
+    elif isinstance(obj, Series):
+        result = obj.map(lambda x: strip(x, _memo))
+    elif isinstance(obj, DataFrame):
+        result = obj.applymap(lambda x: strip(x, _memo))
+    elif isinstance(obj, tuple) and hasattr(obj, "_fields"):
+        result = obj._make(strip(x, _memo) for x in obj)
+    elif isinstance(obj, (tuple, list)):
+        result = type(obj)(strip(x, _memo) for x in obj)
+    elif isinstance(obj, dict):
+        result = {k: strip(v, _memo) for k, v in obj.items()}
+    elif hasattr(obj, "__dict__") and not callable(obj):
+        result = copy(obj)
+        _memo[key] = (result, obj)  # Before recursing, for cycles
+        result.__dict__ = strip(vars(obj), _memo)
+    else:
+        return obj
+    _memo[key] = (result, obj)  # Keep obj alive so that its id is not reused
+    return result
+
+
+def with_unit(qty, unit):
+    """Reattach a unit to a float in base units, or a vector of them, for display.
+
+    The inverse of  strip. Quantities are displayed in the unit, numbers are
+    interpreted as values in base units. Transparent in float mode.
+
+    >>> with_unit(7200.0, 'hr')
+    2 hr
+    >>> with_unit([1000.0, 2e6], 'kUSD')
+    [1 kUSD, 2000 kUSD]
+    >>> with float_mode():
+    ...     with_unit(7200.0, 'hr')
+    7200.0
+    """
+    if using_floats():
+        return qty
+    if isinstance(qty, ndarray):
+        return array([with_unit(element, unit) for element in qty], dtype=object)
+    if isinstance(qty, list):
+        return [with_unit(element, unit) for element in qty]
+    if not isinstance(qty, Quantity):
+        prototype = unitspace(**UnitExponents(unit))
+        qty = Quantity(qty, prototype.dimension, prototype.display_unit)
+    qty.display_unit = unit
+    return qty
+
+
+def in_unit(qty, unit):
+    """Return the magnitude of a quantity, or a float in base units, in the given unit.
+
+    Works on vectors too, the result is a float array.
+
+    >>> in_unit(7200.0, 'hr')
+    2.0
+    >>> in_unit([1 * MUSD, 500 * kUSD], 'MUSD')
+    array([1. , 0.5])
+    """
+    return magnitudes(qty) / float(value(unitspace(**UnitExponents(unit))))
+
+
+@lru_cache(maxsize=None)
+def parse_unit(unit):
+    """Return the unit described by an expression like 'USD / kW / y'.
+
+    A dimensionless unit is returned as a number.
+
+    >>> parse_unit('t / ha')
+    ScalarUnit t/ha with dimension M/L2 (not prefixable)
+    >>> parse_unit('kg / t')
+    0.001
+    """
+    return unitspace(**UnitExponents(unit))
+
+
+@lru_cache(maxsize=None)
+def _prototype(unit):
+    """Return one unit of the given expression, as a quantity."""
+    return 1.0 * parse_unit(unit)
+
+
+def quantity(number, unit):
+    """Return  number * unit  for a unit given as an expression.
+
+    Same as multiplying by the unit, but natu simplifies the display unit of
+    each product, which is slow. Here a prototype made once per unit is copied.
+
+    >>> quantity(1080, 'MW') == 1080 * MW
+    True
+    """
+    prototype = _prototype(unit)
+    if not isinstance(prototype, Quantity):
+        return number * prototype
+    result = object.__new__(Quantity)
+    result.__dict__.update(vars(prototype))
+    result._value = number * prototype._value
+    return result
+
+
+def dimension_of(qty):
+    """Return the dimension of a quantity, None for a number.
+
+    >>> dimension_of(3 * km), dimension_of(0.5)
+    (L, None)
+    """
+    return getattr(qty, "dimension", None)
+
+
+#%% Memoization
+
+
+def memo_key(obj):
+    """Return a hashable key describing the value of obj, for memoization.
+
+    Quantities are keyed by value and dimension, arrays and pandas objects by content.
+
+    >>> memo_key([48 * hr, 0.5]) == memo_key([2 * d, 0.5])
+    True
+    >>> memo_key(Series({'CO2': 6.0}))
+    ('Series', ('CO2',), (6.0,))
+    """
+    if isinstance(obj, Quantity):
+        return ("Quantity", obj._value, str(obj.dimension))
+    if isinstance(obj, (Series, DataFrame)):
+        return (type(obj).__name__, tuple(obj.index), memo_key(obj.to_numpy().tolist()))
+    if isinstance(obj, ndarray):
+        if obj.dtype == object:
+            return memo_key(obj.tolist())
+        return (str(obj.dtype), obj.shape, obj.tobytes())
+    if isinstance(obj, (tuple, list)):
+        return tuple(memo_key(x) for x in obj)
+    if isinstance(obj, dict):
+        return tuple(sorted((k, memo_key(v)) for k, v in obj.items()))
+    return obj
+
+
+def _shared(result):
+    """Return a memoized result safe to give to a caller.
+
+    Arrays are returned as read-only views. The items of object arrays, like
+    quantities, are mutable by  display_as, so those arrays are copied item by item.
+    """
+    if not isinstance(result, ndarray):
+        return result
+    if result.dtype == object:
+        items = [
+            merge(value(item), item) if isinstance(item, Quantity) else item
+            for item in result.flat
+        ]
+        result = empty(result.shape, dtype=object)
+        result.flat[:] = items
+    else:
+        result = result.view()
+    result.setflags(write=False)
+    return result
+
+
+def memoized(method):
+    """Decorate a method to cache its result in the instance, per arguments and mode.
+
+    The instance holds the results in a dict  _memo  and counts the calls
+    in two dicts  memo_hits  and  memo_misses, keyed by method name.
+    It must clear  _memo  when its state changes. Arrays are returned read-only,
+    so that no caller can modify the cached result.
+
+    >>> class Plant:
+    ...     def __init__(self):
+    ...         self._memo, self.memo_hits, self.memo_misses = {}, {}, {}
+    ...     @memoized
+    ...     def output(self):
+    ...         return asarray([1.0, 2.0])
+    >>> plant = Plant()
+    >>> plant.output()[0] = 0
+    Traceback (most recent call last):
+    ValueError: assignment destination is read-only
+    >>> plant.output(), plant.memo_hits
+    (array([1., 2.]), {'output': 1})
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapped(self, *args, **kwargs):
+        key = (name, using_floats(), array_type(), memo_key(args), memo_key(kwargs))
+        if key in self._memo:
+            self.memo_hits[name] = self.memo_hits.get(name, 0) + 1
+        else:
+            self.memo_misses[name] = self.memo_misses.get(name, 0) + 1
+            self._memo[key] = method(self, *args, **kwargs)
+        return _shared(self._memo[key])
+
+    return wrapped
+
+
+#%% Time series
+
 TIME_HORIZON = 20
 
 ONES = ones(TIME_HORIZON + 1)
 
 
 def npv(values, rate, length=TIME_HORIZON):
-    """Net present value of an array-like cash flow.
+    """Net present value of an array-like cash flow, or of an array of them along the last axis.
 
     Includes investment in period 0 and the subsequent 'length' values.
     Cut and pasted here to avoid warnings because numpy moved it to numpy-financial.
+
+    >>> npv([-100, 10, 10, 10, 10, 10, 10, 10, 10, 10, 10], 0.1, 10) < 0
+    True
+    >>> npv([[-100] + [10] * 10, [-50] + [10] * 10], 0.1, 10) < 0
+    array([ True, False])
     """
-    assert length <= len(values), "NPV called with time horizon larger than array"
+    values = asarray(values)
+    periods = values.shape[-1]
+    assert length <= periods, "NPV called with time horizon larger than array"
     assert length in (10, 20), "Catch off by one error in testing phase"
-    mask = [1] + [1] * length + [0] * (len(values) - length - 1)
-    values = asarray(values) * mask
-    return (values / (1 + rate) ** arange(0, len(values))).sum(axis=0)
+    mask = [1] + [1] * length + [0] * (periods - length - 1)
+    values = values * mask
+    return (values / (1 + rate) ** arange(0, periods)).sum(axis=-1)
 
 
 def after_invest(qty, time_horizon=TIME_HORIZON):
@@ -107,23 +427,67 @@ def after_invest(qty, time_horizon=TIME_HORIZON):
            3 t, 3 t, 3 t, 3 t, 3 t, 3 t, 3 t, 3 t], dtype=object)
     """
     assert not hasattr(qty, "__iter__"), "Vectorize only scalar arguments."
-    data_type = float if use_floats else object
+    data_type = array_type()
     return array([0 * qty] + [qty] * time_horizon, dtype=data_type)
 
 
+def magnitudes(vector):
+    """Return the values in base units of a vector of numbers or quantities, as a float array.
+
+    >>> magnitudes([2 * hr, 3 * hr])
+    array([ 7200., 10800.])
+    """
+    vector = asarray(vector)
+    if vector.dtype == object:
+        return asarray([value(x) for x in vector.flat], dtype=float).reshape(
+            vector.shape
+        )
+    return vector.astype(float, copy=False)
+
+
+def sqrt(x):
+    """Return the square root of a number or a quantity.
+
+    Numbers with a  sqrt  method, like dual numbers, use it as in NumPy object arrays.
+
+    >>> sqrt(4 * m**2)
+    2 m
+    """
+    if hasattr(x, "sqrt"):
+        return x.sqrt()
+    return natu_sqrt(x)
+
+
+def stack(df):
+    """Return the cells of a dataframe of time series as an array of shape (rows, columns, years).
+
+    The array holds floats in float mode, quantities otherwise.
+    """
+    return asarray(df.to_numpy().tolist(), dtype=array_type())
+
+
+def assert_steady_state(sequences):
+    """Check that sequences are constant from the second period on, along the last axis."""
+    values = magnitudes(sequences)
+    is_constant = (values[..., 1:] == values[..., 1:2]).all()
+    assert is_constant, "Error: expecting everything constant after first year."
+
+
 def year_1(df):
     """Replace the vector [a, b, b, b, .., b] by the quantity  b per year, in a dataframe.
 
     Object  y  denotes the unit symbol for "year".
     This assumes that investment occured in period 0, then steady state from period 1 onwards.
-    """
+    All cells are checked and projected at once, on the stacked array.
 
-    def projector(vector):
-        scalar = vector[1]
-        assert list(vector)[1:] == [scalar] * (len(vector) - 1)
-        return scalar / y
-
-    return df.applymap(projector).T
+    >>> year_1(DataFrame({'CO2': [ONES * 2 * y]}, index=['Plant']))
+        Plant
+    CO2   2.0
+    """
+    sequences = stack(df)
+    assert_steady_state(sequences)
+    projected = sequences[..., 1] / unit_value(y)
+    return DataFrame(projected, index=df.index, columns=df.columns).T
 
 
 def summarize(sequence, discount_rate):
@@ -131,16 +495,35 @@ def summarize(sequence, discount_rate):
 
     Return first element, second element, and NPV of everything.
     """
-    is_constant = len(unique(sequence[1:])) == 1
-    assert is_constant, "Error: expecting everything constant after first year."
+    assert_steady_state(sequence)
     return sequence[0], sequence[1], npv(sequence, discount_rate)
 
 
+def summarize_all(df, discount_rate):
+    """Summarize all the time series in a dataframe, in one pass over the stacked array.
+
+    Return a dataframe of (first element, second element, NPV) triples,
+    the same as  df.applymap(lambda s: summarize(s, discount_rate)).
+    """
+    sequences = stack(df)
+    assert_steady_state(sequences)
+    present_values = npv(sequences, discount_rate)
+    rows, columns = present_values.shape
+    triples = [
+        [
+            (sequences[i, j, 0], sequences[i, j, 1], present_values[i, j])
+            for j in range(columns)
+        ]
+        for i in range(rows)
+    ]
+    return DataFrame(triples, index=df.index, columns=df.columns)
+
+
 def display_as(qty, unit):
     """Set the display_unit of qty or of qty's items to 'unit' and return qty.
 
     This function is more robust than using  qty.display_unit =  in the code directly,
-    because when  use_quantities = False  it is transparent instead of producing an error
+    because in float mode it is transparent instead of producing an error
 
     >>> import pytest
     >>> if use_floats:
@@ -157,7 +540,7 @@ def display_as(qty, unit):
     >>> display_as(v, 'd')
     [2 d, 365.25 d]
     """
-    if not use_floats:
+    if not using_floats():
         if hasattr(qty, "__iter__"):
             for element in qty:
                 element.display_unit = unit
@@ -202,7 +585,6 @@ def safe_divide(costs, masses):
     >>> import pytest
     >>> if use_floats:
     ...     pytest.skip('This doctests uses units.')
-    >>> import natu.numpy as np
     >>> costs = array([100 * USD, 200 * USD])
     >>> masses = array([0 * t, 10 * t])
 
@@ -214,24 +596,13 @@ def safe_divide(costs, masses):
      ...
     ZeroDivisionError: float division by zero
     """
-    result = costs.copy()
-    for i, mass in enumerate(masses):
-        # More pythonic, but pytest gives a warning
-        # try:
-        #     result[i] /= mass
-        # except ZeroDivisionError:
-        #     result[i] = display_as(float('NaN') * USD / t, 'USD/t')
-        if use_floats:
-            if mass != 0:
-                result[i] /= mass
-            else:
-                result[i] = display_as(float("NaN") * USD / t, "USD/t")
-        else:
-            if mass.__nonzero__():
-                result[i] /= mass
-            else:
-                result[i] = display_as(float("NaN") * USD / t, "USD/t")
-
+    numerators = magnitudes(costs)
+    denominators = magnitudes(masses)
+    result = full(numerators.shape, nan)
+    divide(numerators, denominators, out=result, where=denominators != 0)
+    if not using_floats():
+        prototype = merge(1.0, costs[0]) / merge(1.0, masses[0])
+        result = array([merge(ratio, prototype) for ratio in result], dtype=object)
     return display_as(result, "USD/t")
 
 
@@ -13,7 +13,7 @@ An Ha Truong, Minh Ha-Duong
 """
 from pandas import Series
 
-from model.utils import npv, solve_linear, USD, t, display_as, isclose
+from model.utils import npv, solve_linear, USD, t, display_as, isclose, strip
 
 #%%
 
@@ -38,7 +38,8 @@ def farmer_wta(system, starting_range=(0 * USD / t, 50 * USD / t)):
     def gain(biomass_price):
         return farmer_gain(system, biomass_price)
 
-    return solve_linear(gain, starting_range[0], starting_range[1])
+    low, high = strip(starting_range)
+    return solve_linear(gain, low, high)
 
 
 #%%
@@ -73,7 +74,8 @@ def plant_wtp(
     def gain(biomass_price):
         return plant_gain(system, biomass_price, discount_rate, horizon)
 
-    return solve_linear(gain, starting_range[0], starting_range[1])
+    low, high = strip(starting_range)
+    return solve_linear(gain, low, high)
 
 
 #%%
@@ -0,0 +1,176 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# adaptive
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Run a Monte Carlo analysis until the results are precise enough.
+
+Draws are made in batches from a ParameterSpace, and the model runs in float mode.
+After each batch, for the business value and the external value, we track
+  the mean and its standard error,
+  the quantiles, with distribution-free confidence intervals from order statistics.
+Sampling stops when all the confidence intervals are narrower than the tolerance,
+on each side of the estimate, or when the maximum number of draws is reached.
+Draws which the model asserts are infeasible are skipped, and counted.
+
+Usage:
+    space = ParameterSpace.from_table(uncertainty_MD1, CORRELATIONS)
+    result = adaptive_monte_carlo(space, f_MD1, tolerance=0.5 * MUSD)
+    print(result.draws, result.infeasible, result.converged)
+    print(result.history)
+"""
+
+from collections import namedtuple
+from math import ceil, floor, sqrt
+
+from numpy import asarray, concatenate, quantile, sort
+from numpy.random import default_rng
+from pandas import DataFrame
+
+from model.utils import MUSD, in_float_mode, magnitudes
+from sensitivity.distributions import norm_ppf
+
+OUTPUTS = ["business_value", "external_value"]
+
+Estimate = namedtuple(
+    "Estimate", "draws mean standard_error mean_halfwidth quantiles quantile_intervals"
+)
+
+Convergence = namedtuple(
+    "Convergence", "draws converged estimates history samples infeasible"
+)
+Convergence.__doc__ = """The result of an adaptive Monte Carlo analysis.
+
+draws: the number of feasible model runs
+converged: True if the target precision was reached before the maximum draws
+estimates: a dict of Estimate by output, at the end
+history: a dataframe of the estimates after each batch
+samples: the model results, an array (draws, outputs)
+infeasible: the number of draws skipped because the model asserted they are infeasible"""
+
+
+def quantile_interval(values, p, confidence=0.95):
+    """Return a distribution-free confidence interval for the p-quantile of a sample.
+
+    From the order statistics around rank (n - 1) p, normal approximation of the binomial.
+
+    >>> quantile_interval(list(range(101)), 0.5)
+    (40.0, 60.0)
+    """
+    ordered = sort(asarray(values, dtype=float))
+    n = len(ordered)
+    z = float(norm_ppf(0.5 + confidence / 2))
+    spread = z * sqrt(n * p * (1 - p))
+    low = max(floor((n - 1) * p - spread), 0)
+    high = min(ceil((n - 1) * p + spread), n - 1)
+    return float(ordered[low]), float(ordered[high])
+
+
+def estimate(values, quantiles=(0.05,), confidence=0.95):
+    """Return the Estimate of the mean and the quantiles of a sample."""
+    values = asarray(values, dtype=float)
+    n = len(values)
+    z = float(norm_ppf(0.5 + confidence / 2))
+    standard_error = values.std(ddof=1) / sqrt(n)
+    return Estimate(
+        n,
+        values.mean(),
+        standard_error,
+        z * standard_error,
+        quantile(values, quantiles),
+        [quantile_interval(values, p, confidence) for p in quantiles],
+    )
+
+
+def run_batch(run, runs):
+    """Return the results of the feasible runs, an array (runs, outputs), and the count skipped."""
+    results = []
+    for x in runs:
+        try:
+            results.append(magnitudes(list(run(x))))
+        except AssertionError:
+            pass
+    return asarray(results).reshape(-1, len(OUTPUTS)), len(runs) - len(results)
+
+
+def precise(result, tolerance):
+    """Return True if the confidence intervals of an Estimate are within tolerance."""
+    if result.mean_halfwidth > tolerance:
+        return False
+    for value, (low, high) in zip(result.quantiles, result.quantile_intervals):
+        if value - low > tolerance or high - value > tolerance:
+            return False
+    return True
+
+
+# pylint: disable=too-many-arguments, too-many-locals
+def adaptive_monte_carlo(
+    space,
+    model,
+    tolerance=0.5 * MUSD,
+    quantiles=(0.05,),
+    batch_size=200,
+    max_draws=100000,
+    seed=None,
+    confidence=0.95,
+):
+    """Draw batches of parameters and run the model until the estimates are precise.
+
+    space: a ParameterSpace, model: a blackbox returning the business value
+    and the external value. The tolerance is the half-width of the confidence
+    intervals targeted on the mean and on the quantiles, a quantity or a float in USD,
+    or a dict of them by output. max_draws  bounds the runs, feasible or not.
+    Return a Convergence.
+    """
+    if not isinstance(tolerance, dict):
+        tolerance = {output: tolerance for output in OUTPUTS}
+    tolerance = {output: float(magnitudes(tolerance[output])) for output in OUTPUTS}
+    run = in_float_mode(model)
+    rng = default_rng(seed)
+    batches = []
+    history = []
+    draws, infeasible, converged = 0, 0, False
+    while draws + infeasible < max_draws and not converged:
+        size = min(batch_size, max_draws - draws - infeasible)
+        batch, skipped = run_batch(run, space.sample(size, seed=rng))
+        batches.append(batch)
+        infeasible += skipped
+        samples = concatenate(batches)
+        draws = len(samples)
+        if not draws:
+            continue
+        estimates = {
+            output: estimate(samples[:, k], quantiles, confidence)
+            for k, output in enumerate(OUTPUTS)
+        }
+        history.append(_history_row(estimates, quantiles, infeasible))
+        converged = draws > 1 and all(
+            precise(result, tolerance[output]) for output, result in estimates.items()
+        )
+    assert draws, "All the draws are infeasible"
+    return Convergence(
+        draws,
+        converged,
+        estimates,
+        DataFrame(history).set_index("draws"),
+        samples,
+        infeasible,
+    )
+
+
+def _history_row(estimates, quantiles, infeasible):
+    """Return the estimates after a batch as a flat dict, for the history table."""
+    row = {"infeasible": infeasible}
+    for output, result in estimates.items():
+        row["draws"] = result.draws
+        row[f"{output} mean"] = result.mean
+        row[f"{output} halfwidth"] = result.mean_halfwidth
+        for p, value, (low, high) in zip(
+            quantiles, result.quantiles, result.quantile_intervals
+        ):
+            row[f"{output} q{p:g}"] = value
+            row[f"{output} q{p:g} halfwidth"] = max(value - low, high - value)
+    return row
@@ -12,10 +12,14 @@ Sensitivity analysis is based on the representation  Y = f(X1, ..., Xn).
     Xi are the uncertain parameters. Each has an uncertainty range and a baseline value.
     Y is the model result, allowed to be vector here, we do multi objective analysis.
 """
+from copy import copy
+
+from numpy import asarray, broadcast_arrays
 from pandas import Series
 
-from model.utils import npv, display_as
+from model.utils import npv, display_as, strip
 
+from model.farmer import Farmer
 from model.system import System, Price
 
 from manuscript1.parameters import (
@@ -66,17 +70,12 @@ def cofire_patched(cofiring_parameter, x):
     return _cofire
 
 
-def f_MD1(x):
-    """Return the business value and the externalities of cofiring, as a pair of USD quantities.
-
-    Mong Duong 1 case.
-    """
-    _price_MD1, _external_cost, _farm_parameter, _discount_rate = as_model_parameters(x)
-    _cofire = cofire_patched(cofire_MD1, x)
-
-    MD1SystemVariant = System(
+def system_MD1(x):
+    """Return the Mong Duong 1 system, with the parameters x which shape it physically."""
+    _price_MD1, _, _farm_parameter, _ = as_model_parameters(x)
+    return System(
         plant_parameter_MD1,
-        _cofire,
+        cofire_patched(cofire_MD1, x),
         supply_chain_MD1,
         _price_MD1,
         _farm_parameter,
@@ -84,30 +83,14 @@ def f_MD1(x):
         mining_parameter,
         emission_factor,
     )
-    business_value = MD1SystemVariant.table_business_value(
-        _discount_rate, economic_horizon
-    )[-1]
-    display_as(business_value, "MUSD")
-
-    benefits_table = MD1SystemVariant.emissions_reduction_benefit(_external_cost).loc[
-        "Value"
-    ]
-    external_value = npv(benefits_table.sum(), _discount_rate, economic_horizon)
-    display_as(external_value, "MUSD")
-    return business_value, external_value
 
 
-def f_NB(x):
-    """Return the business value and the externalities of cofiring, as a pair of USD quantities.
-
-    Ninh Binh case
-    """
-    _price_NB, _external_cost, _farm_parameter, _discount_rate = as_model_parameters(x)
-    _cofire = cofire_patched(cofire_NB, x)
-
-    NBSystemVariant = System(
+def system_NB(x):
+    """Return the Ninh Binh system, with the parameters x which shape it physically."""
+    _price_NB, _, _farm_parameter, _ = as_model_parameters(x)
+    return System(
         plant_parameter_NB,
-        _cofire,
+        cofire_patched(cofire_NB, x),
         supply_chain_NB,
         _price_NB,
         _farm_parameter,
@@ -115,14 +98,86 @@ def f_NB(x):
         mining_parameter,
         emission_factor,
     )
-    business_value = NBSystemVariant.table_business_value(
-        _discount_rate, economic_horizon
-    )[-1]
+
+
+def with_open_burn_rate(system, x):
+    """Return a copy of the system with the open burn rate in x, sharing its other actors.
+
+    Only the farmer depends on the open burn rate, so rebuilding it is much faster
+    than building a new system. Market parameters in x are ignored.
+    """
+    _, _, _farm_parameter, _ = as_model_parameters(x)
+    variant = copy(system)
+    variant.farmer = Farmer(
+        system.supply_chain, strip(_farm_parameter), system.farmer.emission_factor
+    )
+    variant.memo_hits = {}
+    variant.memo_misses = {}
+    variant.clear_market(system.price)
+    return variant
+
+
+def values(system, x):
+    """Return the business value and the externalities of cofiring in the system.
+
+    The system market is cleared at the prices in x.
+    """
+    _price, _external_cost, _, _discount_rate = as_model_parameters(x)
+    system.clear_market(_price)
+    business_value = system.table_business_value(_discount_rate, economic_horizon)[-1]
     display_as(business_value, "MUSD")
 
-    benefits_table = NBSystemVariant.emissions_reduction_benefit(_external_cost).loc[
-        "Value"
-    ]
+    benefits_table = system.emissions_reduction_benefit(_external_cost).loc["Value"]
     external_value = npv(benefits_table.sum(), _discount_rate, economic_horizon)
     display_as(external_value, "MUSD")
     return business_value, external_value
+
+
+def batch_values(system, x):
+    """Return the business value and the externalities of cofiring, for arrays of x.
+
+    The market parameters in x can be arrays broadcasting together, for example
+    a column of discount rates and a row of coal prices give a grid of results.
+    Float mode only. Like  values, but on the cash flows rather than the tables,
+    so that the physical system is computed once for all the market conditions.
+    """
+    horizon = economic_horizon
+    rate = asarray(x["discount_rate"], dtype=float)[..., None]
+    technical_cost = (
+        system.farmer.operating_expenses()
+        + system.reseller.operating_expenses()
+        + system.cofiring_plant.investment()
+        + system.plant_om_change()
+    )
+    coal_saved = npv(system.coal_saved, rate, horizon)
+    business_value = coal_saved * x["coal_price"] - npv(technical_cost, rate, horizon)
+
+    reduction = system.emissions_reduction().loc["Total"]
+    external_value = 0
+    for pollutant, quantity in reduction.items():
+        external_cost = x["external_cost_" + pollutant]
+        external_value = external_value + npv(quantity, rate, horizon) * external_cost
+    return tuple(broadcast_arrays(business_value, external_value))
+
+
+def f_MD1(x):
+    """Return the business value and the externalities of cofiring, as a pair of USD quantities.
+
+    Mong Duong 1 case.
+    """
+    return values(system_MD1(x), x)
+
+
+def f_NB(x):
+    """Return the business value and the externalities of cofiring, as a pair of USD quantities.
+
+    Ninh Binh case
+    """
+    return values(system_NB(x), x)
+
+
+# Parameters used to build the system. The others only clear the market.
+PHYSICAL = ("cofire_rate", "open_burn_rate")
+
+# How to build the system of a blackbox, for the batch path
+SYSTEMS = {f_MD1: system_MD1, f_NB: system_NB}
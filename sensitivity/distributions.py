@@ -0,0 +1,247 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# distributions
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Probability distributions of the uncertain parameters, and correlated sampling.
+
+Each distribution maps probabilities to values through its inverse cumulative
+distribution function  ppf, vectorized. Values are floats in base units.
+A  ParameterSpace  holds one distribution per parameter, built from an
+uncertainty table of one plant, so each plant keeps its own baseline.
+Rank correlations between parameters are induced with the Iman-Conover method.
+
+Samples are NumPy structured arrays with one field per parameter.
+A row  x = sample[i]  reads like the dict expected by  sensitivity.blackbox,
+run the blackbox in float mode:
+    space = ParameterSpace.from_table(uncertainty_MD1, CORRELATIONS)
+    runs = space.sample(1000, seed=0)
+    results = [in_float_mode(f_MD1)(x) for x in runs]
+
+>>> space = ParameterSpace({'a': Uniform(0, 1), 'b': Triangular(0, 1, 4)},
+...                        correlations={('a', 'b'): 0.8})
+>>> runs = space.sample(2000, seed=0)
+>>> runs.dtype.names
+('a', 'b')
+>>> 0.75 < rank_correlation(runs['a'], runs['b']) < 0.85
+True
+"""
+
+from numpy import (
+    arange,
+    argsort,
+    asarray,
+    corrcoef,
+    empty,
+    exp,
+    eye,
+    ix_,
+    log,
+    dtype,
+    quantile,
+    sort,
+    sqrt,
+    where,
+)
+from numpy.linalg import cholesky, inv
+from numpy.random import default_rng
+
+from model.utils import magnitudes
+from sensitivity.sampling import latin_hypercube, sobol
+
+# Assumed rank correlations, for lack of data: fuel prices follow the same market
+# and the biomass prices along the supply chain move together.
+CORRELATIONS = {
+    ("coal_price", "electricity_price"): 0.5,
+    ("biomass_plantgate", "biomass_fieldside"): 0.8,
+}
+
+
+def norm_ppf(p):
+    """Return the quantiles of the standard normal distribution."""
+    from scipy.special import ndtri  # pylint: disable=import-outside-toplevel
+
+    return ndtri(p)
+
+
+class Uniform:
+    """Uniform distribution between low and high."""
+
+    def __init__(self, low, high):
+        self.low, self.high = float(low), float(high)
+
+    def ppf(self, p):
+        """Return the quantiles of probabilities p."""
+        return self.low + asarray(p) * (self.high - self.low)
+
+
+class Triangular:
+    """Triangular distribution (low, mode, high).
+
+    >>> Triangular(0, 1, 4).ppf([0, 0.25, 1])
+    array([0., 1., 4.])
+    """
+
+    def __init__(self, low, mode, high):
+        assert low <= mode <= high, "Triangular expects low <= mode <= high"
+        self.low, self.mode, self.high = float(low), float(mode), float(high)
+
+    def ppf(self, p):
+        """Return the quantiles of probabilities p."""
+        p = asarray(p, dtype=float)
+        width = self.high - self.low
+        if width == 0:
+            return p * 0 + self.low
+        cut = (self.mode - self.low) / width
+        left = self.low + sqrt(p * width * (self.mode - self.low))
+        right = self.high - sqrt((1 - p) * width * (self.high - self.mode))
+        return where(p < cut, left, right)
+
+
+class PERT:
+    """PERT distribution (low, mode, high): a beta rescaled, smoother than triangular.
+
+    >>> round(float(PERT(0, 1, 2).ppf(0.5)), 6)
+    1.0
+    """
+
+    def __init__(self, low, mode, high, shape=4):
+        assert low <= mode <= high, "PERT expects low <= mode <= high"
+        self.low, self.mode, self.high = float(low), float(mode), float(high)
+        width = self.high - self.low
+        self.alpha = 1 + shape * (self.mode - self.low) / width if width else 1
+        self.beta = 1 + shape * (self.high - self.mode) / width if width else 1
+
+    def ppf(self, p):
+        """Return the quantiles of probabilities p."""
+        from scipy.special import betaincinv  # pylint: disable=import-outside-toplevel
+
+        width = self.high - self.low
+        return self.low + width * betaincinv(self.alpha, self.beta, asarray(p))
+
+
+class LogNormal:
+    """Lognormal distribution, given by its median and the standard deviation of its log."""
+
+    def __init__(self, median, sigma):
+        assert median > 0, "LogNormal expects a positive median"
+        self.median, self.sigma = float(median), float(sigma)
+
+    @classmethod
+    def from_interval(cls, low, high, coverage=0.9):
+        """Return the lognormal with the central interval [low, high] at given coverage."""
+        z = norm_ppf(0.5 + coverage / 2)
+        return cls(sqrt(low * high), log(high / low) / (2 * z))
+
+    def ppf(self, p):
+        """Return the quantiles of probabilities p."""
+        return self.median * exp(self.sigma * norm_ppf(asarray(p)))
+
+
+class Empirical:
+    """Empirical distribution of observed values, interpolated between quantiles.
+
+    >>> Empirical([3, 1, 2]).ppf([0, 0.5, 1])
+    array([1., 2., 3.])
+    """
+
+    def __init__(self, values):
+        self.values = magnitudes(list(values))
+
+    def ppf(self, p):
+        """Return the quantiles of probabilities p."""
+        return quantile(self.values, asarray(p))
+
+
+def rank_correlation(a, b):
+    """Return the Spearman rank correlation of two samples."""
+    return corrcoef(argsort(argsort(a)), argsort(argsort(b)))[0, 1]
+
+
+def iman_conover(sample, correlation, rng=None):
+    """Reorder the columns of a sample (n, d) to induce a target rank correlation matrix.
+
+    The marginal distributions are unchanged, only the pairing of values between
+    columns changes. Iman and Conover (1982), using van der Waerden scores.
+    """
+    rng = default_rng(rng)
+    n, d = sample.shape
+    scores = empty((d, n))
+    scores[:] = norm_ppf(arange(1, n + 1) / (n + 1))
+    for row in scores:
+        rng.shuffle(row)
+    target = cholesky(correlation)
+    actual = cholesky(corrcoef(scores))
+    scores = target @ inv(actual) @ scores
+    result = empty(sample.shape)
+    for j in range(d):
+        result[argsort(scores[j]), j] = sort(sample[:, j])
+    return result
+
+
+class ParameterSpace:
+    """Distributions of the uncertain parameters, with their rank correlations."""
+
+    def __init__(self, distributions, correlations=None):
+        """Initialize with a dict {name: distribution} and a dict {(name, name): rho}."""
+        self.distributions = dict(distributions)
+        self.names = list(self.distributions)
+        self.correlation = eye(len(self.names))
+        for (first, second), rho in (correlations or {}).items():
+            i, j = self.names.index(first), self.names.index(second)
+            self.correlation[i, j] = self.correlation[j, i] = rho
+
+    @classmethod
+    def from_table(cls, uncertainty, correlations=None, kind=Triangular):
+        """Build from an uncertainty table of one plant, mode at the plant baseline.
+
+        kind is Triangular, PERT or Uniform.
+        """
+        low = magnitudes(list(uncertainty["Low bound"]))
+        mode = magnitudes(list(uncertainty["Baseline"]))
+        high = magnitudes(list(uncertainty["High bound"]))
+        distributions = {}
+        for name, a, b, c in zip(uncertainty.index, low, mode, high):
+            a, c = min(a, c), max(a, c)
+            if kind is Uniform:
+                distributions[name] = Uniform(a, c)
+            else:
+                distributions[name] = kind(a, b, c)
+        return cls(distributions, correlations)
+
+    def dtype(self):
+        """Return the structured dtype of the samples."""
+        return dtype([(name, "f8") for name in self.names])
+
+    def sample(self, n, seed=None, method="random"):
+        """Return n correlated draws, a structured array with one field per parameter.
+
+        method is "random", "lhs" or "sobol" for the underlying probabilities.
+        """
+        rng = default_rng(seed)
+        d = len(self.names)
+        if method == "random":
+            probabilities = rng.random((n, d))
+        elif method == "lhs":
+            probabilities = latin_hypercube(n, d, seed=rng)
+        elif method == "sobol":
+            probabilities = sobol(n, d, seed=rng)
+        else:
+            raise ValueError(f"Unknown method {method}")
+        values = empty((n, d))
+        for j, name in enumerate(self.names):
+            values[:, j] = self.distributions[name].ppf(probabilities[:, j])
+        # Only the correlated parameters are reordered
+        (involved,) = where((self.correlation != eye(d)).any(axis=1))
+        if len(involved):
+            subset = ix_(involved, involved)
+            values[:, involved] = iman_conover(
+                values[:, involved], self.correlation[subset], rng
+            )
+        result = empty(n, self.dtype())
+        for j, name in enumerate(self.names):
+            result[name] = values[:, j]
+        return result
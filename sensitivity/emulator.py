@@ -0,0 +1,217 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# emulator
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Emulate the blackbox model with a polynomial chaos expansion, for fast exploration.
+
+The emulator is trained on runs of  f_MD1  or  f_NB  over a Latin hypercube of the
+uncertainty table. Inputs are rescaled to [-1, 1] and the outputs are regressed on
+products of Legendre polynomials, of total degree up to  degree, by least squares.
+That is the polynomial chaos expansion for uniform inputs.
+
+Cross-validation tells how far to trust it. Once fitted, a query costs a few
+tens of microseconds instead of a model run. Outside the training bounds, EmulatedModel
+calls the true model instead.
+
+Usage:
+    emulator = train(uncertainty_MD1, f_MD1, 400, seed=0)
+    print(emulator.cross_validation)
+    emulator.save("emulator_MD1.npz")
+    business_value, external_value = EmulatedModel(emulator, f_MD1)(x)
+
+>>> from numpy import linspace, sin
+>>> x = linspace(-1, 1, 50)[:, None]
+>>> emulator = Emulator(['x'], [-1], [1], degree=5).fit(x, sin(x))
+>>> bool(abs(emulator.predict([[0.5]])[0, 0] - sin(0.5)) < 1e-4)
+True
+"""
+
+from functools import lru_cache
+
+from numpy import arange, asarray, empty, load, ones, savez, sqrt, where
+from numpy.linalg import lstsq
+from numpy.random import default_rng
+
+from model.utils import in_float_mode
+from sensitivity.sampling import lower_upper, sample
+
+
+def _exponents(dimension, degree):
+    """Yield the exponents of total degree up to degree, in lexicographic order."""
+    if dimension == 0:
+        yield ()
+        return
+    for first in range(degree + 1):
+        for rest in _exponents(dimension - 1, degree - first):
+            yield (first,) + rest
+
+
+@lru_cache(maxsize=None)
+def _multi_indices(dimension, degree):
+    indices = asarray(list(_exponents(dimension, degree)), dtype=int)
+    indices.flags.writeable = False
+    return indices
+
+
+def multi_indices(dimension, degree):
+    """Return the exponents of all the monomials of total degree up to degree.
+
+    They are generated directly, there are only  comb(dimension + degree, degree),
+    and cached since the emulators of a study share them. The array is read only.
+
+    >>> multi_indices(2, 1).tolist()
+    [[0, 0], [0, 1], [1, 0]]
+    >>> multi_indices(0, 3).shape
+    (1, 0)
+    """
+    return _multi_indices(dimension, degree)
+
+
+def legendre(x, degree):
+    """Return the Legendre polynomials of x up to degree, an array (..., degree + 1)."""
+    values = empty(x.shape + (degree + 1,))
+    values[..., 0] = 1
+    if degree >= 1:
+        values[..., 1] = x
+    for k in range(1, degree):
+        values[..., k + 1] = (
+            (2 * k + 1) * x * values[..., k] - k * values[..., k - 1]
+        ) / (k + 1)
+    return values
+
+
+class Emulator:
+    """A polynomial chaos expansion of a model with several inputs and outputs."""
+
+    def __init__(self, names, low, high, degree=2):
+        """Initialize an unfitted emulator on the box of inputs [low, high]."""
+        self.names = list(names)
+        self.low = asarray(low, dtype=float)
+        self.high = asarray(high, dtype=float)
+        self.degree = degree
+        self.indices = multi_indices(len(self.names), degree)
+        self.coefficients = None
+        self.cross_validation = None
+
+    def _features(self, inputs):
+        """Return the values of the polynomial basis at the inputs, (runs, terms)."""
+        inputs = asarray(inputs, dtype=float)
+        width = self.high - self.low
+        width[width == 0] = 1
+        scaled = 2 * (inputs - self.low) / width - 1
+        values = legendre(scaled, self.degree)
+        dims = arange(len(self.names))
+        return values[:, dims, self.indices].prod(axis=2)
+
+    def fit(self, inputs, outputs):
+        """Fit the coefficients by least squares on training runs, return self."""
+        features = self._features(inputs)
+        self.coefficients = lstsq(features, asarray(outputs, dtype=float), rcond=None)[
+            0
+        ]
+        return self
+
+    def predict(self, inputs):
+        """Return the emulated outputs, an array (runs, outputs)."""
+        return self._features(inputs) @ self.coefficients
+
+    def inside(self, inputs):
+        """Return True for the runs whose inputs are within the training bounds."""
+        inputs = asarray(inputs, dtype=float)
+        return ((inputs >= self.low) & (inputs <= self.high)).all(axis=-1)
+
+    def validate(self, inputs, outputs, folds=5, seed=None):
+        """Return the k-fold cross-validated relative error of each output, and keep it.
+
+        The error is the root mean square of the residuals, over the standard deviation
+        of the output. For an output which does not vary, it is the root mean square itself.
+        """
+        inputs = asarray(inputs, dtype=float)
+        outputs = asarray(outputs, dtype=float)
+        n = len(inputs)
+        fold = default_rng(seed).permutation(n) % folds
+        residuals = empty(outputs.shape)
+        for k in range(folds):
+            test = fold == k
+            emulator = Emulator(self.names, self.low, self.high, self.degree)
+            emulator.fit(inputs[~test], outputs[~test])
+            residuals[test] = emulator.predict(inputs[test]) - outputs[test]
+        rms = sqrt((residuals ** 2).mean(axis=0))
+        spread = outputs.std(axis=0)
+        self.cross_validation = rms / where(spread > 0, spread, 1)
+        return self.cross_validation
+
+    def save(self, path):
+        """Save the fitted emulator in a .npz file."""
+        assert self.coefficients is not None, "Fit the emulator before saving it"
+        savez(
+            path,
+            names=asarray(self.names),
+            low=self.low,
+            high=self.high,
+            degree=self.degree,
+            coefficients=self.coefficients,
+            cross_validation=(
+                self.cross_validation
+                if self.cross_validation is not None
+                else ones(0) * float("nan")
+            ),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Return an emulator saved by  save."""
+        with load(path) as data:
+            emulator = cls(
+                list(data["names"]), data["low"], data["high"], int(data["degree"])
+            )
+            emulator.coefficients = data["coefficients"]
+            if len(data["cross_validation"]):
+                emulator.cross_validation = data["cross_validation"]
+        return emulator
+
+
+def evaluate(model, names, design):
+    """Run the model in float mode on each row of a design, return an array (runs, outputs)."""
+    run = in_float_mode(model)
+    return asarray([run(dict(zip(names, row))) for row in design], dtype=float)
+
+
+# pylint: disable=too-many-arguments
+def train(uncertainty, model, n, seed=None, degree=2, folds=5):
+    """Return an emulator of the model over the uncertainty table, cross-validated.
+
+    The model is run n times on a Latin hypercube design.
+    """
+    names = list(uncertainty.index)
+    low, high = lower_upper(uncertainty)
+    design = sample(uncertainty, n, "lhs", seed)
+    outputs = evaluate(model, names, design)
+    emulator = Emulator(names, low, high, degree)
+    emulator.validate(design, outputs, folds, seed)
+    return emulator.fit(design, outputs)
+
+
+class EmulatedModel:
+    """A model answering with the emulator inside its bounds, with the true model outside.
+
+    Called like the blackbox, with a dict of parameters in base units,
+    it returns a tuple of floats.
+    """
+
+    def __init__(self, emulator, model):
+        """Initialize with a fitted emulator and the true model."""
+        self.emulator = emulator
+        self.model = in_float_mode(model)
+        self.fallbacks = 0
+
+    def __call__(self, x):
+        inputs = [[float(x[name]) for name in self.emulator.names]]
+        if self.emulator.inside(inputs)[0]:
+            return tuple(self.emulator.predict(inputs)[0])
+        self.fallbacks += 1
+        return tuple(float(y) for y in self.model(x))
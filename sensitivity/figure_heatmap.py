@@ -0,0 +1,65 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# heatmap plot
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Plot the business value of cofiring over two parameters at a time, as heatmaps.
+
+The dashed line is where cofiring breaks even.
+"""
+
+import matplotlib.pyplot as plt
+
+from model.utils import in_unit
+from sensitivity.uncertainty import uncertainty_MD1, uncertainty_NB
+from sensitivity.heatmap import sweep, break_even
+from sensitivity.blackbox import f_MD1, f_NB
+from sensitivity.store import unit_of
+
+SIZES = (200, 200)
+
+
+def scaled(uncertainty, name, values):
+    """Return values of a parameter in its display unit, and the axis label."""
+    unit = unit_of(uncertainty.loc[name, "Baseline"])
+    if not unit:
+        return values, name
+    return in_unit(values, unit), f"{name} ({unit})"
+
+
+def plot_heatmap(axes, uncertainty, model, first, second, plant_name):
+    """Plot the business value over a grid of two parameters, with break-even line."""
+    runs = sweep(uncertainty, model, first, second, SIZES)
+    x, xlabel = scaled(uncertainty, second, runs.second_values)
+    y, ylabel = scaled(uncertainty, first, runs.first_values)
+    image = axes.pcolormesh(
+        x,
+        y,
+        in_unit(runs.business_value, "MUSD"),
+        shading="auto",
+        cmap="RdYlGn",
+        rasterized=True,
+    )
+    line, _ = scaled(uncertainty, second, break_even(runs, "business_value"))
+    axes.plot(line, y, "k--", linewidth=1)
+    axes.set_xlabel(xlabel)
+    axes.set_ylabel(ylabel)
+    axes.set_title(plant_name, style="italic")
+    plt.colorbar(image, ax=axes, label="Business value (MUSD)")
+
+
+PAIRS = [("biomass_plantgate", "coal_price"), ("cofire_rate", "discount_rate")]
+
+# noinspection PyTypeChecker
+figure, axes_grid = plt.subplots(nrows=2, ncols=2, figsize=[12, 9])
+for column, (first, second) in enumerate(PAIRS):
+    plot_heatmap(
+        axes_grid[0, column], uncertainty_MD1, f_MD1, first, second, "Mong Duong 1"
+    )
+    plot_heatmap(axes_grid[1, column], uncertainty_NB, f_NB, first, second, "Ninh Binh")
+plt.tight_layout()
+
+plt.savefig("figure_heatmap.pdf")
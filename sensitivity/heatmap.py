@@ -0,0 +1,144 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# heatmap
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Perform a two-way sensitivity analysis: the results over a grid of two parameters.
+
+Both parameters vary across their uncertainty range, the others stay at baseline.
+The whole grid is evaluated in float mode through the batch path of the blackbox:
+a system is built once for all the market parameters (prices, external costs,
+discount rate), and once per value of the parameters which shape it physically.
+When both parameters are physical, a system is built once per cofiring rate,
+and evaluated at the two ends of the open burn rate axis with its farmer rebuilt:
+the results are affine in the open burn rate.
+Models without a batch path are run point by point.
+
+The break-even line gives, for each value of the first parameter, the value of
+the second where a result crosses zero.
+
+Usage:
+    runs = sweep(uncertainty_MD1, f_MD1, "cofire_rate", "discount_rate", (200, 200))
+    line = break_even(runs, "business_value")
+"""
+
+from collections import namedtuple
+
+from numpy import argmax, asarray, broadcast_to, empty, linspace, nan, sign, where
+
+from model.utils import float_mode, magnitudes
+from sensitivity.blackbox import PHYSICAL, SYSTEMS, batch_values, with_open_burn_rate
+
+Sweep = namedtuple(
+    "Sweep",
+    [
+        "first",
+        "second",
+        "first_values",
+        "second_values",
+        "business_value",
+        "external_value",
+    ],
+)
+
+
+def grid_axis(uncertainty, name, size):
+    """Return size values regularly spaced across the range of a parameter, base units."""
+    low = magnitudes(uncertainty.loc[name, "Low bound"])
+    high = magnitudes(uncertainty.loc[name, "High bound"])
+    return linspace(min(low, high), max(low, high), size)
+
+
+# pylint: disable=too-many-arguments
+def _batch_grid(build, x, first, second, first_values, second_values):
+    """Return the two results over the grid, building as few systems as possible."""
+    if second in PHYSICAL and (first not in PHYSICAL or second == "cofire_rate"):
+        swapped = _batch_grid(build, x, second, first, second_values, first_values)
+        return [grid.T for grid in swapped]
+    shape = (len(first_values), len(second_values))
+    if first not in PHYSICAL:
+        grid = dict(x, **{first: first_values[:, None], second: second_values})
+        return [broadcast_to(y, shape) for y in batch_values(build(x), grid)]
+    results = empty((2,) + shape)
+    for i, value in enumerate(first_values):
+        x_i = dict(x, **{first: value})
+        if second in PHYSICAL:
+            assert second == "open_burn_rate", "The cofiring rate varies along the rows"
+            # The results are affine in the open burn rate, which scales the straw
+            # burned ex ante: interpolate between the ends of the regular axis.
+            system = build(x_i)
+            ends = []
+            for value_j in second_values[[0, -1]]:
+                x_ij = dict(x_i, **{second: value_j})
+                ends.append(batch_values(with_open_burn_rate(system, x_ij), x_ij))
+            low, high = asarray(ends, dtype=float)
+            weight = linspace(0, 1, len(second_values))
+            results[:, i] = low[:, None] + (high - low)[:, None] * weight
+        else:
+            row = batch_values(build(x_i), dict(x_i, **{second: second_values}))
+            results[:, i] = [broadcast_to(y, shape[1:]) for y in row]
+    return list(results)
+
+
+def _pointwise_grid(model, x, first, second, first_values, second_values):
+    """Return the two results over the grid, one model run per point."""
+    results = empty((2, len(first_values), len(second_values)))
+    for i, value in enumerate(first_values):
+        for j, value_j in enumerate(second_values):
+            y = model(dict(x, **{first: value, second: value_j}))
+            results[:, i, j] = magnitudes(list(y))
+    return list(results)
+
+
+def sweep(uncertainty, model, first, second, sizes=(50, 50), x=None):
+    """Return the results of the model over a grid of two parameters, as a Sweep.
+
+    The results are float arrays in base units, of shape sizes:
+    the first parameter varies along the rows, the second along the columns.
+    Other parameters are at x, a dict of floats in base units, by default the baseline.
+    """
+    assert first != second, "Sweep two different parameters"
+    names = list(uncertainty.index)
+    assert (
+        first in names and second in names
+    ), "Sweep parameters of the uncertainty table"
+    if x is None:
+        x = dict(zip(names, magnitudes(list(uncertainty["Baseline"]))))
+    first_values = grid_axis(uncertainty, first, sizes[0])
+    second_values = grid_axis(uncertainty, second, sizes[1])
+    with float_mode():
+        if model in SYSTEMS:
+            grid = _batch_grid(
+                SYSTEMS[model], x, first, second, first_values, second_values
+            )
+        else:
+            grid = _pointwise_grid(model, x, first, second, first_values, second_values)
+    return Sweep(first, second, first_values, second_values, *grid)
+
+
+def break_even(runs, output="business_value"):
+    """Return the break-even line of a result, as values of the second parameter.
+
+    For each value of the first parameter, interpolate linearly where the result
+    first changes sign along the second parameter, NaN where it does not.
+
+    >>> from numpy import array
+    >>> runs = Sweep('a', 'b', [0, 1], array([0, 1, 2]),
+    ...              array([[-2, -1, 1], [1, 2, 3]]), None)
+    >>> break_even(runs)
+    array([1.5, nan])
+    """
+    z = getattr(runs, output)
+    signs = sign(z)
+    crossing = signs[:, :-1] != signs[:, 1:]
+    rows = range(len(z))
+    j = argmax(crossing, axis=1)
+    before, after = z[rows, j], z[rows, j + 1]
+    fraction = before / where(before == after, 1, before - after)
+    steps = runs.second_values[j + 1] - runs.second_values[j]
+    line = runs.second_values[j] + fraction * steps
+    line[~crossing.any(axis=1)] = nan
+    return line
@@ -0,0 +1,524 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# jobs
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Queue large sensitivity studies as background jobs, run by a pool of worker processes.
+
+A job runs a blackbox like  f_MD1  over an uncertainty table, on a design:
+a Latin hypercube ("lhs", for Monte Carlo), a Sobol sequence ("sobol"),
+or a grid over some parameters, the others at baseline ("grid").
+The design is cut in chunks of runs, the tasks of the queue.
+
+The queue is a directory holding an SQLite database  jobs.sqlite  and one
+subdirectory per job, where each finished chunk is saved as a .npy file,
+atomically. The database records the jobs and the state of each chunk,
+so the jobs survive restarts. A worker claiming a chunk records its pid, and
+renews a heartbeat while computing. The chunks of a killed worker are queued again
+once their heartbeat is older than  STALE_AFTER  seconds, so several pools can
+work on the same queue. The designs are regenerated
+from their seed, so a chunk gives the same runs whichever worker computes it.
+
+Workers take the next chunk from the job which has the fewest chunks running,
+then the fewest chunks started, so that concurrent studies share the pool fairly.
+Progress and the rows of the chunks already finished can be read while the jobs run.
+When all its chunks are done, the job directory is a store read by
+sensitivity.store.ResultReader.
+
+Models and uncertainty tables are given as "module:name" references,
+for the workers to import them.
+
+Usage, from the project root directory:
+    python -m sensitivity.jobs runs submit MD1 --n 100000 --method sobol
+    python -m sensitivity.jobs runs work --jobs 4 &
+    python -m sensitivity.jobs runs status
+or from Python:
+    queue = JobQueue("runs")
+    job = queue.submit(*CASES["MD1"], n=100000, method="sobol")
+    queue.work(jobs=4)
+    runs = queue.results(job)
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from importlib import import_module
+from itertools import product
+from pathlib import Path
+
+from numpy import array, concatenate, load, save
+from pandas import DataFrame
+
+from model.hashing import fingerprint
+from model.utils import magnitudes
+from sensitivity.heatmap import grid_axis
+from sensitivity.sampling import sample_chunks
+from sensitivity.store import CHUNK_NAME, unit_of
+from sensitivity.study import CHUNK_SIZE, OUTPUTS, evaluate_design, write_atomic
+
+CASES = {
+    "MD1": ("sensitivity.blackbox:f_MD1", "sensitivity.uncertainty:uncertainty_MD1"),
+    "NB": ("sensitivity.blackbox:f_NB", "sensitivity.uncertainty:uncertainty_NB"),
+}
+
+METHODS = ["lhs", "sobol", "grid"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    spec TEXT NOT NULL,
+    chunks INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    error TEXT,
+    submitted REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    job INTEGER NOT NULL REFERENCES jobs(id),
+    chunk INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    owner INTEGER,
+    started REAL,
+    heartbeat REAL,
+    finished REAL,
+    PRIMARY KEY (job, chunk)
+);
+"""
+
+# The next task: fewest chunks running, then fewest started, then oldest job
+NEXT_TASK = """
+SELECT job, chunk FROM tasks
+WHERE state = 'queued'
+    AND job IN (SELECT id FROM jobs WHERE state IN ('queued', 'running'))
+ORDER BY
+    (SELECT COUNT(*) FROM tasks AS t WHERE t.job = tasks.job AND t.state = 'running'),
+    (SELECT COUNT(*) FROM tasks AS t WHERE t.job = tasks.job AND t.state != 'queued'),
+    job,
+    chunk
+LIMIT 1
+"""
+
+# Claims not renewed for longer than STALE_AFTER seconds are queued again
+REQUEUE_STALE = """
+UPDATE tasks SET state = 'queued', owner = NULL, started = NULL, heartbeat = NULL
+WHERE state = 'running' AND heartbeat < ?
+"""
+
+POLL_INTERVAL = 1.0
+
+HEARTBEAT_INTERVAL = 10.0
+
+STALE_AFTER = 60.0
+
+
+@lru_cache(maxsize=None)
+def resolve(reference):
+    """Return the object named by a "module:name" reference."""
+    module, _, name = reference.partition(":")
+    return getattr(import_module(module), name)
+
+
+def grid_design(space, parameters, sizes):
+    """Return the grid over some parameters, the others at baseline, a float array.
+
+    The first parameter varies slowest. Values in base units, one column per row
+    of the uncertainty table.
+    """
+    names = list(space.index)
+    baseline = magnitudes(list(space["Baseline"]))
+    axes = [grid_axis(space, name, size) for name, size in zip(parameters, sizes)]
+    points = array(list(product(*axes)), dtype=float).reshape(-1, len(parameters))
+    design = array([baseline] * len(points), dtype=float).reshape(-1, len(names))
+    for j, name in enumerate(parameters):
+        design[:, names.index(name)] = points[:, j]
+    return design
+
+
+def design_chunks(spec):
+    """Yield the design of a job spec, by chunks of rows."""
+    space = resolve(spec["uncertainty"])
+    if spec["method"] == "grid":
+        design = grid_design(space, spec["parameters"], spec["sizes"])
+        size = spec["chunk_size"]
+        for start in range(0, len(design), size):
+            stop = start + size
+            yield design[start:stop]
+    else:
+        yield from sample_chunks(
+            space, spec["n"], spec["method"], spec["seed"], spec["chunk_size"]
+        )
+
+
+class JobQueue:
+    """A queue of sensitivity study jobs, stored in a directory."""
+
+    def __init__(self, path, stale_after=STALE_AFTER):
+        """Open the queue in the directory path, creating it if needed.
+
+        Running chunks whose heartbeat is older than  stale_after  seconds are
+        considered abandoned by their worker.
+        """
+        self.path = Path(path)
+        self.stale_after = stale_after
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+        self._designs = {}
+
+    @contextmanager
+    def _connect(self):
+        """Open the database for a transaction, committed at the end of the with block."""
+        connection = sqlite3.connect(self.path / "jobs.sqlite", timeout=60)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def job_path(self, job):
+        """Return the directory of a job."""
+        return self.path / f"job-{job:05d}"
+
+    # pylint: disable=too-many-arguments
+    def submit(
+        self,
+        model,
+        uncertainty,
+        n=None,
+        method="lhs",
+        seed=0,
+        chunk_size=CHUNK_SIZE,
+        parameters=None,
+        sizes=None,
+    ):
+        """Queue a study and return its job number.
+
+        model, uncertainty: "module:name" references.
+        n, seed: the size and seed of a "lhs" or "sobol" design.
+        parameters, sizes: the parameters of a "grid" design and their number of values.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown design {method}, expecting one of {METHODS}")
+        space = resolve(uncertainty)
+        resolve(model)
+        spec = {
+            "model": model,
+            "uncertainty": uncertainty,
+            "method": method,
+            "chunk_size": chunk_size,
+            "inputs": list(space.index),
+            "uncertainty_fingerprint": fingerprint(space),
+        }
+        if method == "grid":
+            assert parameters and len(parameters) == len(sizes), "Grid sizes missing"
+            unknown = [name for name in parameters if name not in spec["inputs"]]
+            if unknown:
+                raise ValueError(f"Unknown parameters {unknown}")
+            n = 1
+            for size in sizes:
+                n *= size
+            spec.update(parameters=list(parameters), sizes=list(sizes))
+        else:
+            assert n, "Expecting the number of runs n"
+            spec.update(seed=seed)
+        spec["n"] = n
+        chunks = (n + chunk_size - 1) // chunk_size
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "INSERT INTO jobs (spec, chunks, submitted) VALUES (?, ?, ?)",
+                (json.dumps(spec), chunks, time.time()),
+            )
+            job = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO tasks (job, chunk) VALUES (?, ?)",
+                [(job, chunk) for chunk in range(chunks)],
+            )
+        self.job_path(job).mkdir(exist_ok=True)
+        return job
+
+    def spec(self, job):
+        """Return the description of a job, a dict."""
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT spec FROM jobs WHERE id = ?", (job,)
+            ).fetchone()
+        if row is None:
+            raise ValueError(f"No job {job} in {self.path}")
+        return json.loads(row[0])
+
+    def status(self):
+        """Return a DataFrame of the jobs, with their state and chunks by state."""
+        with self._connect() as connection:
+            jobs = connection.execute(
+                "SELECT id, spec, chunks, state, error FROM jobs ORDER BY id"
+            ).fetchall()
+            counts = connection.execute(
+                "SELECT job, state, COUNT(*) FROM tasks GROUP BY job, state"
+            ).fetchall()
+        done = {(job, state): count for job, state, count in counts}
+        rows = []
+        for job, spec, chunks, state, error in jobs:
+            spec = json.loads(spec)
+            rows.append(
+                {
+                    "job": job,
+                    "model": spec["model"],
+                    "method": spec["method"],
+                    "n": spec["n"],
+                    "state": state,
+                    "chunks": chunks,
+                    "done": done.get((job, "done"), 0),
+                    "running": done.get((job, "running"), 0),
+                    "error": error,
+                }
+            )
+        columns = ["job", "model", "method", "n", "state", "chunks", "done", "running"]
+        return DataFrame(rows, columns=columns + ["error"]).set_index("job")
+
+    def results(self, job):
+        """Return the runs of the finished chunks of a job, as a DataFrame in base units.
+
+        While the job runs, the chunks may finish out of order. The rows are those
+        of the finished chunks, in chunk order.
+        """
+        spec = self.spec(job)
+        with self._connect() as connection:
+            chunks = connection.execute(
+                "SELECT chunk FROM tasks WHERE job = ? AND state = 'done' ORDER BY chunk",
+                (job,),
+            ).fetchall()
+        columns = spec["inputs"] + OUTPUTS
+        if not chunks:
+            return DataFrame(columns=columns, dtype=float)
+        path = self.job_path(job)
+        runs = concatenate([load(path / CHUNK_NAME.format(i)) for (i,) in chunks])
+        return DataFrame({name: runs[name] for name in columns}, columns=columns)
+
+    def cancel(self, job):
+        """Stop giving the chunks of a job to the workers. Chunks running finish."""
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET state = 'cancelled' "
+                "WHERE id = ? AND state IN ('queued', 'running')",
+                (job,),
+            )
+
+    def recover(self):
+        """Queue again the running chunks whose worker stopped renewing its heartbeat."""
+        with self._connect() as connection:
+            connection.execute(REQUEUE_STALE, (time.time() - self.stale_after,))
+
+    def claim(self):
+        """Mark the next task running and return it as (job, chunk), or None if idle.
+
+        Stale claims are queued again first. The job is running from its first claim.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")  # Lock out the other workers
+            connection.execute(REQUEUE_STALE, (now - self.stale_after,))
+            task = connection.execute(NEXT_TASK).fetchone()
+            if task is not None:
+                connection.execute(
+                    "UPDATE tasks SET state = 'running', owner = ?, started = ?, "
+                    "heartbeat = ? WHERE job = ? AND chunk = ?",
+                    (os.getpid(), now, now, *task),
+                )
+                connection.execute(
+                    "UPDATE jobs SET state = 'running' WHERE id = ? AND state = 'queued'",
+                    (task[0],),
+                )
+        return task
+
+    @contextmanager
+    def _heartbeat(self, job, chunk):
+        """Renew the claim of a task every HEARTBEAT_INTERVAL seconds, in a thread."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(HEARTBEAT_INTERVAL):
+                with self._connect() as connection:
+                    connection.execute(
+                        "UPDATE tasks SET heartbeat = ? "
+                        "WHERE job = ? AND chunk = ? AND owner = ?",
+                        (time.time(), job, chunk, os.getpid()),
+                    )
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def design(self, job, chunk):
+        """Return the design of a chunk of a job.
+
+        The design generator of the job is kept, so that a worker taking the chunks
+        of a job in order does not regenerate the design from the start each time.
+        """
+        following, chunks = self._designs.get(job, (None, None))
+        if following != chunk:
+            chunks = design_chunks(self.spec(job))
+            for _ in range(chunk):
+                next(chunks)
+        self._designs[job] = (chunk + 1, chunks)
+        return next(chunks)
+
+    def compute(self, job, chunk):
+        """Run a chunk of a job, save its runs and mark it done.
+
+        The job fails if the uncertainty table changed since it was submitted,
+        or if the model raises an error other than an infeasibility assertion.
+        """
+        spec = self.spec(job)
+        try:
+            space = resolve(spec["uncertainty"])
+            if fingerprint(space) != spec["uncertainty_fingerprint"]:
+                raise ValueError("The uncertainty table changed since submission")
+            with self._heartbeat(job, chunk):
+                runs = evaluate_design(
+                    resolve(spec["model"]), spec["inputs"], self.design(job, chunk)
+                )
+        except Exception as error:  # pylint: disable=broad-except
+            with self._connect() as connection:
+                connection.execute(
+                    "UPDATE jobs SET state = 'failed', error = ? WHERE id = ?",
+                    (f"chunk {chunk}: {error!r}", job),
+                )
+                connection.execute(
+                    "UPDATE tasks SET state = 'queued', owner = NULL, heartbeat = NULL "
+                    "WHERE job = ? AND chunk = ?",
+                    (job, chunk),
+                )
+            return
+        path = self.job_path(job) / CHUNK_NAME.format(chunk)
+        write_atomic(path, partial(save, arr=runs))
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE tasks SET state = 'done', finished = ? WHERE job = ? AND chunk = ?",
+                (time.time(), job, chunk),
+            )
+            remaining = connection.execute(
+                "SELECT COUNT(*) FROM tasks WHERE job = ? AND state != 'done'", (job,)
+            ).fetchone()[0]
+            if remaining == 0:
+                connection.execute(
+                    "UPDATE jobs SET state = 'done' WHERE id = ?", (job,)
+                )
+        if remaining == 0:
+            self._write_metadata(job, spec)
+
+    def _write_metadata(self, job, spec):
+        """Write the store metadata of a finished job."""
+        space = resolve(spec["uncertainty"])
+        units = {name: unit_of(x) for name, x in space["Baseline"].items()}
+        units.update({name: "MUSD" for name in OUTPUTS})
+        metadata = {
+            "inputs": spec["inputs"],
+            "outputs": OUTPUTS,
+            "units": units,
+            "rows": spec["n"],
+            "chunks": (spec["n"] + spec["chunk_size"] - 1) // spec["chunk_size"],
+            "base_units": True,
+            "job": spec,
+        }
+        text = json.dumps(metadata, indent=1).encode()
+        path = self.job_path(job) / "metadata.json"
+        write_atomic(path, lambda file: file.write(text))
+
+    def work_serial(self, wait=False):
+        """Compute tasks in this process until the queue is idle, or forever if wait."""
+        while True:
+            task = self.claim()
+            if task is not None:
+                self.compute(*task)
+            elif wait:
+                time.sleep(POLL_INTERVAL)
+            else:
+                return
+
+    def work(self, jobs=1, wait=False):
+        """Run a pool of worker processes on the queue, until it is idle or forever.
+
+        The chunks left running by a stopped worker are queued again when stale.
+        """
+        self.recover()
+        if jobs == 1:
+            self.work_serial(wait)
+            return
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            workers = [pool.submit(_worker, self.path, wait) for _ in range(jobs)]
+            for worker in workers:
+                worker.result()
+
+
+def _worker(path, wait):
+    JobQueue(path).work_serial(wait)
+
+
+def main(argv=None):
+    """Command line interface, see module docstring."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("queue", help="the queue directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="queue a study")
+    submit.add_argument("case", choices=list(CASES))
+    submit.add_argument("--n", type=int, help="number of runs, for lhs and sobol")
+    submit.add_argument("--method", choices=METHODS, default="lhs")
+    submit.add_argument("--seed", type=int, default=0)
+    submit.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    submit.add_argument(
+        "--grid", nargs="+", metavar="NAME=SIZE", help="grid parameters and sizes"
+    )
+    work = commands.add_parser("work", help="run a pool of workers")
+    work.add_argument("--jobs", type=int, default=1, help="0 for one per CPU")
+    work.add_argument("--wait", action="store_true", help="wait for new jobs")
+    commands.add_parser("status", help="show the jobs")
+    results = commands.add_parser("results", help="print the finished runs as csv")
+    results.add_argument("job", type=int)
+    cancel = commands.add_parser("cancel", help="cancel a job")
+    cancel.add_argument("job", type=int)
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(args.queue)
+    try:
+        if args.command == "submit":
+            grid = [item.split("=") for item in args.grid or []]
+            job = queue.submit(
+                *CASES[args.case],
+                n=args.n,
+                method=args.method,
+                seed=args.seed,
+                chunk_size=args.chunk_size,
+                parameters=[name for name, _ in grid],
+                sizes=[int(size) for _, size in grid],
+            )
+            print(job)
+        elif args.command == "work":
+            queue.work(args.jobs or os.cpu_count(), args.wait)
+        elif args.command == "status":
+            print(queue.status().to_string())
+        elif args.command == "results":
+            queue.results(args.job).to_csv(sys.stdout, index=False)
+        else:
+            queue.cancel(args.job)
+    except (AssertionError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# sampling
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Sample the uncertain parameters space with space-filling designs.
+
+The space is a table like  uncertainty_MD1 : one parameter per row,
+the range is given by the  Low bound  and  High bound  columns.
+A design is a float array, one row per model run and one column per parameter,
+values in base units, in the order of the table rows.
+
+Two designs are available:
+  Latin hypercube: each parameter range is cut in n strata, each stratum sampled once.
+    Small designs are optimized for maximin distance between points.
+  Scrambled Sobol sequence: a low discrepancy quasi-random sequence, from scipy.
+Both are reproducible from a seed, and can be produced by chunks for streaming.
+The chunks of  sample_chunks  put together are the design of  sample.
+
+>>> from sensitivity.uncertainty import uncertainty_MD1
+>>> design = sample(uncertainty_MD1, 1000, "sobol", seed=0)
+>>> design.shape
+(1000, 13)
+>>> (design >= lower_upper(uncertainty_MD1)[0]).all()
+True
+"""
+
+import warnings
+
+from numpy import arange, empty, int32, minimum
+from numpy.random import default_rng
+
+from model.utils import magnitudes
+
+MAXIMIN_LIMIT = 2000  # The maximin optimization is quadratic in the number of points
+
+CHUNK_SIZE = 100000
+
+
+def lower_upper(space):
+    """Return the vectors of lower and upper bounds of the parameters, in base units."""
+    low = magnitudes(list(space["Low bound"]))
+    high = magnitudes(list(space["High bound"]))
+    return minimum(low, high), low + high - minimum(low, high)
+
+
+def scale(unit_design, space):
+    """Map a design in the unit hypercube onto the parameter ranges, in place."""
+    low, high = lower_upper(space)
+    unit_design *= high - low
+    unit_design += low
+    return unit_design
+
+
+def min_distance(points):
+    """Return the smallest distance between two points of a design."""
+    squares = (points * points).sum(axis=1)
+    distances = squares[:, None] + squares[None, :] - 2 * points @ points.T
+    distances[arange(len(points)), arange(len(points))] = float("inf")
+    return distances.min() ** 0.5
+
+
+def latin_hypercube_chunks(n, d, chunk_size=CHUNK_SIZE, seed=None):
+    """Yield a Latin hypercube design of n points in [0, 1)^d, by chunks of rows.
+
+    The strata permutations are drawn first, for all the rows,
+    then each chunk is jittered within its strata.
+    """
+    rng = default_rng(seed)
+    strata = empty((d, n), int32)
+    strata[:] = arange(n, dtype=int32)
+    for row in strata:
+        rng.shuffle(row)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        chunk = rng.random((stop - start, d))
+        chunk += strata[:, start:stop].T
+        chunk /= n
+        yield chunk
+
+
+def latin_hypercube(n, d, seed=None, candidates=10):
+    """Return a Latin hypercube design of n points in [0, 1)^d.
+
+    Up to  MAXIMIN_LIMIT  points, draw  candidates  designs and keep the one with
+    the largest minimum distance between points.
+
+    >>> design = latin_hypercube(5, 2, seed=1)
+    >>> sorted((design[:, 0] * 5).astype(int))
+    [0, 1, 2, 3, 4]
+    """
+    rng = default_rng(seed)
+    if n == 0:
+        return empty((0, d))
+    if n > MAXIMIN_LIMIT:
+        candidates = 1
+    best, best_distance = None, -1.0
+    for _ in range(candidates):
+        (design,) = latin_hypercube_chunks(n, d, chunk_size=max(n, 1), seed=rng)
+        distance = min_distance(design) if candidates > 1 else 0.0
+        if distance > best_distance:
+            best, best_distance = design, distance
+    return best
+
+
+def sobol_chunks(n, d, chunk_size=CHUNK_SIZE, seed=None):
+    """Yield n points of a scrambled Sobol sequence in [0, 1)^d, by chunks of rows.
+
+    The balance properties of the sequence hold when n is a power of 2.
+    """
+    from scipy.stats.qmc import Sobol  # pylint: disable=import-outside-toplevel
+
+    engine = Sobol(d, scramble=True, seed=seed)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", "The balance properties", UserWarning)
+        for start in range(0, n, chunk_size):
+            yield engine.random(min(chunk_size, n - start))
+
+
+def sobol(n, d, seed=None):
+    """Return n points of a scrambled Sobol sequence in [0, 1)^d."""
+    designs = list(sobol_chunks(n, d, chunk_size=max(n, 1), seed=seed))
+    return designs[0] if designs else empty((0, d))
+
+
+def sample(space, n, method="lhs", seed=None):
+    """Return a design of n runs over the parameter space, a float array (n, parameters).
+
+    >>> from sensitivity.uncertainty import uncertainty_MD1
+    >>> sample(uncertainty_MD1, 0).shape
+    (0, 13)
+    """
+    chunks = list(sample_chunks(space, n, method, seed, chunk_size=max(n, 1)))
+    return chunks[0] if chunks else empty((0, len(space)))
+
+
+def sample_chunks(space, n, method="lhs", seed=None, chunk_size=CHUNK_SIZE):
+    """Yield a design of n runs over the parameter space, by chunks of rows.
+
+    Latin hypercubes up to  MAXIMIN_LIMIT  points are maximin optimized in one piece,
+    then cut. Larger ones are drawn by chunks, to bound the memory.
+    """
+    d = len(space)
+    if method == "lhs" and n <= MAXIMIN_LIMIT:
+        design = latin_hypercube(n, d, seed)
+        chunks = (design[i:][:chunk_size] for i in range(0, n, chunk_size))
+    elif method == "lhs":
+        chunks = latin_hypercube_chunks(n, d, chunk_size, default_rng(seed))
+    elif method == "sobol":
+        chunks = sobol_chunks(n, d, chunk_size, seed)
+    else:
+        raise ValueError(
+            f"Unknown sampling method {method}, expecting 'lhs' or 'sobol'"
+        )
+    for chunk in chunks:
+        yield scale(chunk, space)
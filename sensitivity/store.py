@@ -0,0 +1,204 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# store
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Store the inputs and outputs of many model runs in a columnar file, chunk by chunk.
+
+Each run is one row: the input parameters x and the model results y.
+Values are stored as floats in base units (USD, kg, s), the display units
+are recorded in the metadata. Rows are buffered and written every  chunk_size  runs,
+so that a large study never holds all its results in memory.
+
+With pyarrow installed, the store is a Parquet file, with its metadata in a
+sidecar JSON file named after it, such as  runs.parquet.json .
+Otherwise it is a directory holding a  metadata.json  and one NumPy .npy file per chunk.
+The metadata is written when the writer is closed.
+Both are memory-mapped when read back. A store may have no rows.
+
+Usage:
+    with ResultWriter("runs.parquet", inputs, outputs, units) as writer:
+        for x in samples:
+            writer.append(x, model(x))
+    runs = ResultReader("runs.parquet")
+    plot(runs.column("coal_price"), runs.column("business_value"))
+"""
+
+import json
+from collections.abc import Mapping
+from pathlib import Path
+
+from numpy import concatenate, dtype, empty, load, save
+from pandas import DataFrame, Series
+
+from model.utils import Quantity, value
+
+try:
+    import pyarrow
+    from pyarrow import parquet
+except ImportError:
+    pyarrow = parquet = None
+
+CHUNK_SIZE = 10000
+
+CHUNK_NAME = "chunk-{:05d}.npy"
+
+
+def unit_of(qty):
+    """Return the display unit of qty as a string, or an empty string for a number."""
+    if isinstance(qty, Quantity):
+        return str(qty.display_unit)
+    return ""
+
+
+def metadata_path(path):
+    """Return the path of the metadata file of the store at path."""
+    path = Path(path)
+    if path.is_dir():
+        return path / "metadata.json"
+    return path.with_name(path.name + ".json")
+
+
+def _get(row, names):
+    """Return the values of the named fields of a row, a dict, a sequence or an object."""
+    if isinstance(row, (Mapping, Series)):
+        return [row[name] for name in names]
+    if isinstance(row, (tuple, list)) and not hasattr(row, "_fields"):
+        assert len(row) == len(names), f"Expecting {len(names)} values, got {len(row)}"
+        return list(row)
+    return [getattr(row, name) for name in names]
+
+
+class ResultWriter:
+    """Stream rows of inputs and outputs into a columnar store, one chunk at a time.
+
+    inputs, outputs: the column names. Rows given as dicts, Series or objects
+        are read by name, sequences are read in order.
+    units: optional dict of display units by column name,
+        by default the display units of the quantities in the first row.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, path, inputs, outputs, units=None, chunk_size=CHUNK_SIZE):
+        """Open the store, to be closed by  close  or by leaving a with block."""
+        self.path = Path(path)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.columns = self.inputs + self.outputs
+        assert len(set(self.columns)) == len(self.columns), "Column names must differ"
+        self.units = dict(units or {})
+        self.chunk_size = chunk_size
+        self.dtype = dtype([(name, "f8") for name in self.columns])
+        self._buffer = empty(chunk_size, self.dtype)
+        self._filled = 0
+        self.rows = 0
+        self.chunks = 0
+        self._parquet_writer = None
+        if parquet is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, x, y):
+        """Add one run, x the inputs and y the outputs."""
+        row = _get(x, self.inputs) + _get(y, self.outputs)
+        if self.rows == 0:
+            for name, qty in zip(self.columns, row):
+                self.units.setdefault(name, unit_of(qty))
+        self._buffer[self._filled] = tuple(float(value(qty)) for qty in row)
+        self._filled += 1
+        self.rows += 1
+        if self._filled == self.chunk_size:
+            self.flush()
+
+    def metadata(self):
+        """Return the description of the store, saved along the data."""
+        return {
+            "inputs": self.inputs,
+            "outputs": self.outputs,
+            "units": self.units,
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "base_units": True,
+        }
+
+    def flush(self):
+        """Write the buffered rows as a new chunk."""
+        if not self._filled:
+            return
+        chunk = self._buffer[: self._filled]
+        if parquet is None:
+            save(self.path / CHUNK_NAME.format(self.chunks), chunk)
+        else:
+            self._open_parquet()
+            arrays = [chunk[name] for name in self.columns]
+            table = pyarrow.Table.from_arrays(
+                arrays, schema=self._parquet_writer.schema
+            )
+            self._parquet_writer.write_table(table)
+        self.chunks += 1
+        self._filled = 0
+
+    def _open_parquet(self):
+        """Create the Parquet file, with one float column per name."""
+        if self._parquet_writer is None:
+            schema = pyarrow.schema(
+                [(name, pyarrow.float64()) for name in self.columns]
+            )
+            self._parquet_writer = parquet.ParquetWriter(self.path, schema)
+
+    def close(self):
+        """Write the last rows and the metadata, then close the file."""
+        self.flush()
+        if parquet is not None:
+            self._open_parquet()  # So that a store without rows is a valid file
+            self._parquet_writer.close()
+        with open(metadata_path(self.path), "w") as file:
+            json.dump(self.metadata(), file, indent=1)
+
+
+class ResultReader:
+    """Read back a store written by ResultWriter, memory-mapped."""
+
+    def __init__(self, path):
+        """Open the store and read its metadata."""
+        self.path = Path(path)
+        with open(metadata_path(self.path)) as file:
+            self.metadata = json.load(file)
+        if self.path.is_dir():
+            self._chunks = [
+                load(self.path / CHUNK_NAME.format(i), mmap_mode="r")
+                for i in range(self.metadata["chunks"])
+            ]
+            self._table = None
+        else:
+            assert parquet is not None, "Reading a Parquet store needs pyarrow"
+            self._table = parquet.read_table(self.path, memory_map=True)
+        self.inputs = self.metadata["inputs"]
+        self.outputs = self.metadata["outputs"]
+        self.units = self.metadata["units"]
+
+    def __len__(self):
+        return self.metadata["rows"]
+
+    def column(self, name):
+        """Return a column as a float array, a view on the file when it is one chunk."""
+        if self._table is not None:
+            return self._table.column(name).to_numpy()
+        if not self._chunks:
+            return empty(0)
+        if len(self._chunks) == 1:
+            return self._chunks[0][name]
+        return concatenate([chunk[name] for chunk in self._chunks])
+
+    def to_frame(self):
+        """Return all the columns as a DataFrame, loaded in memory."""
+        columns = self.inputs + self.outputs
+        return DataFrame({name: self.column(name) for name in columns}, columns=columns)
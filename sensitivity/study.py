@@ -0,0 +1,169 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# study
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Run long sensitivity studies by chunks, with a checkpoint to resume after interruption.
+
+A study runs the blackbox on a Latin hypercube or Sobol design of n runs over
+an uncertainty table. The study directory holds one .npy file per finished chunk
+of runs, and a  metadata.json  recording the design, the seed and the progress.
+Both are written atomically, by renaming a complete temporary file, so that
+a crash or a Ctrl-C loses at most the chunk being computed.
+
+Running the same study again resumes after the last finished chunk.
+The design is regenerated from its seed and the finished chunks skipped,
+so the results are bit-for-bit those of an uninterrupted run.
+A study refuses to resume if the design, the uncertainty table, the model,
+or the source and data files the module of the model depends on changed,
+see  model.hashing.dependencies.
+
+The directory is a store, read with  sensitivity.store.ResultReader.
+
+Usage:
+    study = Study("runs_MD1", uncertainty_MD1, f_MD1, 10**6, seed=0)
+    runs = study.run()
+    plot(runs.column("coal_price"), runs.column("business_value"))
+"""
+
+import json
+import os
+from functools import partial
+from pathlib import Path
+
+from numpy import empty, full, nan, save
+
+from model.hashing import fingerprint, model_digest, source_digest
+from model.utils import in_float_mode, magnitudes
+from sensitivity.sampling import sample_chunks
+from sensitivity.store import CHUNK_NAME, ResultReader, unit_of
+
+CHUNK_SIZE = 10000
+
+OUTPUTS = ["business_value", "external_value"]
+
+
+def write_atomic(path, write):
+    """Call write on a temporary file, then rename it to path."""
+    temporary = path.with_name("." + path.name + ".tmp")
+    with open(temporary, "wb") as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def evaluate_design(model, inputs, design):
+    """Return the runs of the model on the rows of a design, a structured array.
+
+    The columns of the design are the inputs. Runs which the model asserts
+    are infeasible have NaN results.
+    """
+    run = in_float_mode(model)
+    outputs = full((len(design), len(OUTPUTS)), nan)
+    for i, row in enumerate(design):
+        try:
+            outputs[i] = magnitudes(list(run(dict(zip(inputs, row)))))
+        except AssertionError:
+            pass
+    result = empty(len(design), [(name, "f8") for name in inputs + OUTPUTS])
+    for j, name in enumerate(inputs):
+        result[name] = design[:, j]
+    for j, name in enumerate(OUTPUTS):
+        result[name] = outputs[:, j]
+    return result
+
+
+class Study:
+    """A sensitivity study of a model over an uncertainty table, run by chunks."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self, path, uncertainty, model, n, method="lhs", seed=0, chunk_size=CHUNK_SIZE
+    ):
+        """Describe the study, stored in the directory path. Nothing runs yet."""
+        self.path = Path(path)
+        self.uncertainty = uncertainty
+        self.model = model
+        self.inputs = list(uncertainty.index)
+        self.design = {
+            "n": n,
+            "method": method,
+            "seed": seed,
+            "chunk_size": chunk_size,
+            "model": f"{model.__module__}.{model.__qualname__}",
+            "model_fingerprint": fingerprint(model),
+            "model_digest": model_digest(),
+            "source_digest": source_digest([model.__module__]),
+            "uncertainty": fingerprint(uncertainty),
+        }
+        self.chunks = (n + chunk_size - 1) // chunk_size
+        self.dtype = [(name, "f8") for name in self.inputs + OUTPUTS]
+
+    def metadata(self, finished):
+        """Return the store metadata, with the study design and progress."""
+        units = {name: unit_of(x) for name, x in self.uncertainty["Baseline"].items()}
+        units.update({name: "MUSD" for name in OUTPUTS})
+        rows = min(finished * self.design["chunk_size"], self.design["n"])
+        return {
+            "inputs": self.inputs,
+            "outputs": OUTPUTS,
+            "units": units,
+            "rows": rows,
+            "chunks": finished,
+            "base_units": True,
+            "study": self.design,
+        }
+
+    def finished(self):
+        """Return the number of finished chunks recorded in the checkpoint.
+
+        Raise ValueError if the checkpoint belongs to a different study.
+        """
+        try:
+            with open(self.path / "metadata.json") as file:
+                recorded = json.load(file)
+        except FileNotFoundError:
+            return 0
+        if recorded.get("study") != self.design:
+            raise ValueError(f"{self.path} holds a different study, cannot resume")
+        return recorded["chunks"]
+
+    def _checkpoint(self, finished):
+        """Record the progress, atomically."""
+        text = json.dumps(self.metadata(finished), indent=1).encode()
+        write_atomic(self.path / "metadata.json", lambda file: file.write(text))
+
+    def evaluate(self, design):
+        """Return the runs of the model on the rows of a design, a structured array."""
+        return evaluate_design(self.model, self.inputs, design)
+
+    def run(self, progress=None):
+        """Run the chunks not finished yet and return the results as a ResultReader.
+
+        progress: optional function called with the number of finished chunks
+            and the total, after each chunk.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        finished = self.finished()
+        if finished == 0:
+            self._checkpoint(0)
+        chunks = sample_chunks(
+            self.uncertainty,
+            self.design["n"],
+            self.design["method"],
+            self.design["seed"],
+            self.design["chunk_size"],
+        )
+        for i, design in enumerate(chunks):
+            if i < finished:
+                continue
+            runs = self.evaluate(design)
+            write_atomic(self.path / CHUNK_NAME.format(i), partial(save, arr=runs))
+            self._checkpoint(i + 1)
+            if progress is not None:
+                progress(i + 1, self.chunks)
+        return ResultReader(self.path)
@@ -8,25 +8,30 @@
 # Creative Commons Attribution-ShareAlike 4.0 International
 """Test the code for sensitivity analysis."""
 
-from pandas import set_option
-
-# pylint: disable=wrong-import-position
-from natu import config
+import pytest
 
-config.use_quantities = False
+from pandas import set_option
 
+from model.utils import float_mode, strip
 from sensitivity.uncertainty import uncertainty_MD1, uncertainty_NB
 from sensitivity.one_at_a_time import table_sensitivity
 from sensitivity.blackbox import f_MD1, f_NB
 
 
+@pytest.fixture(autouse=True)
+def floats():
+    """Run in float mode, the mode in which the results were recorded."""
+    with float_mode():
+        yield
+
+
 def test_uncertainty(regtest):
     """Save the uncertainty parameters used in sensitivity analysis."""
     set_option("display.float_format", "{:9,.2f}".format)
     regtest.write("MD1\n")
-    regtest.write(uncertainty_MD1.to_string())
+    regtest.write(strip(uncertainty_MD1).to_string())
     regtest.write("\n\nNB\n")
-    regtest.write(uncertainty_NB.to_string())
+    regtest.write(strip(uncertainty_NB).to_string())
 
 
 def test_results(regtest):
@@ -0,0 +1,132 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# threshold
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Find break-even values of a parameter, for many scenarios at once.
+
+For each scenario, find the value of one parameter, like the coal price or
+the carbon price, where a result of the blackbox crosses zero, the other
+parameters staying at their scenario value.
+
+The scenarios are solved together by  model.roots.solve_secant, each iteration
+runs the model only for the scenarios still searching.
+For market parameters, each scenario evaluation goes through the batch path:
+one system is built per distinct value of the physical parameters, then all
+the scenarios sharing it are evaluated as arrays. Otherwise, and for models
+without a batch path, the model runs once per scenario and iteration.
+
+Usage:
+    scenarios = ParameterSpace.from_table(uncertainty_MD1).sample(1000, seed=0)
+    roots = break_even_values(f_MD1, scenarios, "coal_price")
+    print(roots.x[roots.converged])
+"""
+
+from numpy import arange, asarray, broadcast_to, full, nan, stack, unique, where
+
+from model.roots import solve_secant
+from model.utils import float_mode, magnitudes
+from sensitivity.blackbox import PHYSICAL, SYSTEMS, batch_values
+
+OUTPUTS = ["business_value", "external_value"]
+
+
+def as_columns(scenarios):
+    """Return the scenarios as a dict of float arrays, from a structured array or a dict."""
+    if getattr(getattr(scenarios, "dtype", None), "names", None):
+        columns = {name: scenarios[name] for name in scenarios.dtype.names}
+    else:
+        columns = {name: magnitudes(column) for name, column in scenarios.items()}
+    size = max(column.size for column in columns.values())
+    return {
+        name: broadcast_to(asarray(column, dtype=float), (size,))
+        for name, column in columns.items()
+    }
+
+
+def _row(columns, i):
+    """Return the scenario i as a dict of floats."""
+    return {name: float(column[i]) for name, column in columns.items()}
+
+
+def _feasible(function, x):
+    """Return function(x), or None if the model asserts that x is not feasible."""
+    try:
+        return function(x)
+    except AssertionError:
+        return None
+
+
+def batch_objective(model, columns, parameter, output):
+    """Return the function giving the output of the scenarios at rows, for values of parameter."""
+    build = SYSTEMS[model]
+    k = OUTPUTS.index(output)
+    physical = stack([columns[name] for name in PHYSICAL], axis=1)
+    keys, group = unique(physical, axis=0, return_inverse=True)
+    group = group.ravel()
+    members = [where(group == g)[0] for g in range(len(keys))]
+    systems = [_feasible(build, _row(columns, rows[0])) for rows in members]
+
+    def objective(values, rows):
+        result = full(len(rows), nan)
+        position = full(len(group), -1)
+        position[rows] = arange(len(rows))
+        for system, scenarios in zip(systems, members):
+            scenarios = scenarios[position[scenarios] >= 0]
+            if system is None or not scenarios.size:
+                continue
+            x = {name: column[scenarios] for name, column in columns.items()}
+            x[parameter] = values[position[scenarios]]
+            result[position[scenarios]] = batch_values(system, x)[k]
+        return result
+
+    return objective
+
+
+def pointwise_objective(model, columns, parameter, output):
+    """Return the function giving the output of the scenarios at rows, one model run each."""
+    k = OUTPUTS.index(output)
+
+    def objective(values, rows):
+        result = full(len(rows), nan)
+        for j, (i, value) in enumerate(zip(rows, values)):
+            x = _row(columns, i)
+            x[parameter] = value
+            y = _feasible(model, x)
+            if y is not None:
+                result[j] = magnitudes(y[k])
+        return result
+
+    return objective
+
+
+# pylint: disable=too-many-arguments
+def break_even_values(
+    model, scenarios, parameter, output="business_value", starting_range=None, **options
+):
+    """Return the values of parameter where the output crosses zero, per scenario.
+
+    The result is a  model.roots.Roots  of float arrays in base units, with
+    the non converged scenarios flagged, for example when the output does
+    not depend on the parameter, or when the search leaves the feasible domain.
+    The search starts from the scenario value of the parameter and 10% above it,
+    or from a starting_range (low, high).
+    Options are passed to  solve_secant.
+    """
+    assert output in OUTPUTS, f"Expecting output in {OUTPUTS}"
+    columns = as_columns(scenarios)
+    assert parameter in columns, f"Scenarios lack the parameter {parameter}"
+    start = columns[parameter]
+    if starting_range is None:
+        x0, x1 = start, where(start == 0, 1e-3, start * 1.1)
+    else:
+        x0, x1 = (broadcast_to(float(x), start.shape) for x in starting_range)
+    with float_mode():
+        if model in SYSTEMS and parameter not in PHYSICAL:
+            objective = batch_objective(model, columns, parameter, output)
+        else:
+            objective = pointwise_objective(model, columns, parameter, output)
+        return solve_secant(objective, x0, x1, indexed=True, **options)
@@ -0,0 +1,131 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# voi
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+"""Compute the value of information on the uncertain parameters, for the cofiring decision.
+
+The decision is to cofire or not. Cofiring has a net benefit, the business value
+for the plant, or the social value which adds the external value. Not cofiring
+is worth zero. Under uncertainty, we cofire if the expected net benefit is positive.
+
+The expected value of perfect information (EVPI) is how much better the decision
+would be on average if all the uncertainty was resolved before deciding:
+    EVPI = E[max(B, 0)] - max(E[B], 0)
+The expected value of partial perfect information (EVPPI) on one parameter is
+the same, when only that parameter is known:
+    EVPPI = E[max(E[B | parameter], 0)] - max(E[B], 0)
+
+The conditional expectation is estimated by regression on a single Monte Carlo
+sample, averaging the net benefit in bins of equal count along the parameter
+(Strong, Oakley and Brennan 2014). So all the EVPPIs come from one batch of runs.
+
+Usage:
+    space = ParameterSpace.from_table(uncertainty_MD1, CORRELATIONS)
+    print(value_of_information(space, f_MD1, 10000, seed=0))
+
+>>> from numpy import linspace
+>>> x = linspace(0, 1, 10001)
+>>> round(evpi(x - 0.5), 3)
+0.125
+>>> round(evppi(x, x - 0.5), 3)
+0.125
+>>> round(evppi(x[::-1], x - 0.5, bins=10), 3)
+0.125
+>>> round(evppi(x, 0.5 - x * 0), 3)
+0.0
+"""
+
+from numpy import argsort, array_split, asarray, empty, full, isfinite, nan, zeros
+from pandas import DataFrame
+
+from model.utils import in_float_mode, magnitudes
+
+CRITERIA = ["business_value", "social_value"]
+
+
+def as_options(net_benefit):
+    """Return the net benefits of all the options, an array (runs, options).
+
+    A vector is the net benefit of acting, against not acting which is worth zero.
+    """
+    net_benefit = asarray(net_benefit, dtype=float)
+    if net_benefit.ndim == 2:
+        return net_benefit
+    options = zeros((len(net_benefit), 2))
+    options[:, 1] = net_benefit
+    return options
+
+
+def evpi(net_benefit):
+    """Return the expected value of perfect information, from a Monte Carlo sample."""
+    options = as_options(net_benefit)
+    return _regret(options, options)
+
+
+def conditional_means(parameter, net_benefit, bins=None):
+    """Return E[net benefit | parameter] at each run, by averaging in bins of equal count.
+
+    By default, the cube root of the number of runs bins. The noise left in the bin
+    means biases the EVPPI upwards, fewer and larger bins trade it for resolution.
+    """
+    options = as_options(net_benefit)
+    n = len(options)
+    if bins is None:
+        bins = max(round(n ** (1 / 3)), 1)
+    result = empty(options.shape)
+    for members in array_split(argsort(parameter, kind="stable"), bins):
+        result[members] = options[members].mean(axis=0)
+    return result
+
+
+def evppi(parameter, net_benefit, bins=None):
+    """Return the expected value of partial perfect information on one parameter.
+
+    parameter: the values of the parameter in each run,
+    net_benefit: the net benefit of acting in each run, or of all options (runs, options).
+    """
+    options = as_options(net_benefit)
+    return _regret(conditional_means(parameter, options, bins), options)
+
+
+def _regret(informed, options):
+    """Return the mean gain of choosing by the informed values over the best option a priori.
+
+    Computed run by run, so that it is exactly zero when the choice never changes.
+    """
+    best = options.mean(axis=0).argmax()
+    return float((informed.max(axis=1) - informed[:, best]).mean())
+
+
+def value_of_information(space, model, n, seed=None, method="lhs", bins=None):
+    """Return the EVPI and the EVPPI of each parameter, from n runs of the model.
+
+    space: a ParameterSpace. model: a blackbox returning the business value and
+    the external value. Return a dataframe in USD, one row per parameter and
+    a last row for the EVPI, one column per decision criterion.
+    Runs which the model asserts are infeasible are left out.
+    """
+    runs = space.sample(n, seed=seed, method=method)
+    run = in_float_mode(model)
+    results = full((n, 2), nan)
+    for i, x in enumerate(runs):
+        try:
+            results[i] = magnitudes(list(run(x)))
+        except AssertionError:
+            pass
+    feasible = isfinite(results).all(axis=1)
+    runs, results = runs[feasible], results[feasible]
+    criteria = {
+        "business_value": results[:, 0],
+        "social_value": results[:, 0] + results[:, 1],
+    }
+    table = {
+        criterion: [evppi(runs[name], net_benefit, bins) for name in space.names]
+        + [evpi(net_benefit)]
+        for criterion, net_benefit in criteria.items()
+    }
+    return DataFrame(table, index=space.names + ["EVPI"], columns=CRITERIA)
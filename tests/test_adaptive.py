@@ -0,0 +1,47 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the adaptive Monte Carlo stopping rule."""
+
+from sensitivity.adaptive import adaptive_monte_carlo
+from sensitivity.distributions import ParameterSpace, Uniform
+
+
+def model(x):
+    """Return two results with standard deviations 1 and 0.1."""
+    return x["a"] * 12 ** 0.5, x["b"]
+
+
+def test_stops_when_precise():
+    """The draws needed grow as the square of the precision."""
+    space = ParameterSpace({"a": Uniform(0, 1), "b": Uniform(0, 12 ** 0.5 / 10)})
+    coarse = adaptive_monte_carlo(space, model, tolerance=0.2, batch_size=50, seed=0)
+    fine = adaptive_monte_carlo(space, model, tolerance=0.1, batch_size=50, seed=0)
+    assert coarse.converged and fine.converged
+    assert 50 < coarse.draws < 200 < fine.draws < 800
+    assert abs(fine.estimates["business_value"].mean - 12 ** 0.5 / 2) < 0.1
+    assert len(fine.history) == fine.draws / 50
+
+
+def fragile(x):
+    """Return the results, unless the parameter is too high."""
+    assert x["a"] < 0.9, "Infeasible"
+    return model(x)
+
+
+def test_skips_infeasible():
+    """Infeasible draws are skipped and counted, the runs stay within max_draws."""
+    space = ParameterSpace({"a": Uniform(0, 1), "b": Uniform(0, 1)})
+    result = adaptive_monte_carlo(
+        space, fragile, tolerance=0.01, batch_size=100, max_draws=500, seed=0
+    )
+    assert not result.converged
+    assert 20 < result.infeasible < 80
+    assert result.draws + result.infeasible == 500
+    assert result.samples.shape == (result.draws, 2)
+    assert result.samples[:, 0].max() < 0.9 * 12 ** 0.5
+    assert result.history["infeasible"].iloc[-1] == result.infeasible
@@ -0,0 +1,43 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the command line batch runner on scenario files."""
+
+import csv
+import io
+import json
+
+from model.batch import main
+
+
+def test_batch(tmp_path, capsys):
+    """Workers give the same rows as a serial run, infeasible scenarios are NaN."""
+    with open("Data/scenarios/NB.json") as file:
+        data = json.load(file)
+    variants = [
+        dict(data, name=f"NB {rate}", cofire=dict(data["cofire"], cofire_rate=rate))
+        for rate in (0.02, 0.05, 0.9)
+    ]
+    (tmp_path / "variants.json").write_text(json.dumps(variants))
+    arguments = [str(tmp_path), "Data/scenarios/NB.json", "--format", "csv"]
+
+    assert main(arguments + ["--chunk-size", "2"]) == 0
+    serial = capsys.readouterr().out
+    assert main(arguments + ["--jobs", "2", "--chunk-size", "1", "--progress"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out == serial
+    assert "4/4 chunks" in captured.err
+
+    rows = list(csv.DictReader(io.StringIO(serial)))
+    assert [row["name"] for row in rows] == [
+        "NB 0.02",
+        "NB 0.05",
+        "NB 0.9",
+        "Ninh Binh",
+    ]
+    assert rows[1]["business_value"] == rows[3]["business_value"]
+    assert rows[2]["business_value"] == "nan"
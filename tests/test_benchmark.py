@@ -0,0 +1,28 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the benchmark suite saves its timings and flags regressions."""
+
+import json
+
+from benchmark.suite import main
+
+
+def test_suite(tmp_path, capsys):
+    """A run compared with itself passes, with a faster baseline it fails."""
+    path = tmp_path / "baseline.json"
+    arguments = ["--only", "npv", "--repeat", "1", "--no-imports"]
+    assert main(arguments + ["--output", str(path)]) == 0
+    saved = json.loads(path.read_text())
+    assert list(saved["results"]) == ["npv"]
+    assert list(saved["results"]["npv"]) == ["quantities", "floats"]
+
+    assert main(arguments + ["--baseline", str(path), "--threshold", "100"]) == 0
+    saved["results"]["npv"]["floats"] /= 1000
+    path.write_text(json.dumps(saved))
+    assert main(arguments + ["--baseline", str(path)]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
@@ -0,0 +1,93 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the output cache of the table and figure generators."""
+
+import ast
+from pathlib import Path
+
+import pytest
+
+import manuscript1.cache
+from manuscript1.cache import OutputCache, cache_key, declarations
+from model.hashing import PROJECT_DIR, dependencies, fingerprint
+
+# pylint and pytest known compatibility bug
+# pylint: disable=redefined-outer-name
+
+GENERATORS = sorted(Path("manuscript1/table").glob("*.py")) + sorted(
+    Path("manuscript1/figure").glob("*.py")
+)
+
+
+def imported_parameters(path):
+    """Return the names a module imports from manuscript1.parameters."""
+    names = []
+    for node in ast.parse(path.read_text()).body:
+        if isinstance(node, ast.ImportFrom) and node.module == "manuscript1.parameters":
+            names += [alias.name for alias in node.names]
+    return names
+
+
+@pytest.mark.parametrize("path", GENERATORS, ids=lambda path: path.stem)
+def test_declarations(path):
+    """Each generator declares exactly the parameters it imports."""
+    module_name = ".".join(path.with_suffix("").parts)
+    parameters, figure_file = declarations(module_name)
+    assert sorted(parameters) == sorted(imported_parameters(path))
+    assert (figure_file is not None) == ("figure" in path.parts)
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    return OutputCache(tmp_path, max_size=100)
+
+
+def test_hit_miss(cache):
+    assert cache.get("table.a", "key") is None
+    cache.put("table.a", "key", b"output")
+    entry = cache.get("table.a", "key")
+    assert (entry / "stdout").read_bytes() == b"output"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_lru_eviction(cache):
+    cache.put("table.a", "key", b"a" * 40)
+    cache.put("table.b", "key", b"b" * 40)
+    cache.get("table.a", "key")  # b is now the least recently used
+    cache.put("table.c", "key", b"c" * 40)
+    assert cache.get("table.b", "key") is None
+    assert cache.get("table.a", "key") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate(cache):
+    cache.put("table.a", "key1", b"a")
+    cache.put("table.b", "key1", b"b")
+    assert cache.invalidate("table.a") == 1
+    assert cache.stats()["entries"] == 1
+    assert cache.invalidate() == 1
+
+
+def test_fingerprint_parameters():
+    """Changing a parameter value changes the fingerprint."""
+    import manuscript1.parameters as baseline  # pylint: disable=import-outside-toplevel
+
+    cofire = baseline.cofire_MD1
+    assert fingerprint(cofire) == fingerprint(cofire._replace())
+    assert fingerprint(cofire) != fingerprint(cofire._replace(cofire_rate=0.06))
+
+
+def test_key_dependencies(monkeypatch):
+    """The key covers the modules a generator imports and the data they read."""
+    files = dependencies("manuscript1.table.jobs")
+    assert PROJECT_DIR / "model" / "tables.py" in files
+    assert PROJECT_DIR / "Data" / "Rice_production_2017_GSO.xlsx" in files
+    key = cache_key("manuscript1.table.jobs")
+    monkeypatch.setattr(manuscript1.cache, "source_digest", lambda names: "changed")
+    assert cache_key("manuscript1.table.jobs") != key
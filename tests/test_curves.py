@@ -0,0 +1,49 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the declarative curves used as boiler efficiency loss."""
+
+import json
+import pickle
+
+from numpy import linspace
+
+import manuscript1.parameters as baseline
+from model.cofiringplant import CofiringPlant
+from model.curves import PiecewiseLinear, Polynomial, curve_from_dict
+from model.utils import float_mode, strip
+
+
+def tillman(r):
+    return 0.0044 * r ** 2 + 0.0055 * r
+
+
+def test_same_as_function():
+    """The cofiring plant gives identical results with the curve or the function."""
+    with float_mode():
+        plant_parameter, emission_factor = strip(
+            (baseline.plant_parameter_MD1, baseline.emission_factor)
+        )
+        cofire = strip(baseline.cofire_MD1)
+        with_curve = CofiringPlant(plant_parameter, cofire, emission_factor)
+        cofire = cofire._replace(boiler_efficiency_loss=tillman)
+        with_function = CofiringPlant(plant_parameter, cofire, emission_factor)
+    assert (with_curve.plant_efficiency == with_function.plant_efficiency).all()
+    assert (with_curve.mainfuel_used == with_function.mainfuel_used).all()
+
+
+def test_serializable():
+    """Curves round trip through pickle and JSON, and are hashable."""
+    r = linspace(0, 0.3, 7)
+    for curve in Polynomial([0, 0.0055, 0.0044]), PiecewiseLinear(r, tillman(r)):
+        assert pickle.loads(pickle.dumps(curve)) == curve
+        assert curve_from_dict(json.loads(json.dumps(curve.as_dict()))) == curve
+        assert len({curve, pickle.loads(pickle.dumps(curve))}) == 1
+    # Quantities do not unpickle, the parameters are shipped stripped, in float mode
+    with float_mode():
+        cofire = strip(baseline.cofire_MD1)
+    assert pickle.loads(pickle.dumps(cofire)) == cofire
@@ -0,0 +1,69 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the hourly dispatch mode against the annual mode."""
+
+from numpy import full, linspace, stack
+
+import manuscript1.parameters as baseline
+from model.dispatch import Dispatch, SUBCRITICAL_COAL, annual_factors
+from model.dispatch import cofiring_schedule
+from model.system import System
+from model.utils import float_mode, isclose_all, magnitudes
+
+
+def system(dispatch=None):
+    return System(
+        baseline.plant_parameter_MD1,
+        baseline.cofire_MD1,
+        baseline.supply_chain_MD1,
+        baseline.price_MD1,
+        baseline.farm_parameter,
+        baseline.transport_parameter,
+        baseline.mining_parameter,
+        baseline.emission_factor,
+        dispatch,
+    )
+
+
+def test_flat_profile():
+    """At constant load and efficiency, the hourly mode is the annual mode."""
+    capacity_factor = baseline.plant_parameter_MD1.capacity_factor
+    with float_mode():
+        annual = system()
+        hourly = system(Dispatch(full(8760, capacity_factor)))
+        for attribute in "power_generation", "mainfuel_used", "cofuel_used":
+            expected = getattr(annual.cofiring_plant, attribute)
+            assert isclose_all(getattr(hourly.cofiring_plant, attribute), expected)
+        assert isclose_all(hourly.plant.mainfuel_used, annual.plant.mainfuel_used)
+
+
+def test_part_load_and_schedule():
+    """Part load burns more coal per MWh, and cofiring less often uses less straw."""
+    load = linspace(0.4, 1, 8760)
+    with float_mode():
+        annual = system().cofiring_plant
+        part_load = system(Dispatch(load, SUBCRITICAL_COAL)).cofiring_plant
+        schedule = cofiring_schedule(load, minimum_load=0.6)
+        scheduled = system(Dispatch(load, SUBCRITICAL_COAL, schedule)).cofiring_plant
+    heat_rate = magnitudes(part_load.gross_heat_input / part_load.power_generation)
+    assert (
+        heat_rate > magnitudes(annual.gross_heat_input / annual.power_generation)
+    ).all()
+    assert (scheduled.cofuel_used[1:] < part_load.cofuel_used[1:]).all()
+    assert (scheduled.mainfuel_used[1:] > part_load.mainfuel_used[1:]).all()
+
+
+def test_vectorized():
+    """Scenarios and years along leading axes are reduced together."""
+    loads = stack([full((21, 8760), 0.5), linspace(0.4, 1, 21 * 8760).reshape(21, -1)])
+    factors = annual_factors(Dispatch(loads, SUBCRITICAL_COAL))
+    assert factors.load_factor.shape == (2, 21)
+    assert isclose_all(factors.part_load_derating[0], full(21, 0.925))
+    assert (
+        factors.part_load_derating[1, 1:] >= factors.part_load_derating[1, :-1]
+    ).all()
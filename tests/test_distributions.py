@@ -0,0 +1,63 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the parameter distributions against known quantiles, and the rank correlation."""
+
+from numpy import array, array_equal, exp, linspace, sort, sqrt
+from numpy.random import default_rng
+from numpy.testing import assert_allclose
+from scipy.stats import beta, norm, triang
+
+from sensitivity.distributions import (
+    PERT,
+    LogNormal,
+    Triangular,
+    iman_conover,
+    rank_correlation,
+)
+
+P = linspace(0.01, 0.99, 15)
+
+
+def test_triangular():
+    """Quantiles of the triangular distribution (0, 1, 4)."""
+    distribution = Triangular(0, 1, 4)
+    assert_allclose(distribution.ppf([0, 0.25, 0.5, 1]), [0, 1, 4 - sqrt(6), 4])
+    assert_allclose(distribution.ppf(P), triang(0.25, 0, 4).ppf(P))
+    assert_allclose(Triangular(2, 2, 2).ppf(P), 2)
+
+
+def test_pert():
+    """The PERT (0, 1, 4) is a beta (2, 4) scaled to [0, 4], symmetric ones have mode median."""
+    assert_allclose(PERT(0, 1, 4).ppf(P), 4 * beta(2, 4).ppf(P))
+    assert_allclose(PERT(-1, 1, 3).ppf(0.5), 1)
+
+
+def test_lognormal():
+    """Quantiles of the lognormal, and its central interval."""
+    distribution = LogNormal(2, 0.5)
+    assert_allclose(distribution.ppf([0.5, norm.cdf(1)]), [2, 2 * exp(0.5)])
+    assert_allclose(LogNormal.from_interval(1, 4).ppf([0.05, 0.95]), [1, 4])
+
+
+def test_iman_conover():
+    """The target rank correlations are reached, the marginals are unchanged."""
+    rng = default_rng(0)
+    sample = array(
+        [
+            Triangular(0, 1, 4).ppf(rng.random(2000)),
+            PERT(0, 1, 4).ppf(rng.random(2000)),
+            LogNormal(2, 0.5).ppf(rng.random(2000)),
+        ]
+    ).T
+    target = array([[1, 0.7, -0.3], [0.7, 1, 0], [-0.3, 0, 1]])
+    result = iman_conover(sample, target, rng=1)
+    for j in range(3):
+        assert array_equal(sort(result[:, j]), sort(sample[:, j]))
+        for k in range(j):
+            correlation = rank_correlation(result[:, j], result[:, k])
+            assert abs(correlation - target[j, k]) < 0.05
@@ -0,0 +1,42 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the polynomial chaos emulator."""
+
+from numpy import linspace, meshgrid, stack
+
+from sensitivity.emulator import Emulator, EmulatedModel
+
+
+def model(x):
+    """Return two quadratic outputs, emulated exactly at degree 2."""
+    return x["a"] * x["b"], x["a"] ** 2 - 3 * x["b"]
+
+
+def test_save_and_fallback(tmp_path):
+    """A saved emulator answers the same inside its bounds, the model outside."""
+    a, b = meshgrid(linspace(0, 1, 7), linspace(0, 1, 7))
+    inputs = stack([a.ravel(), b.ravel()], axis=1)
+    outputs = [model({"a": a, "b": b}) for a, b in inputs]
+    emulator = Emulator(["a", "b"], [0, 0], [1, 1])
+    assert max(emulator.validate(inputs, outputs)) < 1e-9
+    emulator.fit(inputs, outputs).save(tmp_path / "emulator.npz")
+
+    emulated = EmulatedModel(Emulator.load(tmp_path / "emulator.npz"), model)
+    a, b = emulated({"a": 0.5, "b": 0.2})
+    assert abs(a - 0.1) < 1e-9 and abs(b + 0.35) < 1e-9
+    assert emulated({"a": 2.0, "b": 0.0}) == (0.0, 4.0)
+    assert emulated.fallbacks == 1
+
+
+def test_constant_output():
+    """The cross-validation error of an output which does not vary is finite."""
+    inputs = linspace(0, 1, 20)[:, None]
+    outputs = stack([inputs[:, 0], 0 * inputs[:, 0]], axis=1)
+    error = Emulator(["a"], [0], [1], degree=1).validate(inputs, outputs, seed=0)
+    assert error[0] < 1e-9
+    assert error[1] == 0
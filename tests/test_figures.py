@@ -0,0 +1,25 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Smoke test the figure generators of the manuscript."""
+
+from runpy import run_module
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+import manuscript1.parameters  # pylint: disable=unused-import  # Reads Data/ from the root
+
+matplotlib.use("Agg")
+
+
+def test_emissions(tmp_path, monkeypatch):
+    """The emissions figure is drawn and saved."""
+    monkeypatch.chdir(tmp_path)
+    run_module("manuscript1.figure.emissions", run_name="__main__")
+    plt.close("all")
+    assert (tmp_path / "figure_emissions.pdf").stat().st_size > 0
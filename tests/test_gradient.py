@@ -0,0 +1,30 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the dual number gradients against finite differences."""
+
+from model.utils import in_float_mode, magnitudes
+from sensitivity.blackbox import f_MD1
+from sensitivity.gradient import gradient
+from sensitivity.uncertainty import uncertainty_MD1
+
+
+def test_finite_differences():
+    """The derivatives match centered differences of the float mode model."""
+    results, derivatives = gradient(uncertainty_MD1, f_MD1)
+    x = dict(zip(uncertainty_MD1.index, magnitudes(list(uncertainty_MD1["Baseline"]))))
+    assert abs(results[0] - float(in_float_mode(f_MD1)(x)[0])) < 1e-3
+    for name in ["discount_rate", "coal_price", "external_cost_CO2", "cofire_rate"]:
+        step = x[name] * 1e-6
+        high, low = dict(x, **{name: x[name] + step}), dict(x, **{name: x[name] - step})
+        for i, output in enumerate(derivatives.columns):
+            y_high, y_low = in_float_mode(f_MD1)(high)[i], in_float_mode(f_MD1)(low)[i]
+            expected = (y_high - y_low) / (2 * step)
+            assert (
+                abs(derivatives.loc[name, output] - expected)
+                <= 1e-5 * abs(expected) + 1
+            )
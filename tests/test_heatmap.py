@@ -0,0 +1,30 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the two-way sensitivity grid sweep."""
+
+from numpy import allclose
+
+from model.utils import in_float_mode
+from sensitivity.blackbox import f_NB
+from sensitivity.heatmap import sweep
+from sensitivity.uncertainty import uncertainty_NB
+
+
+def test_batch_matches_pointwise():
+    """The batch path gives the results of the blackbox, point by point."""
+    pairs = [
+        ("coal_price", "cofire_rate"),
+        ("discount_rate", "tax_rate"),
+        ("open_burn_rate", "cofire_rate"),
+    ]
+    for first, second in pairs:
+        batch = sweep(uncertainty_NB, f_NB, first, second, (3, 4))
+        pointwise = sweep(uncertainty_NB, in_float_mode(f_NB), first, second, (3, 4))
+        assert batch.business_value.shape == (3, 4)
+        assert allclose(batch.business_value, pointwise.business_value)
+        assert allclose(batch.external_value, pointwise.external_value)
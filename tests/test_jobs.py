@@ -0,0 +1,79 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the queue of sensitivity study jobs."""
+
+import time
+
+import sensitivity.jobs
+from sensitivity.jobs import JobQueue
+from sensitivity.study import Study
+from sensitivity.uncertainty import uncertainty_MD1
+
+UNCERTAINTY = "sensitivity.uncertainty:uncertainty_MD1"
+
+
+def model(x):
+    """Return two cheap results."""
+    return x["coal_price"] * x["cofire_rate"], x["discount_rate"] ** 0.5
+
+
+MODEL = f"{model.__module__}:{model.__qualname__}"
+
+
+def test_jobs(tmp_path):
+    """Jobs share the workers, survive a restart and match an uninterrupted study."""
+    queue = JobQueue(tmp_path / "queue")
+    sobol = queue.submit(MODEL, UNCERTAINTY, 45, "sobol", seed=1, chunk_size=10)
+    grid = queue.submit(
+        MODEL,
+        UNCERTAINTY,
+        method="grid",
+        chunk_size=10,
+        parameters=["cofire_rate", "coal_price"],
+        sizes=[3, 4],
+    )
+    assert [queue.claim() for _ in range(4)] == [(1, 0), (2, 0), (1, 1), (2, 1)]
+    queue.compute(1, 1)
+    assert len(queue.results(sobol)) == 10
+    assert queue.status().loc[sobol, ["state", "done", "running"]].tolist() == [
+        "running",
+        1,
+        1,
+    ]
+    queue.recover()
+    assert queue.status().loc[grid, "running"] == 2  # Fresh claims are kept
+
+    # The claims of this process, as if killed, are stale for a queue which waits 0 s
+    restarted = JobQueue(tmp_path / "queue", stale_after=0)
+    restarted.work(jobs=2)
+    status = restarted.status()
+    assert (status["state"] == "done").all()
+    assert (status["done"] == status["chunks"]).all()
+
+    reference = Study(
+        tmp_path / "study", uncertainty_MD1, model, 45, "sobol", 1, 10
+    ).run()
+    assert (restarted.results(sobol) == reference.to_frame()).all().all()
+    runs = restarted.results(grid)
+    assert len(runs) == 12
+    assert runs["cofire_rate"].nunique() == 3 and runs["coal_price"].nunique() == 4
+    assert runs["discount_rate"].nunique() == 1
+
+
+def test_heartbeat(tmp_path, monkeypatch):
+    """A worker computing a chunk renews its claim, which stays running."""
+    monkeypatch.setattr(sensitivity.jobs, "HEARTBEAT_INTERVAL", 0.01)
+    queue = JobQueue(tmp_path / "queue", stale_after=0.05)
+    job = queue.submit(MODEL, UNCERTAINTY, 20, chunk_size=10)
+    task = queue.claim()
+    with queue._heartbeat(*task):  # pylint: disable=protected-access
+        time.sleep(0.2)
+        queue.recover()
+        assert queue.status().loc[job, "running"] == 1
+    time.sleep(0.1)
+    assert queue.claim() == task  # Stale, claimed again
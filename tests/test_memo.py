@@ -0,0 +1,60 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the memoization of the System derived quantities."""
+
+import pytest
+
+import manuscript1.parameters as baseline
+from model.system import System
+from model.utils import display_as
+
+# pylint and pytest known compatibility bug
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def system():
+    return System(
+        baseline.plant_parameter_MD1,
+        baseline.cofire_MD1,
+        baseline.supply_chain_MD1,
+        baseline.price_MD1,
+        baseline.farm_parameter,
+        baseline.transport_parameter,
+        baseline.mining_parameter,
+        baseline.emission_factor,
+    )
+
+
+def test_hits(system):
+    """The second call is served from the cache, callers cannot modify it."""
+    first = system.coal_wages_lost
+    with pytest.raises(ValueError):
+        first[1] = 0
+    display_as(first[1], "USD")
+    assert str(system.coal_wages_lost[1]) == "299.653 kUSD"
+    assert system.memo_misses["coal_wages_lost"] == 1
+    assert system.memo_hits["coal_wages_lost"] == 1
+
+
+def test_arguments(system):
+    """Results are cached per argument values, equal arguments hit the cache."""
+    system.health_npv(baseline.external_cost, 0.08, 20)
+    system.health_npv(baseline.external_cost.copy(), 0.08, 20)
+    system.health_npv(baseline.external_cost, 0.05, 20)
+    assert system.memo_misses["health_npv"] == 2
+    assert system.memo_hits["health_npv"] == 1
+    assert system.memo_misses["emissions_reduction_benefit"] == 1
+
+
+def test_clear_market(system):
+    """Clearing the market again forgets the results."""
+    first = system.wages
+    system.clear_market(baseline.price_MD1)
+    assert system.wages is not first
+    assert system.memo_misses["wages"] == 2
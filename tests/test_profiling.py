@@ -0,0 +1,36 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the profiling hooks record the hot paths, and leave no trace when off."""
+
+import io
+
+import model.system
+from benchmark.float_mode import build_system
+from model.farmer import Farmer
+from model.profiling import profiling
+
+
+def test_profiling():
+    """The calls nest in the stacks, the originals are restored afterwards."""
+    originals = Farmer.operating_expenses, model.system.npv
+    with profiling(memory=True) as profile:
+        system = build_system()
+        system.farmer.operating_expenses()
+        system.table_business_value(0.1, 20)
+    assert (Farmer.operating_expenses, model.system.npv) == originals
+
+    assert profile.stats["System.__init__"].calls == 1
+    assert profile.stats["Farmer.operating_expenses"].calls >= 1
+    assert profile.stats["npv"].calls >= 1
+    business_value = profile.stats["System.table_business_value"]
+    assert business_value.cumulative >= business_value.self_time > 0
+    assert "Farmer.operating_expenses" in profile.report()
+
+    folded = io.StringIO()
+    profile.write_folded(folded)
+    assert "\nSystem.__init__;Farmer.__init__;Emitter.emissions " in folded.getvalue()
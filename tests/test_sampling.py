@@ -0,0 +1,57 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the space-filling designs."""
+
+import pytest
+from numpy import arange, array_equal, concatenate, floor, sort
+
+from sensitivity.sampling import (
+    MAXIMIN_LIMIT,
+    latin_hypercube,
+    lower_upper,
+    sample,
+    sample_chunks,
+    sobol,
+)
+from sensitivity.uncertainty import uncertainty_MD1
+
+
+@pytest.mark.parametrize("n", [1, 50, MAXIMIN_LIMIT + 1])
+def test_latin_stratification(n):
+    """Each parameter has one point in each of its n strata."""
+    design = latin_hypercube(n, 3, seed=0)
+    assert design.shape == (n, 3)
+    for column in design.T:
+        assert array_equal(sort(floor(column * n)), arange(n))
+
+
+def test_sobol_balance():
+    """With 2^m points, each parameter has one point in each interval of width 2^-m."""
+    design = sobol(64, 5, seed=0)
+    for column in design.T:
+        assert array_equal(sort(floor(column * 64)), arange(64))
+
+
+@pytest.mark.parametrize(
+    "method, n", [("lhs", 250), ("lhs", MAXIMIN_LIMIT + 250), ("sobol", 256)]
+)
+def test_chunks(method, n):
+    """The chunks put together are the design sampled in one piece."""
+    design = sample(uncertainty_MD1, n, method, seed=3)
+    chunks = list(sample_chunks(uncertainty_MD1, n, method, seed=3, chunk_size=100))
+    assert [len(chunk) for chunk in chunks[:2]] == [100, 100]
+    assert array_equal(concatenate(chunks), design)
+    low, high = lower_upper(uncertainty_MD1)
+    assert ((design >= low) & (design <= high)).all()
+
+
+@pytest.mark.parametrize("method", ["lhs", "sobol"])
+def test_empty(method):
+    """A design of no runs is empty."""
+    assert sample(uncertainty_MD1, 0, method).shape == (0, len(uncertainty_MD1))
+    assert not list(sample_chunks(uncertainty_MD1, 0, method))
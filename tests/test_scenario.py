@@ -0,0 +1,90 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the scenario files against the parameters of the manuscript."""
+
+import json
+
+import pytest
+
+import manuscript1.parameters as baseline
+from model.scenario import (
+    load_batch,
+    load_scenario,
+    load_scenarios,
+    parse_scenario,
+    save_scenario,
+)
+from model.utils import float_mode, isclose
+
+SCENARIOS = "Data/scenarios/"
+
+
+@pytest.mark.parametrize(
+    "name, system",
+    [("MD1", baseline.MongDuong1System), ("NB", baseline.NinhBinhSystem)],
+)
+def test_same_as_manuscript(name, system):
+    """The example files reproduce the systems of the manuscript."""
+    scenario = load_scenario(SCENARIOS + name + ".json")
+    assert scenario.economics.discount_rate == baseline.discount_rate
+    loaded = scenario.system()
+    expected = system.table_business_value(0.08, 20).iloc[-1]
+    assert isclose(loaded.table_business_value(0.08, 20).iloc[-1], expected)
+    expected = system.mitigation_npv(baseline.external_cost, 0.08, 20)
+    assert isclose(loaded.mitigation_npv(baseline.external_cost, 0.08, 20), expected)
+
+
+def test_validation():
+    """Errors name the faulty field."""
+    with open(SCENARIOS + "MD1.json") as file:
+        data = json.load(file)
+    data["plant"]["capacity"] = "1080 MWh"
+    with pytest.raises(ValueError, match=r"plant\.capacity.*unit like MW"):
+        parse_scenario(data)
+    data["plant"]["capacity"] = "1.08 GW"
+    assert isclose(
+        parse_scenario(data).plant.capacity,
+        baseline.MongDuong1System.plant.parameter.capacity,
+    )
+    del data["external_cost"]
+    external_cost = parse_scenario(data).external_cost
+    for pollutant, cost in baseline.external_cost.items():
+        assert isclose(external_cost[pollutant], cost)
+    del data["price"]["coal"]
+    with pytest.raises(ValueError, match=r"price: missing fields \['coal'\]"):
+        parse_scenario(data)
+
+
+def test_batch(tmp_path):
+    """A file can hold many scenarios, parsed files are cached."""
+    with open(SCENARIOS + "NB.json") as file:
+        data = json.load(file)
+    variants = [
+        dict(data, cofire=dict(data["cofire"], cofire_rate=rate))
+        for rate in (0.02, 0.05, 0.08)
+    ]
+    (tmp_path / "variants.json").write_text(json.dumps(variants))
+    scenarios = load_batch([tmp_path, SCENARIOS + "MD1.json"])
+    assert [s.cofire.cofire_rate for s in scenarios[:3]] == [0.02, 0.05, 0.08]
+    assert scenarios[3].name == "Mong Duong 1"
+    assert scenarios[0].emission_factor is scenarios[3].emission_factor
+    assert load_scenarios(tmp_path / "variants.json")[0] is scenarios[0]
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+@pytest.mark.parametrize("name", ["MD1", "NB"])
+def test_save(tmp_path, name, enabled):
+    """Saving a scenario rewrites its file unchanged, with quantities or in float mode."""
+    original = SCENARIOS + name + ".json"
+    with float_mode(enabled):
+        save_scenario(load_scenario(original), tmp_path / "saved.json")
+    with open(original) as file:
+        assert (tmp_path / "saved.json").read_text() == file.read()
+    reloaded = load_scenario(tmp_path / "saved.json").system()
+    expected = load_scenario(original).system().table_business_value(0.08, 20)
+    assert isclose(reloaded.table_business_value(0.08, 20).iloc[-1], expected.iloc[-1])
@@ -0,0 +1,114 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the local HTTP evaluation service, on a free port of localhost."""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from model.batch import as_row, evaluate
+from model.scenario import load_scenario
+from model.service import Evaluator, Server
+
+
+@pytest.fixture(name="url", scope="module")
+def fixture_url():
+    """Start a server in a thread, return its address."""
+    server = Server(("127.0.0.1", 0), Evaluator(["Data/scenarios"]))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d" % server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def call(url, path, body=None):
+    """Return the status and the JSON response of a request."""
+    data = None if body is None else json.dumps(body).encode()
+    try:
+        with urlopen(url + path, data) as response:
+            assert "model;dur=" in response.headers["Server-Timing"]
+            return response.status, json.load(response)
+    except HTTPError as error:
+        return error.code, json.load(error)
+
+
+def test_service(url):
+    """Concurrent requests give the results of the batch runner, and are counted."""
+    assert call(url, "/scenarios") == (200, ["MD1", "NB"])
+    expected = as_row(evaluate(load_scenario("Data/scenarios/NB.json")))
+    requests = [("/evaluate", {"scenario": "NB"})] * 4 + [
+        ("/wtawtp", {"scenario": "MD1"})
+    ] * 2
+    with ThreadPoolExecutor(6) as pool:
+        answers = list(pool.map(lambda r: call(url, *r), requests))
+    assert answers[0] == (200, expected)
+    assert answers[3] == answers[0]
+    assert answers[5] == answers[4]
+    assert answers[4][1]["wta"] < answers[4][1]["wtp"]
+
+    status, sweep = call(
+        url,
+        "/sweep",
+        {"scenario": "NB", "parameter": "cofire.cofire_rate", "values": [0.05, 0.9]},
+    )
+    assert status == 200
+    assert sweep["results"][0] == expected
+    assert sweep["results"][1]["business_value"] is None
+
+    assert call(url, "/evaluate", {"scenario": "XX"})[0] == 400
+    assert call(url, "/evaluate", {"scenario": ["NB"]}) == (
+        400,
+        {"error": "Expecting a scenario name or a scenario object"},
+    )
+    assert call(url, "/evaluate", {"scenario": {"name": "incomplete"}})[0] == 400
+    assert call(url, "/sweep", {"scenario": "NB", "parameter": "x", "values": [1]})[
+        1
+    ] == {"error": "No field x in the scenario"}
+    assert call(url, "/nothing")[0] == 404
+
+    status, stats = call(url, "/stats")
+    assert stats["requests"]["/evaluate"]["count"] == 7
+    assert stats["caches"]["results"]["misses"] == 3
+    assert stats["caches"]["results"]["hits"] >= 3
+
+
+class Failing(Evaluator):
+    """An evaluator with a bug."""
+
+    error = KeyError
+
+    def evaluate(self, data):
+        """Fail."""
+        raise self.error("bug")
+
+
+@pytest.mark.parametrize("error", [KeyError, ValueError])
+def test_unexpected_error(error):
+    """Unexpected errors, even a ValueError, give a JSON 500 response.
+
+    The server keeps serving.
+    """
+    evaluator = Failing(["Data/scenarios/NB.json"])
+    evaluator.error = error
+    server = Server(("127.0.0.1", 0), evaluator)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:%d" % server.server_address[1]
+    try:
+        assert call(url, "/evaluate", {"scenario": "NB"}) == (
+            500,
+            {"error": f"{error.__name__}: {error('bug')}"},
+        )
+        assert call(url, "/scenarios") == (200, ["NB"])
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,69 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the columnar store of model runs."""
+
+import pytest
+
+from model.utils import USD, t, hr, display_as, isclose
+from model.result import SystemResult
+from sensitivity.store import ResultWriter, ResultReader
+
+
+def test_roundtrip(tmp_path):
+    """Rows written in several chunks read back in order, with their units."""
+    path = tmp_path / "runs.parquet"
+    with ResultWriter(path, ["price"], ["value", "time"], chunk_size=10) as writer:
+        for i in range(25):
+            price = display_as(i * USD / t, "USD/t")
+            writer.append({"price": price}, (2.0 * i, i * hr))
+    assert writer.chunks == 3
+
+    runs = ResultReader(path)
+    assert len(runs) == 25
+    assert runs.units == {"price": "USD/t", "value": "", "time": "hr"}
+    assert isclose(runs.column("price")[24], 0.024)  # USD/kg
+    assert runs.column("time")[1] == 3600
+    assert list(runs.to_frame().columns) == ["price", "value", "time"]
+
+
+def test_system_result(tmp_path):
+    """Outputs can be read by name from a SystemResult."""
+    result = SystemResult("Plant", business_value=1e6, wta=0.01)
+    with ResultWriter(tmp_path / "runs", ["x"], ["business_value", "wta"]) as writer:
+        writer.append([0.5], result)
+    runs = ResultReader(tmp_path / "runs")
+    assert runs.column("wta")[0] == 0.01
+
+
+def test_empty(tmp_path):
+    """A store closed without rows reads back as empty columns."""
+    with ResultWriter(tmp_path / "runs", ["x"], ["y"]):
+        pass
+    runs = ResultReader(tmp_path / "runs")
+    assert len(runs) == 0
+    assert len(runs.column("y")) == 0
+    assert runs.to_frame().shape == (0, 2)
+
+
+def test_parquet(tmp_path):
+    """The Parquet metadata is final, and an empty Parquet store is a valid file."""
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "runs.parquet"
+    with ResultWriter(path, ["x"], ["y"], chunk_size=10) as writer:
+        for i in range(25):
+            writer.append([i], [2.0 * i])
+    assert path.is_file()
+    runs = ResultReader(path)
+    assert runs.metadata["rows"] == len(runs) == 25
+    assert runs.metadata["chunks"] == 3
+    assert runs.column("y")[24] == 48
+
+    with ResultWriter(tmp_path / "empty.parquet", ["x"], ["y"]):
+        pass
+    runs = ResultReader(tmp_path / "empty.parquet")
+    assert len(runs) == len(runs.column("x")) == 0
@@ -0,0 +1,59 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test resuming an interrupted sensitivity study."""
+
+import pytest
+
+import sensitivity.study
+from model.hashing import PROJECT_DIR, dependencies
+from sensitivity.study import Study
+from sensitivity.uncertainty import uncertainty_MD1
+
+calls = []
+
+
+def model(x):
+    """Return two cheap results, interrupted at the 25th call if asked."""
+    calls.append(1)
+    if len(calls) == 25 and model.interrupt:
+        raise KeyboardInterrupt
+    return x["coal_price"] * x["cofire_rate"], x["discount_rate"] ** 0.5
+
+
+def test_resume(tmp_path, monkeypatch):
+    """An interrupted study resumes after its last chunk, with identical results."""
+    model.interrupt = False
+    reference = Study(tmp_path / "a", uncertainty_MD1, model, 45, chunk_size=10).run()
+
+    model.interrupt = True
+    calls.clear()
+    study = Study(tmp_path / "b", uncertainty_MD1, model, 45, chunk_size=10)
+    with pytest.raises(KeyboardInterrupt):
+        study.run()
+    assert study.finished() == 2
+    model.interrupt = False
+    calls.clear()
+    runs = study.run()
+    assert len(calls) == 25
+    assert len(runs) == 45
+    assert (runs.to_frame().to_numpy() == reference.to_frame().to_numpy()).all()
+
+    with pytest.raises(ValueError):
+        Study(tmp_path / "b", uncertainty_MD1, model, 45, seed=1).finished()
+
+    monkeypatch.setattr(sensitivity.study, "source_digest", lambda names: "changed")
+    with pytest.raises(ValueError):
+        Study(tmp_path / "b", uncertainty_MD1, model, 45, chunk_size=10).finished()
+
+
+def test_dependencies():
+    """The blackbox depends on the parameters of the manuscript and their data."""
+    files = dependencies("sensitivity.blackbox")
+    assert PROJECT_DIR / "manuscript1" / "parameters.py" in files
+    assert PROJECT_DIR / "Data" / "Rice_production_2017_GSO.xlsx" in files
+    assert PROJECT_DIR / "sensitivity" / "study.py" not in files
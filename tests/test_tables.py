@@ -12,11 +12,6 @@ import pytest
 
 from pandas import set_option
 
-# pylint: disable=wrong-import-position
-from natu import config
-
-config.use_quantities = False
-
 from manuscript1.parameters import MongDuong1System, NinhBinhSystem
 from manuscript1.parameters import (
     discount_rate,
@@ -33,6 +28,7 @@ from model.tables import (
     business_value_by_solving,
     business_value_direct,
 )
+from model.utils import float_mode, strip
 
 
 # Quiet unused-import warning from pylint and spyder, we use them inside an eval string
@@ -48,9 +44,16 @@ set_option("display.float_format", "{:,.1f}".format)
 finance = discount_rate, economic_horizon, tax_rate, depreciation_period
 
 
+@pytest.fixture(autouse=True)
+def floats():
+    """Run in float mode, the mode in which the results were recorded."""
+    with float_mode():
+        yield
+
+
 @pytest.fixture()
-def systems():
-    return MongDuong1System, NinhBinhSystem
+def systems(floats):
+    return strip(MongDuong1System), strip(NinhBinhSystem)
 
 
 def test_energy_costs(regtest, systems):
@@ -0,0 +1,33 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the batched break-even solver."""
+
+from model.utils import in_float_mode
+from sensitivity.blackbox import f_NB
+from sensitivity.distributions import ParameterSpace
+from sensitivity.threshold import break_even_values
+from sensitivity.uncertainty import uncertainty_NB
+
+
+def test_break_even_coal_price():
+    """At the break-even coal price, the business value is zero."""
+    scenarios = ParameterSpace.from_table(uncertainty_NB).sample(20, seed=1)
+    scenarios["cofire_rate"][10:] = 0.05  # Half the scenarios share a system
+    roots = break_even_values(f_NB, scenarios, "coal_price")
+    assert roots.converged.all()
+    for i in [0, 15]:
+        x = {name: scenarios[name][i] for name in scenarios.dtype.names}
+        x["coal_price"] = roots.x[i]
+        assert abs(in_float_mode(f_NB)(x)[0]) < 1e-3
+
+
+def test_not_converged():
+    """The business value does not depend on the biomass price."""
+    scenarios = ParameterSpace.from_table(uncertainty_NB).sample(3, seed=1)
+    roots = break_even_values(f_NB, scenarios, "biomass_plantgate")
+    assert not roots.converged.any()
@@ -0,0 +1,30 @@
+# encoding: utf-8
+# Economic of co-firing in two power plants in Vietnam
+#
+# (c) Minh Ha-Duong, An Ha Truong 2016-2020
+# minh.haduong@gmail.com
+# Creative Commons Attribution-ShareAlike 4.0 International
+#
+"""Test the value of information estimates on a model with a known answer."""
+
+from sensitivity.distributions import ParameterSpace, Uniform
+from sensitivity.voi import value_of_information
+
+
+def model(x):
+    """Return a business value decided by a, and an external value depending on b."""
+    return x["a"] - 0.5, x["b"] - 0.5
+
+
+def test_value_of_information():
+    """Only the parameters which can change the decision have a value."""
+    space = ParameterSpace({"a": Uniform(0, 1), "b": Uniform(0, 1), "c": Uniform(0, 1)})
+    table = value_of_information(space, model, 4000, seed=0)
+    business, social = table["business_value"], table["social_value"]
+    assert abs(business["EVPI"] - 0.125) < 0.005
+    assert abs(business["a"] - 0.125) < 0.005
+    assert business["b"] < 0.01 and business["c"] < 0.01
+    # Social value a + b - 1 is triangular, EVPI 1/6, EVPPI on a or b is 1/8
+    assert abs(social["EVPI"] - 1 / 6) < 0.005
+    assert abs(social["a"] - 0.125) < 0.01 and abs(social["b"] - 0.125) < 0.01
+    assert social["c"] < 0.01